@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+bench_ga.py
+
+Mide generaciones por segundo de un motor GA (ga_scheduler.py, main.py o
+backend/src/algorithms/run_ga.py) con semilla fija, comparando los operadores
+actuales (selección por índice + hijos copy-on-write) con el esquema anterior de
+copias completas, que se emula pasando copias profundas a cruce, mutación y
+reparación.
+
+Uso:
+    python bench_ga.py --script ga_scheduler.py --input input_full.json --gens 30 --pop 120
+    python bench_ga.py --script ../backend/src/algorithms/run_ga.py --input horario.json
+
+Notas:
+- El tiempo de inicialización (población inicial + primera evaluación) se mide con
+  una corrida de 0 generaciones y se descuenta.
+- Ambos modos consumen la misma secuencia aleatoria, así que deben llegar al mismo
+  mejor fitness; el script lo verifica.
+"""
+
+import argparse
+import contextlib
+import copy
+import importlib.util
+import io
+import json
+import os
+import random
+import time
+
+# operator names per engine: (crossover, mutation, repair)
+OPERATORS = {
+    'run_ga': ('cruce_uniforme', 'mutacion_adaptativa', 'reparar_individuo'),
+    'scheduler': ('crossover', 'mutate', 'repair'),
+}
+
+def load_engine(path: str):
+    name = 'bench_' + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    kind = 'run_ga' if hasattr(module, 'ejecutar_algoritmo_genetico') else 'scheduler'
+    return module, kind
+
+def use_deep_copies(module, kind: str):
+    """Emula los operadores anteriores: cada etapa trabaja sobre una copia profunda."""
+    cross_name, mut_name, rep_name = OPERATORS[kind]
+    cross, mut, rep = (getattr(module, n) for n in OPERATORS[kind])
+
+    def deep_crossover(p1, p2, data):
+        # selection used to deep-copy each parent, then crossover copied every course list
+        c1, c2 = cross(copy.deepcopy(p1), copy.deepcopy(p2), data)
+        return copy.deepcopy(c1), copy.deepcopy(c2)
+
+    setattr(module, cross_name, deep_crossover)
+    setattr(module, mut_name, lambda ind, data, *a: mut(copy.deepcopy(ind), data, *a))
+    setattr(module, rep_name, lambda ind, data, *a: rep(copy.deepcopy(ind), data, *a))
+
+def run_once(path: str, input_path: str, gens: int, pop: int, seed: int, deep: bool):
+    """Corre el GA y retorna (segundos, mejor fitness)."""
+    module, kind = load_engine(path)
+    if deep:
+        use_deep_copies(module, kind)
+    module.POP_SIZE = pop
+    module.GENERATIONS = gens
+    sink = io.StringIO()
+    if kind == 'run_ga':
+        with open(input_path, encoding='utf-8') as f:
+            data = module.convert_input_format(json.load(f))
+        random.seed(seed)
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(sink):
+            best, diag = module.ejecutar_algoritmo_genetico(data)
+        return time.perf_counter() - start, diag['fitness_total']
+    data = module.load_input(input_path)
+    data.setdefault('pesos', {}).setdefault('M', 1000000)
+    random.seed(seed)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        best, diag = module.run_ga(data)
+    return time.perf_counter() - start, diag['fitness']
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--script', required=True, help='GA engine to benchmark')
+    parser.add_argument('--input', required=True, help='input JSON for that engine')
+    parser.add_argument('--gens', type=int, default=30)
+    parser.add_argument('--pop', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    for mode, deep in (('deep copies', True), ('copy-on-write', False)):
+        init, _ = run_once(args.script, args.input, 0, args.pop, args.seed, deep)
+        total, fitness = run_once(args.script, args.input, args.gens, args.pop, args.seed, deep)
+        loop = max(total - init, 1e-9)
+        results[mode] = (args.gens / loop, fitness)
+        print(f"{mode:>14}: {args.gens / loop:8.2f} gen/s  ({loop:.2f}s for {args.gens} generations, "
+              f"best fitness {fitness})")
+    (old_rate, old_fit), (new_rate, new_fit) = results['deep copies'], results['copy-on-write']
+    print(f"speedup: {new_rate / old_rate:.2f}x")
+    if old_fit != new_fit:
+        print("Advertencia: los dos modos terminaron con distinto fitness")
+
+if __name__ == "__main__":
+    main()
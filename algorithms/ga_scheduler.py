@@ -16,11 +16,24 @@ Notas:
 """
 
 import json
+import csv
+import os
+import queue
+import time
+import math
 import random
 import argparse
-import copy
-from collections import defaultdict, Counter
-from typing import Dict, List, Tuple, Any
+import multiprocessing
+from array import array
+from collections import defaultdict, Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Any, Mapping, NamedTuple
+
+try:
+    import numpy as np  # optional: only needed for the --batch evaluator
+except ImportError:
+    np = None
 
 # ---------------------------
 # Parámetros GA (puedes tunear)
@@ -30,6 +43,35 @@ GENERATIONS = 600
 TOURNAMENT_K = 3
 CROSSOVER_PROB = 0.85
 MUTATION_PROB = 0.25
+STRUCTURED_MOVES = 0.0  # share of mutations done by a structured move (swap, Kempe chain, run), see mutate
+BATCH_EVAL = False  # evaluate the whole population at once with NumPy
+CACHE_SIZE = 4096   # fitness cache entries (LRU); 0 disables the cache
+STAGED_EVAL = True  # hard constraints first, soft terms only for individuals that can still compete
+EVAL_PROFILE = None  # EvalProfile collecting per-constraint timings (--profile-eval); None disables it
+WORKERS = 1         # evaluation processes; 0 = all cores
+PARALLEL_OPS = False  # also mutate + repair offspring in the pool (one seed per child)
+ISLANDS = 1         # island model sub-populations (--islands); 1 = single population
+MIGRATION_INTERVAL = 10  # generations between migrations
+MIGRANTS = 2        # best individuals each island sends to each target
+TOPOLOGY = 'ring'   # ring | bidirectional | complete
+STEADY_STATE = False  # replace in place, two children at a time (--steady-state)
+REPLACEMENT = 'worst'  # worst | tournament (loser of a tournament)
+EVAL_BUDGET = None  # children evaluated in steady-state mode; None = POP_SIZE * GENERATIONS
+ASYNC_MODE = False  # asynchronous master-worker steady state over the --workers pool (--async)
+TIME_LIMIT = None   # early stop: wall-clock seconds since the run started (--time-limit)
+STALL_GENS = None   # early stop: generations in a row without a new best (--stall-gens)
+TARGET_FITNESS = None  # early stop: bounds on the best individual, see parse_target (--target-fitness)
+LS_EVERY = 0        # memetic local search on the best individuals every N generations (--ls-every); 0 = off
+LS_TOP = 2          # individuals improved in each local search phase
+LS_EVALS = 6000     # moves evaluated per local search phase, split among the top ones; 0 = until the local optimum
+LS_TIME = 0         # optional seconds cap per phase; 0 = none (a cap makes runs depend on machine load)
+ENGINE = 'ga'       # ga | sa (simulated annealing) | tabu (tabu search), see run_trajectory (--engine)
+ITERATIONS = None   # moves evaluated by the sa / tabu engines; None = 10 * POP_SIZE * GENERATIONS
+SA_SCHEDULE = 'geometric'  # geometric | linear | lundy-mees, see TemperatureSchedule
+SA_T0 = None        # initial temperature; None = estimated by initial_temperature
+SA_T_FINAL = 1.0    # final temperature
+TABU_TENURE = 10    # iterations a block may not go back to the slot it left
+TABU_CANDIDATES = 50  # random neighbours scored per tabu iteration
 SEED = 42
 random.seed(SEED)
 
@@ -96,8 +138,168 @@ def load_input(path: str) -> Dict[str, Any]:
         for cc in course_list:
             course_to_currs[cc].append(curr_name)
     data['_course_to_currs'] = dict(course_to_currs)
+
+    # compiled integer index (periods, aulas, availability masks)
+    data['_index'] = build_problem_index(data)
     return data
 
+# ---------------------------
+# Compiled problem index
+# ---------------------------
+class ProblemIndex(NamedTuple):
+    """
+    Índice inmutable del problema, construido una sola vez en load_input.
+    Codifica periodos, aulas y disponibilidad de profesores como enteros para que
+    evaluadores, repair y operadores no tengan que re-parsear strings.
+    """
+    periods: Tuple[Period, ...]
+    period_id: Mapping[Period, int]
+    days: Tuple[str, ...]
+    day_of: Tuple[int, ...]            # period -> day id
+    slot_in_day: Tuple[int, ...]       # period -> position within its day
+    day_periods: Tuple[Tuple[int, ...], ...]  # day id -> periods in order
+    is_morning: Tuple[bool, ...]
+    is_extreme: Tuple[bool, ...]       # first or last block of its day
+    start_hour: Tuple[int, ...]
+    adjacent_next: Tuple[bool, ...]    # period i+1 follows period i in the same day
+    aulas: Tuple[AulaID, ...]
+    aula_id: Mapping[AulaID, int]
+    aula_type: Tuple[str, ...]
+    aula_capacity: Tuple[int, ...]
+    aulas_by_type: Mapping[str, Tuple[AulaID, ...]]
+    prof_available: Mapping[Professor, int]  # availability bitmask (only profs that declare one)
+    course_id: Mapping[CourseCode, int]
+    course_codes: Tuple[CourseCode, ...]
+    curr_conflicts: Tuple[int, ...]    # course id -> bitmask of course ids sharing a curriculum
+
+def build_problem_index(data: Dict[str, Any]) -> ProblemIndex:
+    periods = tuple(data['periodos'])
+    days = []
+    day_of, slot_in_day, start_hour = [], [], []
+    day_periods = defaultdict(list)
+    for i, p in enumerate(periods):
+        day = get_day_of_period(p)
+        if day not in days:
+            days.append(day)
+        d = days.index(day)
+        day_of.append(d)
+        slot_in_day.append(len(day_periods[d]))
+        day_periods[d].append(i)
+        try:
+            start_hour.append(int(p.split('_')[1].split(':')[0]))
+        except Exception:
+            start_hour.append(0)
+    is_extreme = tuple(slot_in_day[i] == 0 or slot_in_day[i] == len(day_periods[day_of[i]]) - 1
+                       for i in range(len(periods)))
+    adjacent_next = tuple(i + 1 < len(periods) and day_of[i + 1] == day_of[i]
+                          and slot_in_day[i + 1] == slot_in_day[i] + 1
+                          for i in range(len(periods)))
+
+    aulas = data['_aulas_list']
+    aulas_by_type = defaultdict(list)
+    for a in aulas:
+        aulas_by_type[a['tipo']].append(a['id'])
+
+    period_id = {p: i for i, p in enumerate(periods)}
+    prof_available = {}
+    for name, info in data['_profs_map'].items():
+        available = info.get('disponibilidad', [])
+        if available:
+            mask = 0
+            for p in available:
+                if p in period_id:
+                    mask |= 1 << period_id[p]
+            prof_available[name] = mask
+
+    # H1: course x course "shares a curriculum" bitsets (a course conflicts with
+    # itself when it belongs to any curriculum, matching the pairwise check)
+    course_id = {c: i for i, c in enumerate(data['_courses_map'])}
+    curr_members = defaultdict(int)
+    for ccode, currs in data['_course_to_currs'].items():
+        if ccode in course_id:
+            for curr in currs:
+                curr_members[curr] |= 1 << course_id[ccode]
+    curr_conflicts = [0] * len(course_id)
+    for ccode, ci in course_id.items():
+        for curr in data['_course_to_currs'].get(ccode, []):
+            curr_conflicts[ci] |= curr_members[curr]
+
+    return ProblemIndex(
+        periods=periods,
+        period_id=MappingProxyType(period_id),
+        days=tuple(days),
+        day_of=tuple(day_of),
+        slot_in_day=tuple(slot_in_day),
+        day_periods=tuple(tuple(day_periods[d]) for d in range(len(days))),
+        is_morning=tuple(is_morning_period(p) for p in periods),
+        is_extreme=is_extreme,
+        start_hour=tuple(start_hour),
+        adjacent_next=adjacent_next,
+        aulas=tuple(a['id'] for a in aulas),
+        aula_id=MappingProxyType({a['id']: i for i, a in enumerate(aulas)}),
+        aula_type=tuple(a['tipo'] for a in aulas),
+        aula_capacity=tuple(a.get('capacidad', 999) for a in aulas),
+        aulas_by_type=MappingProxyType({t: tuple(ids) for t, ids in aulas_by_type.items()}),
+        prof_available=MappingProxyType(prof_available),
+        course_id=MappingProxyType(course_id),
+        course_codes=tuple(course_id),
+        curr_conflicts=tuple(curr_conflicts),
+    )
+
+# ---------------------------
+# Compact genome
+# ---------------------------
+class Genome:
+    """
+    Forma compacta de un individuo: ids de periodo y aula de cada bloque en arrays
+    de 16 bits, curso tras curso. courses[k] es el id del k-ésimo curso (orden del
+    dict original) y sus bloques son offsets[k]..offsets[k+1]. Copiar un Genome es
+    copiar cuatro arrays; to_dict() devuelve la forma dict que usan los operadores.
+    """
+    __slots__ = ('courses', 'offsets', 'periods', 'aulas')
+
+    def __init__(self, courses: array, offsets: array, periods: array, aulas: array):
+        self.courses = courses
+        self.offsets = offsets
+        self.periods = periods
+        self.aulas = aulas
+
+    @classmethod
+    def from_dict(cls, ind: Dict[CourseCode, List[Tuple[Period, AulaID]]], index: ProblemIndex) -> 'Genome':
+        course_id, period_id, aula_id = index.course_id, index.period_id, index.aula_id
+        courses, offsets = array('H'), array('I', [0])
+        periods, aulas = array('H'), array('H')
+        for ccode, assigns in ind.items():
+            courses.append(course_id[ccode])
+            for (p, a) in assigns:
+                periods.append(period_id[p])
+                aulas.append(aula_id[a])
+            offsets.append(len(periods))
+        return cls(courses, offsets, periods, aulas)
+
+    def to_dict(self, index: ProblemIndex) -> Dict[CourseCode, List[Tuple[Period, AulaID]]]:
+        course_codes = index.course_codes
+        period_names, aula_names = index.periods, index.aulas
+        offsets, periods, aulas = self.offsets, self.periods, self.aulas
+        ind = {}
+        for k, ci in enumerate(self.courses):
+            lo, hi = offsets[k], offsets[k + 1]
+            ind[course_codes[ci]] = [(period_names[periods[b]], aula_names[aulas[b]]) for b in range(lo, hi)]
+        return ind
+
+    def copy(self) -> 'Genome':
+        return Genome(self.courses[:], self.offsets[:], self.periods[:], self.aulas[:])
+
+    def nbytes(self) -> int:
+        return sum(len(arr) * arr.itemsize for arr in (self.courses, self.offsets, self.periods, self.aulas))
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+def as_schedule(sol, data: Dict[str, Any]) -> Dict[CourseCode, List[Tuple[Period, AulaID]]]:
+    """Forma dict de una solución, sea un dict o un Genome."""
+    return sol.to_dict(data['_index']) if isinstance(sol, Genome) else sol
+
 # ---------------------------
 # Representación de la solución
 # ---------------------------
@@ -114,25 +316,26 @@ def random_assignment_for_course(course: Dict[str, Any], data: Dict[str, Any]) -
     """
     blocks = course['_blocks_needed']
     aula_type = course.get('aula_tipo', None)  # 'LAB' or 'T' or None
-    periods = data['periodos']
-    aulas = data['_aulas_list']
+    index = data['_index']
+    periods = index.periods
+    aulas = index.aulas
     # split aulas by tipo
-    labs = [a for a in aulas if a['tipo'] == 'LAB']
-    ts = [a for a in aulas if a['tipo'] == 'T']
+    labs = index.aulas_by_type.get('LAB', ())
+    ts = index.aulas_by_type.get('T', ())
     assignments = []
     # strategy: attempt as many lab blocks in LAB as possible if aula_type == 'LAB'
     for b in range(blocks):
         if aula_type == 'LAB':
             if labs:
-                chosen_aula = random.choice(labs)['id']
+                chosen_aula = random.choice(labs)
             else:
-                chosen_aula = random.choice(aulas)['id']
+                chosen_aula = random.choice(aulas)
         else:
             # prefer T
             if ts:
-                chosen_aula = random.choice(ts)['id']
+                chosen_aula = random.choice(ts)
             else:
-                chosen_aula = random.choice(aulas)['id']
+                chosen_aula = random.choice(aulas)
         chosen_period = random.choice(periods)
         assignments.append((chosen_period, chosen_aula))
     return assignments
@@ -158,14 +361,70 @@ def is_morning_period(period: Period) -> bool:
 def get_day_of_period(period: Period) -> str:
     return period.split('_')[0]
 
+# ---------------------------
+# Evaluation profiling
+# ---------------------------
+# Opt-in: when EVAL_PROFILE is an EvalProfile, _evaluate laps the clock after every
+# constraint block. When it is None the only cost is one `is not None` test per block.
+class EvalProfile:
+    """Wall time and invocation count per constraint block, aggregated over a run."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.cutoffs = defaultdict(int)  # staged evaluations stopped after each stage
+        self.evaluations = 0
+
+    def lap(self, block: str, start: float) -> float:
+        """Charges the time since `start` to `block`; returns the new start."""
+        now = time.perf_counter()
+        self.seconds[block] += now - start
+        self.calls[block] += 1
+        return now
+
+    def rows(self) -> List[Dict[str, Any]]:
+        total = sum(self.seconds.values()) or 1.0
+        rows = []
+        for block in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            secs, calls = self.seconds[block], self.calls[block]
+            rows.append({
+                'block': block,
+                'calls': calls,
+                'seconds': round(secs, 6),
+                'us_per_call': round(secs / calls * 1e6, 3),
+                'share': round(secs / total, 4),
+            })
+        return rows
+
+    def summary(self) -> str:
+        lines = [f"Evaluation profile: {self.evaluations} evaluations, "
+                 f"{sum(self.seconds.values()):.3f}s in constraint blocks"]
+        for r in self.rows():
+            lines.append(f"  {r['block']:<12} {r['calls']:>9} calls {r['seconds']:>10.4f}s "
+                         f"{r['us_per_call']:>10.2f}us/call {r['share']:>7.1%}")
+        if self.cutoffs:
+            lines.append(f"  staged cutoffs: {dict(self.cutoffs)}")
+        return "\n".join(lines)
+
+    def save(self, path: str):
+        """Writes the profile as CSV (path ending in .csv) or JSON."""
+        rows = self.rows()
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if path.lower().endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=['block', 'calls', 'seconds', 'us_per_call', 'share'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump({'evaluations': self.evaluations, 'cutoffs': dict(self.cutoffs),
+                           'blocks': rows}, f, indent=2)
+
 # ---------------------------
 # Fitness (cost) function
 # ---------------------------
 
-def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) -> float:
+def get_weights(data: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, float]]:
     """
-    Calcula la función objetivo: hard violations * M + sum(soft penalties)
-    Retorna (fitness_score, diagnostics_dict)
+    Pesos de las restricciones duras (H1..H7) y blandas (S1..S9) con sus valores por defecto.
     """
     M = data['pesos'].get('M', 1000000)
     hard_weights = data.get('pesos', {}).get('restricciones_duras', {})
@@ -192,38 +451,109 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
         'S8': soft_weights.get('fuera_bloque_preferido', 4),
         'S9': soft_weights.get('dias_extra', 2)
     }
+    return w_H, w_S
+
+def _evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], diagnostics=None, cutoff: float = None) -> Tuple[float, float]:
+    """
+    Núcleo de la función objetivo: hard violations * M + sum(soft penalties).
+    Retorna (lower, upper): ambos iguales al fitness cuando la evaluación es completa.
+    Si se da cutoff y el costo ya lo supera, corta antes de las blandas (o de las duras
+    más caras) y retorna cotas: lower > cutoff y upper (inf si faltaron duras).
+    Llena `diagnostics` (si no es None) solo en evaluaciones completas.
+    """
+    profile = EVAL_PROFILE
+    if profile is not None:
+        profile.evaluations += 1
+        t = time.perf_counter()
+    w_H, w_S = get_weights(data)
 
     cost_hard = 0
     cost_soft = 0
-    diagnostics = defaultdict(int)
 
     # Precompute some maps for fast checks
     course_map = data['_courses_map']
     prof_map = data['_profs_map']
-    aulas_map = {a['id']: a for a in data['_aulas_list']}
     course_to_currs = data.get('_course_to_currs', {})
-    # 1) H1: Conflicto de currículo: si dos cursos del mismo currículo en mismo periodo
-    # Build per-period set of courses
-    period_courses = defaultdict(list)
-    for ccode, assigns in ind.items():
+    index = data['_index']
+    period_id = index.period_id
+    aula_id = index.aula_id
+    day_of = index.day_of
+    slot_in_day = index.slot_in_day
+    is_morning = index.is_morning
+    # encode every assignment once as (period index, aula)
+    encoded = {ccode: [(period_id[p], a) for (p, a) in assigns] for ccode, assigns in ind.items()}
+    if profile is not None: t = profile.lap('setup', t)
+
+    # Hard constraints in stages, cheap per-block checks first. With a cutoff, stop as
+    # soon as the cost is provably above it (soft_lo: lower bound of the soft terms).
+    if cutoff is not None:
+        soft_lo, soft_hi = soft_bounds(encoded, data, w_S)
+        if any(w < 0 for w in w_H.values()):
+            cutoff = None  # partial hard sums are only lower bounds with non-negative weights
+        if profile is not None: t = profile.lap('soft_bounds', t)
+
+    # 7) H7: Carga horaria del curso => ensure exactly blocks assigned equals required
+    for ccode, assigns in encoded.items():
+        needed = course_map[ccode]['_blocks_needed']
+        assigned = len(assigns)
+        if assigned != needed:
+            cost_hard += abs(assigned - needed) * w_H['H7']
+            if diagnostics is not None: diagnostics['H7_blocks_mismatch'] += abs(assigned - needed)
+
+    if profile is not None: t = profile.lap('H7', t)
+
+    # 5) H5: Capacidad de aula: for each assignment, check students <= capacity
+    for ccode, assigns in encoded.items():
+        est = course_map[ccode].get('estudiantes', 30)
         for (p, a) in assigns:
-            period_courses[p].append(ccode)
-    # For each period, check curriculum conflicts
-    for p, course_list in period_courses.items():
-        # if two courses share a curriculum, penalize (hard)
-        for i in range(len(course_list)):
-            for j in range(i+1, len(course_list)):
-                c1 = course_list[i]; c2 = course_list[j]
-                currs1 = set(course_to_currs.get(c1, []))
-                currs2 = set(course_to_currs.get(c2, []))
-                if currs1 & currs2:
-                    cost_hard += w_H['H1']
-                    diagnostics['H1_conflict'] += 1
+            ai = aula_id.get(a)
+            cap = index.aula_capacity[ai] if ai is not None else 999
+            if est > cap:
+                cost_hard += w_H['H5']
+                if diagnostics is not None: diagnostics['H5_capacidad'] += 1
+
+    if profile is not None: t = profile.lap('H5', t)
+
+    # 6) H6: Tipo de aula requerido
+    for ccode, assigns in encoded.items():
+        required = course_map[ccode].get('aula_tipo', None)  # 'LAB' or 'T'
+        if required:
+            for (p, a) in assigns:
+                ai = aula_id.get(a)
+                if ai is None:
+                    cost_hard += w_H['H6']
+                    if diagnostics is not None: diagnostics['H6_missing_aula'] += 1
+                    continue
+                atype = index.aula_type[ai]
+                if required == 'LAB' and atype != 'LAB':
+                    cost_hard += w_H['H6']
+                    if diagnostics is not None: diagnostics['H6_tipo_mismatch'] += 1
+                if required == 'T' and atype != 'T':
+                    # if required T but assigned lab => allowed but penalize as soft? we treat as hard
+                    cost_hard += w_H['H6']
+                    if diagnostics is not None: diagnostics['H6_tipo_mismatch'] += 1
+
+    if profile is not None: t = profile.lap('H6', t)
+
+    # 3) H3: Disponibilidad profesor (bitmask over period indices)
+    for ccode, assigns in encoded.items():
+        available = index.prof_available.get(course_map[ccode].get('profesor'))
+        if available is None:
+            continue
+        for (p, a) in assigns:
+            if not (available >> p) & 1:
+                cost_hard += w_H['H3']
+                if diagnostics is not None: diagnostics['H3_prof_unavailable'] += 1
+
+    if profile is not None: t = profile.lap('H3', t)
+    if cutoff is not None and cost_hard + soft_lo > cutoff:
+        if profile is not None: profile.cutoffs['H3'] += 1
+        return cost_hard + soft_lo, float('inf')
 
     # 2) H2: Conflicto de profesor: same professor two classes same period
     # build professor->period->count
     prof_period_cnt = defaultdict(lambda: defaultdict(int))
-    for ccode, assigns in ind.items():
+    for ccode, assigns in encoded.items():
         prof_name = course_map[ccode].get('profesor')
         for (p, a) in assigns:
             prof_period_cnt[prof_name][p] += 1
@@ -232,59 +562,54 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
             if cnt > 1:
                 # each extra class beyond 1 is a conflict
                 cost_hard += (cnt - 1) * w_H['H2']
-                diagnostics['H2_prof_conflict'] += (cnt - 1)
+                if diagnostics is not None: diagnostics['H2_prof_conflict'] += (cnt - 1)
 
-    # 3) H3: Disponibilidad profesor
-    for ccode, assigns in ind.items():
-        prof_name = course_map[ccode].get('profesor')
-        prof_info = prof_map.get(prof_name, {})
-        available = set(prof_info.get('disponibilidad', []))
-        for (p, a) in assigns:
-            if available and p not in available:
-                cost_hard += w_H['H3']
-                diagnostics['H3_prof_unavailable'] += 1
+    if profile is not None: t = profile.lap('H2', t)
 
     # 4) H4: Conflicto de aula (aula occupied twice same period)
     aula_period_cnt = defaultdict(lambda: defaultdict(int))
-    for ccode, assigns in ind.items():
+    for ccode, assigns in encoded.items():
         for (p, a) in assigns:
             aula_period_cnt[a][p] += 1
     for aula, permap in aula_period_cnt.items():
         for p, cnt in permap.items():
             if cnt > 1:
                 cost_hard += (cnt - 1) * w_H['H4']
-                diagnostics['H4_aula_conflict'] += (cnt - 1)
+                if diagnostics is not None: diagnostics['H4_aula_conflict'] += (cnt - 1)
 
-    # 5) H5: Capacidad de aula: for each assignment, check students <= capacity
-    for ccode, assigns in ind.items():
-        est = course_map[ccode].get('estudiantes', 30)
-        for (p, a) in assigns:
-            cap = aulas_map.get(a, {}).get('capacidad', 999)
-            if est > cap:
-                cost_hard += w_H['H5']
-                diagnostics['H5_capacidad'] += 1
+    if profile is not None: t = profile.lap('H4', t)
+    if cutoff is not None and cost_hard + soft_lo > cutoff:
+        if profile is not None: profile.cutoffs['H4'] += 1
+        return cost_hard + soft_lo, float('inf')
 
-    # 6) H6: Tipo de aula requerido
-    for ccode, assigns in ind.items():
-        required = course_map[ccode].get('aula_tipo', None)  # 'LAB' or 'T'
-        if required:
-            for (p, a) in assigns:
-                if a not in aulas_map:
-                    cost_hard += w_H['H6']; diagnostics['H6_missing_aula'] += 1; continue
-                atype = aulas_map[a]['tipo']
-                if required == 'LAB' and atype != 'LAB':
-                    cost_hard += w_H['H6']; diagnostics['H6_tipo_mismatch'] += 1
-                if required == 'T' and atype != 'T':
-                    # if required T but assigned lab => allowed but penalize as soft? we treat as hard
-                    cost_hard += w_H['H6']; diagnostics['H6_tipo_mismatch'] += 1
+    # 1) H1: Conflicto de currículo: si dos cursos del mismo currículo en mismo periodo
+    # Per period, layers[k] holds the courses already seen more than k times there, so
+    # the pairs a new block closes are popcount(conflicts & layer) summed over layers.
+    course_id = index.course_id
+    curr_conflicts = index.curr_conflicts
+    period_layers = defaultdict(list)
+    for ccode, assigns in encoded.items():
+        ci = course_id[ccode]
+        bit = 1 << ci
+        conflicts = curr_conflicts[ci]
+        for (p, a) in assigns:
+            layers = period_layers[p]
+            if conflicts:
+                pairs = sum((conflicts & layer).bit_count() for layer in layers)
+                if pairs:
+                    cost_hard += pairs * w_H['H1']
+                    if diagnostics is not None: diagnostics['H1_conflict'] += pairs
+            for k, layer in enumerate(layers):
+                if not layer & bit:
+                    layers[k] = layer | bit
+                    break
+            else:
+                layers.append(bit)
 
-    # 7) H7: Carga horaria del curso => ensure exactly blocks assigned equals required
-    for ccode, assigns in ind.items():
-        needed = course_map[ccode]['_blocks_needed']
-        assigned = len(assigns)
-        if assigned != needed:
-            cost_hard += abs(assigned - needed) * w_H['H7']
-            diagnostics['H7_blocks_mismatch'] += abs(assigned - needed)
+    if profile is not None: t = profile.lap('H1', t)
+    if cutoff is not None and cost_hard + soft_lo > cutoff:
+        if profile is not None: profile.cutoffs['H1'] += 1
+        return cost_hard + soft_lo, cost_hard + soft_hi
 
     # ----------------------------
     # Soft constraints approximations
@@ -293,69 +618,58 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
     curr_sched = defaultdict(lambda: defaultdict(list))  # curr -> day -> list periods
     # also count aula usages
     aula_usage = defaultdict(int)
-    # per course sessions list of periods
-    course_periods = {}
-    for ccode, assigns in ind.items():
-        course_periods[ccode] = [p for (p,a) in assigns]
+    for ccode, assigns in encoded.items():
+        currs = course_to_currs.get(ccode, [])
         for (p,a) in assigns:
             # curriculum mapping
-            currs = course_to_currs.get(ccode, [])
             for curr in currs:
-                day = get_day_of_period(p)
-                curr_sched[curr][day].append(p)
+                curr_sched[curr][day_of[p]].append(p)
             aula_usage[a] += 1
 
+    if profile is not None: t = profile.lap('soft_setup', t)
+
     # S1: horarios compactos por currículo (minimizar huecos)
     # For each curr, each day: compute min-max count and subtract number of assigned blocks => count gaps
-    # approximate mapping period->index per day
-    day_order = {}
-    # build order index map for each day for quick arithmetics
-    for p in data['periodos']:
-        day = get_day_of_period(p)
-        if day not in day_order:
-            day_order[day] = []
-        # use full period string as order
-        day_order[day].append(p)
-    # ensure order preserved as in data['periodos']
-    for d in day_order:
-        # keep original ordering appearing in data['periodos']
-        order = [x for x in data['periodos'] if get_day_of_period(x) == d]
-        day_order[d] = {v:i for i,v in enumerate(order)}
-    # now count gaps
     for curr, days in curr_sched.items():
         for day, plist in days.items():
             if not plist: continue
-            idxs = sorted(day_order[day].get(p,0) for p in plist)
-            if not idxs: continue
+            idxs = sorted(slot_in_day[p] for p in plist)
             span = idxs[-1] - idxs[0] + 1
             gaps = span - len(idxs)
             cost_soft += gaps * w_S['S1']
-            diagnostics['S1_gaps'] += gaps
+            if diagnostics is not None: diagnostics['S1_gaps'] += gaps
+
+    if profile is not None: t = profile.lap('S1', t)
 
     # S2: preferencia de bloque (mañana/tarde) por currículo
-    pref_turno = data.get('preferencias', {}).get('turno_preferido', 'mañana')
     for curr, days in curr_sched.items():
         p_m = 0; p_t = 0
         for day, plist in days.items():
             for p in plist:
-                if is_morning_period(p): p_m += 1
+                if is_morning[p]: p_m += 1
                 else: p_t += 1
         # penaliza mezcla: min(p_m,p_t) * w2
         cost_soft += min(p_m, p_t) * w_S['S2']
-        diagnostics['S2_mixed'] += min(p_m,p_t)
+        if diagnostics is not None: diagnostics['S2_mixed'] += min(p_m,p_t)
+
+    if profile is not None: t = profile.lap('S2', t)
 
     # S3: preferencia del profesor (ya H3 penaliza indisponibilidad).
     # Additionally penalize if assignment is in same day as blocked preference? We approximate by penalizing if assignment time not in pref set (if prof defines 'preferencia' in data)
-    for ccode, assigns in ind.items():
+    for ccode, assigns in encoded.items():
         prof = course_map[ccode].get('profesor')
-        prof_info = prof_map.get(prof, {})
-        pref = prof_info.get('preferencia', None)
+        pref = prof_map.get(prof, {}).get('preferencia', None)
+        if not pref:
+            continue
         for (p,a) in assigns:
-            if pref:
-                if pref == 'mañana' and not is_morning_period(p):
-                    cost_soft += w_S['S3']; diagnostics['S3_prof_pref'] += 1
-                if pref == 'tarde' and is_morning_period(p):
-                    cost_soft += w_S['S3']; diagnostics['S3_prof_pref'] += 1
+            if pref == 'mañana' and not is_morning[p]:
+                cost_soft += w_S['S3']
+                if diagnostics is not None: diagnostics['S3_prof_pref'] += 1
+            if pref == 'tarde' and is_morning[p]:
+                cost_soft += w_S['S3']
+                if diagnostics is not None: diagnostics['S3_prof_pref'] += 1
+
+    if profile is not None: t = profile.lap('S3', t)
 
     # S4: evitar concentración de carga diaria: if hours per curriculum per day > limite, penalizar
     DAILY_LIMIT = 4  # blocks per day as soft limit
@@ -364,50 +678,38 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
             hours_day = len(plist)
             if hours_day > DAILY_LIMIT:
                 cost_soft += (hours_day - DAILY_LIMIT) * w_S['S4']
-                diagnostics['S4_daily_over'] += (hours_day - DAILY_LIMIT)
+                if diagnostics is not None: diagnostics['S4_daily_over'] += (hours_day - DAILY_LIMIT)
+
+    if profile is not None: t = profile.lap('S4', t)
 
     # S5: balance de aulas / uso infra: penalizar overuse relative to ideal
     total_blocks = sum(len(v) for v in ind.values())
-    ideal_per_aula = max(1, total_blocks / max(1, len(data['_aulas_list'])))
+    ideal_per_aula = max(1, total_blocks / max(1, len(index.aulas)))
     for a, usos in aula_usage.items():
         overuse = max(0, usos - ideal_per_aula)
         cost_soft += overuse * w_S['S5']
-        diagnostics['S5_overuse'] += overuse
-
-    # S6: evitar franjas extremas (first and last block)
-    first_blocks = set()
-    last_blocks = set()
-    # determine first and last block per day from period lists
-    for day, mapping in day_order.items():
-        rev = {v:k for k,v in mapping.items()}
-        # if mapping empty skip
-        if not mapping: continue
-        min_idx = min(mapping.values()); max_idx = max(mapping.values())
-        first_blocks.add(rev[min_idx]); last_blocks.add(rev[max_idx])
+        if diagnostics is not None: diagnostics['S5_overuse'] += overuse
+
+    if profile is not None: t = profile.lap('S5', t)
+
+    # S6: evitar franjas extremas (first and last block of each day)
     extremas = 0
-    for ccode, assigns in ind.items():
+    for ccode, assigns in encoded.items():
         for (p,a) in assigns:
-            if p in first_blocks or p in last_blocks:
+            if index.is_extreme[p]:
                 extremas += 1
     cost_soft += extremas * w_S['S6']
-    diagnostics['S6_extremas'] = extremas
+    if diagnostics is not None: diagnostics['S6_extremas'] = extremas
+
+    if profile is not None: t = profile.lap('S6', t)
 
     # S7: continuidad del curso: penalizar separación entre sesiones de un mismo curso
-    for ccode, plist in course_periods.items():
-        if not plist: continue
-        # convert periods to (day,index) and compute gaps in index units (~blocks)
-        idxs = []
-        for p in plist:
-            day = get_day_of_period(p)
-            idx = day_order.get(day, {}).get(p, None)
-            if idx is not None:
-                # encode combined index as day_index + offset per day to measure across day boundaries in hours (approx)
-                # For simplicity, use idx as is and penalize large gaps within same day
-                idxs.append((day, idx))
-        # compute gaps within same day
+    for ccode, assigns in encoded.items():
+        if not assigns: continue
+        # penalize large gaps (in blocks) between sessions on the same day
         idxs_by_day = defaultdict(list)
-        for day, idx in idxs:
-            idxs_by_day[day].append(idx)
+        for (p, a) in assigns:
+            idxs_by_day[day_of[p]].append(slot_in_day[p])
         total_gap = 0
         for day, arr in idxs_by_day.items():
             arr_sorted = sorted(arr)
@@ -416,7 +718,9 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
                 if gap > 0:
                     total_gap += gap
         cost_soft += total_gap * w_S['S7']
-        diagnostics['S7_gaps'] += total_gap
+        if diagnostics is not None: diagnostics['S7_gaps'] += total_gap
+
+    if profile is not None: t = profile.lap('S7', t)
 
     # S8: preferencia estudiantes por horario concentrado (favor morning)
     # count classes of curriculum outside preferred shift
@@ -425,13 +729,15 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
     for curr, days in curr_sched.items():
         for day, plist in days.items():
             for p in plist:
-                is_m = is_morning_period(p)
+                is_m = is_morning[p]
                 if turno_pref == 'mañana' and not is_m:
                     fuori += 1
                 if turno_pref == 'tarde' and is_m:
                     fuori += 1
     cost_soft += fuori * w_S['S8']
-    diagnostics['S8_fuera_bloque'] = fuori
+    if diagnostics is not None: diagnostics['S8_fuera_bloque'] = fuori
+
+    if profile is not None: t = profile.lap('S8', t)
 
     # S9: minimizar número total de días con clases por currículo
     dias_ideal = 3
@@ -439,17 +745,578 @@ def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any])
         dias_con_clase = sum(1 for d, ps in days.items() if ps)
         if dias_con_clase > dias_ideal:
             cost_soft += (dias_con_clase - dias_ideal) * w_S['S9']
-            diagnostics['S9_dias_extra'] += (dias_con_clase - dias_ideal)
+            if diagnostics is not None: diagnostics['S9_dias_extra'] += (dias_con_clase - dias_ideal)
+    if profile is not None: profile.lap('S9', t)
 
     fitness = cost_hard + cost_soft
-    diagnostics['hard'] = cost_hard
-    diagnostics['soft'] = cost_soft
-    diagnostics['fitness'] = fitness
+    if diagnostics is not None:
+        diagnostics['hard'] = cost_hard
+        diagnostics['soft'] = cost_soft
+        diagnostics['fitness'] = fitness
+    return fitness, fitness
+
+def evaluate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], with_diagnostics: bool = True) -> float:
+    """
+    Calcula la función objetivo: hard violations * M + sum(soft penalties)
+    Retorna (fitness_score, diagnostics_dict); con with_diagnostics=False no arma el
+    desglose y retorna (fitness_score, None).
+    """
+    diagnostics = defaultdict(int) if with_diagnostics else None
+    fitness, _ = _evaluate(ind, data, diagnostics)
     return fitness, diagnostics
 
+def evaluate_fitness(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) -> float:
+    """Camino rápido del GA: solo el costo escalar, sin diccionario de diagnósticos."""
+    return _evaluate(ind, data)[0]
+
+def evaluate_staged(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], cutoff: float) -> Tuple[float, float]:
+    """
+    Evaluación por etapas: duras primero y blandas solo si el individuo aún puede
+    quedar por debajo de cutoff. Retorna cotas (lower, upper) del fitness.
+    """
+    return _evaluate(ind, data, cutoff=cutoff)
+
+def soft_bounds(encoded: Dict[str, List[Tuple[int, AulaID]]], data: Dict[str, Any], w_S: Dict[str, float]) -> Tuple[float, float]:
+    """
+    Cotas (inferior, superior) del costo blando de un individuo, a partir de su número
+    de bloques. Cada término S se acota por un conteo; S1 puede ser negativo cuando un
+    currículo repite periodo en el mismo día.
+    """
+    index = data['_index']
+    course_to_currs = data.get('_course_to_currs', {})
+    n_blocks = sum(len(assigns) for assigns in encoded.values())
+    n_entries = sum(len(assigns) * len(course_to_currs.get(ccode, [])) for ccode, assigns in encoded.items())
+    day_len = max((len(ps) for ps in index.day_periods), default=0)
+    counts = {
+        'S1': (-n_entries, day_len * n_entries),
+        'S2': (0, n_entries),
+        'S3': (0, n_blocks),
+        'S4': (0, n_entries),
+        'S5': (0, n_blocks),
+        'S6': (0, n_blocks),
+        'S7': (0, day_len * n_blocks),
+        'S8': (0, n_entries),
+        'S9': (0, len(data.get('_curriculos_map', {})) * len(index.days)),
+    }
+    lo = hi = 0
+    for key, (c_lo, c_hi) in counts.items():
+        w = w_S[key]
+        lo += min(c_lo * w, c_hi * w)
+        hi += max(c_lo * w, c_hi * w)
+    return lo, hi
+
+# ---------------------------
+# Move-delta evaluation
+# ---------------------------
+class DeltaEvaluator:
+    """
+    Fitness of one individual kept up to date under single-block moves, for local search.
+    Holds the counters _evaluate builds (professor / aula / courses per period, curriculum
+    slots per day, aula usage) and on a move re-scores only what the block touches: its own
+    terms and H1/H2/H4 pairs, S5 of both aulas, S1/S4 of the curriculum-days, S2/S9 of its
+    curricula and S7 of its course. `fitness` matches evaluate() up to float rounding.
+    """
+    DAILY_LIMIT = 4  # same soft limits as _evaluate (S4, S9)
+    IDEAL_DAYS = 3
+
+    def __init__(self, ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]):
+        self.ind = {ccode: list(assigns) for ccode, assigns in ind.items()}
+        self.w_H, self.w_S = get_weights(data)
+        self.index = data['_index']
+        self.course_map = data['_courses_map']
+        self.prof_map = data['_profs_map']
+        self.course_to_currs = data.get('_course_to_currs', {})
+        self.turno_pref = data.get('preferencias', {}).get('turno_preferido', 'mañana')
+        total_blocks = sum(len(v) for v in ind.values())
+        self.ideal_per_aula = max(1, total_blocks / max(1, len(self.index.aulas)))
+        self.prof_period = defaultdict(int)      # (prof, p) -> blocks
+        self.aula_period = defaultdict(int)      # (aula, p) -> blocks
+        self.period_courses = defaultdict(Counter)  # p -> course id -> blocks
+        self.curr_day = defaultdict(list)        # (curr, day) -> slots in day
+        self.curr_shift = defaultdict(lambda: [0, 0])  # curr -> [afternoon, morning] blocks
+        self.aula_usage = defaultdict(int)
+        self.terms = {}  # group key -> its current soft cost (S1+S4, S2+S9, S7)
+        self.hard = 0
+        self.soft = 0
+        for ccode, assigns in self.ind.items():
+            self.hard += abs(len(assigns) - self.course_map[ccode]['_blocks_needed']) * self.w_H['H7']
+            for slot in assigns:
+                self._block(ccode, slot, 1)
+        for curr, day in list(self.curr_day):
+            self._refresh(('day', curr, day))
+        for curr in list(self.curr_shift):
+            self._refresh(('curr', curr))
+        for ccode in self.ind:
+            self._refresh(('course', ccode))
+
+    @property
+    def fitness(self) -> float:
+        return self.hard + self.soft
+
+    def _block(self, ccode: CourseCode, slot: Tuple[Period, AulaID], sign: int):
+        """Adds (sign=1) or removes (sign=-1) one block: per-block and pair terms, S5, curriculum slots."""
+        index, w_H, w_S = self.index, self.w_H, self.w_S
+        pname, a = slot
+        p = index.period_id[pname]
+        course = self.course_map[ccode]
+        prof = course.get('profesor')
+        hard = soft = 0
+        ai = index.aula_id.get(a)
+        if course.get('estudiantes', 30) > (index.aula_capacity[ai] if ai is not None else 999):
+            hard += w_H['H5']
+        required = course.get('aula_tipo')
+        if required and (ai is None or required in ('LAB', 'T') and index.aula_type[ai] != required):
+            hard += w_H['H6']
+        available = index.prof_available.get(prof)
+        if available is not None and not (available >> p) & 1:
+            hard += w_H['H3']
+        # pair terms: a block conflicts with the blocks already there (after removing itself)
+        if sign < 0: self.prof_period[(prof, p)] -= 1
+        if self.prof_period[(prof, p)] > 0: hard += w_H['H2']
+        if sign > 0: self.prof_period[(prof, p)] += 1
+        if sign < 0: self.aula_period[(a, p)] -= 1
+        if self.aula_period[(a, p)] > 0: hard += w_H['H4']
+        if sign > 0: self.aula_period[(a, p)] += 1
+        ci = index.course_id[ccode]
+        courses = self.period_courses[p]
+        if sign < 0: courses[ci] -= 1
+        conflicts = index.curr_conflicts[ci]
+        if conflicts:
+            hard += w_H['H1'] * sum(n for cj, n in courses.items() if (conflicts >> cj) & 1)
+        if sign > 0: courses[ci] += 1
+        morning = index.is_morning[p]
+        pref = self.prof_map.get(prof, {}).get('preferencia')
+        if (pref == 'mañana' and not morning) or (pref == 'tarde' and morning):
+            soft += w_S['S3']
+        if index.is_extreme[p]:
+            soft += w_S['S6']
+        currs = self.course_to_currs.get(ccode, [])
+        if (self.turno_pref == 'mañana' and not morning) or (self.turno_pref == 'tarde' and morning):
+            soft += len(currs) * w_S['S8']
+        self.hard += sign * hard
+        self.soft += sign * soft
+        before = max(0, self.aula_usage[a] - self.ideal_per_aula)
+        self.aula_usage[a] += sign
+        self.soft += (max(0, self.aula_usage[a] - self.ideal_per_aula) - before) * w_S['S5']
+        day, pos = index.day_of[p], index.slot_in_day[p]
+        for curr in currs:
+            if sign > 0: self.curr_day[(curr, day)].append(pos)
+            else: self.curr_day[(curr, day)].remove(pos)
+            self.curr_shift[curr][morning] += sign
+
+    def _refresh(self, key: Tuple):
+        """Re-scores one group term: ('day', curr, day) S1+S4, ('curr', curr) S2+S9, ('course', ccode) S7."""
+        w_S = self.w_S
+        if key[0] == 'day':
+            slots = self.curr_day.get(key[1:])
+            cost = 0
+            if slots:
+                cost = ((max(slots) - min(slots) + 1 - len(slots)) * w_S['S1']
+                        + max(0, len(slots) - self.DAILY_LIMIT) * w_S['S4'])
+        elif key[0] == 'curr':
+            curr = key[1]
+            days = sum(1 for d in range(len(self.index.days)) if self.curr_day.get((curr, d)))
+            cost = min(self.curr_shift[curr]) * w_S['S2'] + max(0, days - self.IDEAL_DAYS) * w_S['S9']
+        else:
+            by_day = defaultdict(list)
+            for pname, a in self.ind[key[1]]:
+                p = self.index.period_id[pname]
+                by_day[self.index.day_of[p]].append(self.index.slot_in_day[p])
+            gaps = 0
+            for arr in by_day.values():
+                arr.sort()
+                gaps += sum(max(0, arr[k] - arr[k - 1] - 1) for k in range(1, len(arr)))
+            cost = gaps * w_S['S7']
+        self.soft += cost - self.terms.get(key, 0)
+        self.terms[key] = cost
+
+    def move(self, ccode: CourseCode, i: int, slot: Tuple[Period, AulaID]) -> float:
+        """Reassigns block i of ccode to slot and returns the new fitness."""
+        old = self.ind[ccode][i]
+        if old == slot:
+            return self.fitness
+        self._block(ccode, old, -1)
+        self.ind[ccode][i] = slot
+        self._block(ccode, slot, 1)
+        index = self.index
+        days = {index.day_of[index.period_id[old[0]]], index.day_of[index.period_id[slot[0]]]}
+        for curr in self.course_to_currs.get(ccode, []):
+            for day in days:
+                self._refresh(('day', curr, day))
+            self._refresh(('curr', curr))
+        self._refresh(('course', ccode))
+        return self.fitness
+
+    def move_delta(self, ccode: CourseCode, i: int, slot: Tuple[Period, AulaID]) -> float:
+        """Fitness change of the move, leaving the individual as it was."""
+        old, before = self.ind[ccode][i], self.fitness
+        delta = self.move(ccode, i, slot) - before
+        self.move(ccode, i, old)
+        return delta
+
+# ---------------------------
+# Local search (memetic)
+# ---------------------------
+def local_search(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], limit: float = None,
+                 max_evals: int = None):
+    """
+    First-improvement hill climbing scored with DeltaEvaluator. Blocks are visited in
+    random order; for each one try moving it to another period, then to another aula of
+    the required type, then swapping aulas with another block in the same period, and
+    keep the first move that lowers the fitness. Passes repeat until one finds nothing,
+    `max_evals` moves have been scored or `limit` seconds run out (checked between
+    blocks). Returns (improved copy, fitness, accepted moves, evaluated moves).
+    """
+    end = time.perf_counter() + limit if limit else None
+    ev = DeltaEvaluator(ind, data)
+    sched = ev.ind
+    index = data['_index']
+    course_map = data['_courses_map']
+    blocks = [(ccode, i) for ccode, assigns in sched.items() for i in range(len(assigns))]
+    accepted = evals = 0
+
+    def spent():
+        return ((max_evals is not None and evals >= max_evals)
+                or (end is not None and time.perf_counter() >= end))
+
+    def try_move(ccode, i, slot):
+        nonlocal evals
+        evals += 1
+        current, old = ev.fitness, sched[ccode][i]
+        if ev.move(ccode, i, slot) < current - 1e-9: return True
+        ev.move(ccode, i, old)
+        return False
+
+    def try_swap(ccode, i, other, j):
+        nonlocal evals
+        evals += 1
+        current = ev.fitness
+        (p, a), (p2, a2) = sched[ccode][i], sched[other][j]
+        ev.move(ccode, i, (p, a2))
+        if ev.move(other, j, (p2, a)) < current - 1e-9: return True
+        ev.move(other, j, (p2, a2))
+        ev.move(ccode, i, (p, a))
+        return False
+
+    def improve(ccode, i, by_period):
+        p, a = sched[ccode][i]
+        for q in random.sample(index.periods, len(index.periods)):
+            if q != p and try_move(ccode, i, (q, a)): return True
+        required = course_map[ccode].get('aula_tipo')
+        aulas = index.aulas_by_type.get(required) or index.aulas
+        for b in random.sample(aulas, len(aulas)):
+            if b != a and try_move(ccode, i, (p, b)): return True
+        for other, j in by_period.get(p, ()):
+            q, b = sched[other][j]  # entries can be stale within a pass
+            if q == p and b != a and try_swap(ccode, i, other, j): return True
+        return False
+
+    improved = True
+    while improved and not spent():
+        improved = False
+        by_period = defaultdict(list)
+        for ccode, i in blocks:
+            by_period[sched[ccode][i][0]].append((ccode, i))
+        random.shuffle(blocks)
+        for ccode, i in blocks:
+            if spent(): break
+            if improve(ccode, i, by_period):
+                accepted += 1
+                improved = True
+    return sched, ev.fitness, accepted, evals
+
+class LocalSearchStats:
+    def __init__(self):
+        self.phases = 0
+        self.moves = 0
+        self.gain = 0.0
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        return (f"Local search: {self.phases} phases, {self.moves} moves accepted, "
+                f"total gain {self.gain:.2f}, {self.seconds:.2f}s")
+
+def local_search_phase(pop: List[Dict], fitnesses, data: Dict[str, Any], stats: LocalSearchStats,
+                       top: int = None, time_cap: float = None, evals: int = None):
+    """
+    Runs local_search on the `top` best individuals (default LS_TOP) in place. `evals`
+    (default LS_EVALS) and `time_cap` (default LS_TIME) are the budgets of the whole
+    phase, 0 = none, each split evenly among the individuals still to go; only the move
+    budget keeps a seeded run reproducible. Improved individuals get their exact
+    fitness in `fitnesses`.
+    """
+    top = top or LS_TOP
+    time_cap = LS_TIME if time_cap is None else time_cap
+    evals = LS_EVALS if evals is None else evals
+    start = time.perf_counter()
+    values = fitnesses.lower if isinstance(fitnesses, StagedFitnesses) else fitnesses
+    chosen = sorted(range(len(pop)), key=lambda i: values[i])[:top]
+    for n, i in enumerate(chosen):
+        limit = quota = None
+        if time_cap:
+            limit = (start + time_cap - time.perf_counter()) / (len(chosen) - n)
+            if limit <= 0: break
+        if evals:
+            quota = evals // (len(chosen) - n)
+            if quota <= 0: break
+        before = fitnesses[i]
+        improved, _, accepted, used = local_search(pop[i], data, limit, quota)
+        if evals: evals = max(0, evals - used)
+        if accepted:
+            f = evaluate_fitness(improved, data)  # exact value, free of delta rounding
+            pop[i] = improved
+            if isinstance(fitnesses, StagedFitnesses): fitnesses.set(i, f)
+            else: fitnesses[i] = f
+            stats.moves += accepted
+            stats.gain += before - f
+    stats.phases += 1
+    stats.seconds += time.perf_counter() - start
+    return fitnesses
+
+# ---------------------------
+# Batch evaluation (NumPy)
+# ---------------------------
+# The population is encoded as an integer array (pop x blocks x {period, aula})
+# using a fixed block layout: courses in data['_courses_map'] order, each with
+# its '_blocks_needed' blocks. Every term is then computed for all individuals
+# at once with bincount / scatter operations. Fitness matches evaluate().
+
+def build_batch_layout(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Precalcula las tablas enteras que usa batch_evaluate (una sola vez por problema).
+    """
+    w_H, w_S = get_weights(data)
+    course_map = data['_courses_map']
+    prof_map = data['_profs_map']
+    course_to_currs = data.get('_course_to_currs', {})
+    index = data['_index']
+
+    course_codes = list(course_map.keys())
+    n_courses, n_periods, n_aulas = len(course_codes), len(index.periods), len(index.aulas)
+
+    # periods: day id, position within day, morning flag, first/last of day
+    day_of = np.array(index.day_of, dtype=np.int64)
+    pos_of = np.array(index.slot_in_day, dtype=np.int64)
+    morning = np.array(index.is_morning, dtype=bool)
+    extreme = np.array(index.is_extreme, dtype=bool)
+
+    # blocks
+    block_course = []
+    for ci, ccode in enumerate(course_codes):
+        block_course.extend([ci] * course_map[ccode]['_blocks_needed'])
+    block_course = np.array(block_course, dtype=np.int64)
+
+    # H1: course x course "shares a curriculum" matrix, expanded from the index bitsets
+    currs = list(data.get('_curriculos_map', {}).keys())
+    curr_index = {c: i for i, c in enumerate(currs)}
+    # (course_codes follows _courses_map order, so course ids match row indices)
+    shares_curr = np.array([[(mask >> cj) & 1 for cj in range(n_courses)]
+                            for mask in index.curr_conflicts], dtype=np.int64).reshape(n_courses, n_courses)
+
+    # H2: professor id per course (None is a professor key too, as in evaluate)
+    prof_names = []
+    course_prof = np.zeros(n_courses, dtype=np.int64)
+    for ci, ccode in enumerate(course_codes):
+        name = course_map[ccode].get('profesor')
+        if name not in prof_names:
+            prof_names.append(name)
+        course_prof[ci] = prof_names.index(name)
+
+    # per (course, period) and per (course, aula) penalty tables
+    hard_cp = np.zeros((n_courses, n_periods), dtype=np.int64)
+    soft_cp = np.zeros((n_courses, n_periods), dtype=np.int64)
+    hard_ca = np.zeros((n_courses, n_aulas), dtype=np.int64)
+    for ci, ccode in enumerate(course_codes):
+        course = course_map[ccode]
+        available = index.prof_available.get(course.get('profesor'))
+        pref = prof_map.get(course.get('profesor'), {}).get('preferencia', None)
+        for pi in range(n_periods):
+            if available is not None and not (available >> pi) & 1:
+                hard_cp[ci, pi] += w_H['H3']
+            if pref == 'mañana' and not morning[pi]:
+                soft_cp[ci, pi] += w_S['S3']
+            if pref == 'tarde' and morning[pi]:
+                soft_cp[ci, pi] += w_S['S3']
+            if extreme[pi]:
+                soft_cp[ci, pi] += w_S['S6']
+        est = course.get('estudiantes', 30)
+        required = course.get('aula_tipo', None)
+        for ai in range(n_aulas):
+            if est > index.aula_capacity[ai]:
+                hard_ca[ci, ai] += w_H['H5']
+            atype = index.aula_type[ai]
+            if (required == 'LAB' and atype != 'LAB') or (required == 'T' and atype != 'T'):
+                hard_ca[ci, ai] += w_H['H6']
+
+    # curriculum entries: one per (block, curriculum of its course)
+    entry_block, entry_curr = [], []
+    for b, ci in enumerate(block_course):
+        for curr in course_to_currs.get(course_codes[ci], []):
+            entry_block.append(b)
+            entry_curr.append(curr_index[curr])
+
+    pref_turno = data.get('preferencias', {}).get('turno_preferido', 'mañana')
+    if pref_turno == 'mañana':
+        outside_pref = ~morning
+    elif pref_turno == 'tarde':
+        outside_pref = morning.copy()
+    else:
+        outside_pref = np.zeros(n_periods, dtype=bool)
+
+    return {
+        'w_H': w_H, 'w_S': w_S,
+        'course_codes': course_codes,
+        'period_index': index.period_id, 'aula_index': index.aula_id,
+        'n_periods': n_periods, 'n_aulas': n_aulas, 'n_days': len(index.days),
+        'n_currs': len(currs), 'n_profs': len(prof_names),
+        'day_of': day_of, 'pos_of': pos_of, 'morning': morning, 'outside_pref': outside_pref,
+        'blocks_per_course': [course_map[c]['_blocks_needed'] for c in course_codes],
+        'block_course': block_course, 'block_prof': course_prof[block_course],
+        'shares_curr': shares_curr,
+        'hard_cp': hard_cp, 'soft_cp': soft_cp, 'hard_ca': hard_ca,
+        'entry_block': np.array(entry_block, dtype=np.int64),
+        'entry_curr': np.array(entry_curr, dtype=np.int64),
+        'ideal_per_aula': max(1, len(block_course) / max(1, n_aulas)),
+    }
+
+def encode_population(pop: List[Dict[str, List[Tuple[Period, AulaID]]]], layout: Dict[str, Any]):
+    """
+    Codifica la población como array (pop x bloques x 2) de índices (periodo, aula).
+    Retorna (array, lista de posiciones codificadas); los individuos que no encajan
+    en el layout (bloques de más/menos, aula o periodo desconocido) se omiten.
+    """
+    period_index = layout['period_index']
+    aula_index = layout['aula_index']
+    codes = layout['course_codes']
+    n_blocks = len(layout['block_course'])
+    needed = layout['blocks_per_course']
+    rows, encoded = [], []
+    for i, ind in enumerate(pop):
+        if len(ind) != len(codes):
+            continue
+        row = []
+        try:
+            for ccode, n in zip(codes, needed):
+                assigns = ind[ccode]
+                if len(assigns) != n:
+                    raise KeyError(ccode)
+                for (p, a) in assigns:
+                    row.append((period_index[p], aula_index[a]))
+        except KeyError:
+            continue
+        rows.append(row)
+        encoded.append(i)
+    arr = np.array(rows, dtype=np.int64).reshape(len(rows), n_blocks, 2)
+    return arr, encoded
+
+def batch_evaluate(pop: List[Dict[str, List[Tuple[Period, AulaID]]]], data: Dict[str, Any]) -> List[float]:
+    """
+    Evalúa toda la población a la vez con NumPy. Devuelve solo el fitness de cada
+    individuo (mismo valor que evaluate); los diagnósticos se piden a evaluate().
+    Los individuos que no encajan en el layout se evalúan con evaluate().
+    """
+    layout = data.get('_batch_layout')
+    if layout is None:
+        layout = data['_batch_layout'] = build_batch_layout(data)
+    profile = EVAL_PROFILE
+    if profile is not None: t = time.perf_counter()
+    arr, encoded = encode_population(pop, layout)
+    fitnesses = [None] * len(pop)
+    if encoded:
+        hard, soft = _batch_costs(arr, layout)
+        if profile is not None:
+            profile.evaluations += len(encoded)
+            profile.lap('batch', t)
+        for k, i in enumerate(encoded):
+            fitnesses[i] = float(hard[k] + soft[k])
+    for i, f in enumerate(fitnesses):
+        if f is None:
+            fitnesses[i] = evaluate(pop[i], data)[0]
+    return fitnesses
+
+def _batch_costs(arr, layout: Dict[str, Any]):
+    """Costos duro (int) y blando (float) para un array codificado (pop x bloques x 2)."""
+    w_H, w_S = layout['w_H'], layout['w_S']
+    n_pop, n_blocks = arr.shape[0], arr.shape[1]
+    P, A, D, R = layout['n_periods'], layout['n_aulas'], layout['n_days'], layout['n_currs']
+    C = len(layout['course_codes'])
+    period = arr[:, :, 0]
+    aula = arr[:, :, 1]
+    block_course = layout['block_course']
+    row = np.arange(n_pop)[:, None]
+
+    hard = np.zeros(n_pop, dtype=np.int64)
+    soft = np.zeros(n_pop, dtype=np.float64)
+
+    # H1: pairs of blocks in the same period whose courses share a curriculum
+    n = np.bincount((row * P * C + period * C + block_course).ravel(),
+                    minlength=n_pop * P * C).reshape(n_pop, P, C)
+    shares = layout['shares_curr']
+    pairs = (((n @ shares) * n).sum(axis=(1, 2)) - (n * np.diag(shares)).sum(axis=(1, 2))) // 2
+    hard += pairs * w_H['H1']
+
+    # H2 / H4: extra classes per (professor, period) and (aula, period)
+    prof_cnt = np.bincount((row * layout['n_profs'] * P + layout['block_prof'] * P + period).ravel(),
+                           minlength=n_pop * layout['n_profs'] * P).reshape(n_pop, -1)
+    hard += (n_blocks - np.count_nonzero(prof_cnt, axis=1)) * w_H['H2']
+    aula_cnt = np.bincount((row * A * P + aula * P + period).ravel(),
+                           minlength=n_pop * A * P).reshape(n_pop, -1)
+    hard += (n_blocks - np.count_nonzero(aula_cnt, axis=1)) * w_H['H4']
+
+    # H3 / H5 / H6 and S3 / S6: per-block lookup tables (H7 is 0 by layout)
+    hard += layout['hard_cp'][block_course, period].sum(axis=1)
+    hard += layout['hard_ca'][block_course, aula].sum(axis=1)
+    soft += layout['soft_cp'][block_course, period].sum(axis=1)
+
+    # curriculum schedules: (individual, curriculum, day) groups
+    if len(layout['entry_block']):
+        e_period = period[:, layout['entry_block']]
+        e_day = layout['day_of'][e_period]
+        e_pos = layout['pos_of'][e_period]
+        group = (row * R * D + layout['entry_curr'] * D + e_day).ravel()
+        size = n_pop * R * D
+        count = np.bincount(group, minlength=size)
+        lo = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+        hi = np.full(size, -1, dtype=np.int64)
+        np.minimum.at(lo, group, e_pos.ravel())
+        np.maximum.at(hi, group, e_pos.ravel())
+        used = count > 0
+        gaps = np.where(used, hi - lo + 1 - count, 0).reshape(n_pop, -1).sum(axis=1)
+        soft += gaps * w_S['S1']                                           # S1
+        curr_group = (row * R + layout['entry_curr']).ravel()
+        morning_cnt = np.bincount(curr_group, weights=layout['morning'][e_period].ravel(),
+                                  minlength=n_pop * R).astype(np.int64)
+        total_cnt = np.bincount(curr_group, minlength=n_pop * R)
+        soft += np.minimum(morning_cnt, total_cnt - morning_cnt).reshape(n_pop, R).sum(axis=1) * w_S['S2']
+        soft += np.maximum(count - 4, 0).reshape(n_pop, -1).sum(axis=1) * w_S['S4']
+        days_used = used.reshape(n_pop, R, D).sum(axis=2)
+        soft += np.maximum(days_used - 3, 0).sum(axis=1) * w_S['S9']
+        soft += layout['outside_pref'][e_period].sum(axis=1) * w_S['S8']
+
+    # S5: aula overuse relative to ideal
+    usage = np.bincount((row * A + aula).ravel(), minlength=n_pop * A).reshape(n_pop, A)
+    soft += np.maximum(usage - layout['ideal_per_aula'], 0).sum(axis=1) * w_S['S5']
+
+    # S7: gaps between sessions of a course within the same day
+    key = np.sort(block_course * D * P + layout['day_of'][period] * P + layout['pos_of'][period], axis=1)
+    same_group = (key[:, 1:] // P) == (key[:, :-1] // P)
+    soft += np.where(same_group, np.maximum(np.diff(key, axis=1) - 1, 0), 0).sum(axis=1) * w_S['S7']
+
+    return hard, soft
+
 # ---------------------------
 # Repair operator (greedy & simple)
 # ---------------------------
+def own_gene(ind: Dict[str, List[Tuple[Period, AulaID]]], owned: set, ccode: CourseCode) -> List[Tuple[Period, AulaID]]:
+    """
+    Copy-on-write: children share their parents' course lists until an operator writes
+    one. Gives `ind` its own copy of the course's list on the first write and returns it.
+    """
+    if ccode not in owned:
+        ind[ccode] = list(ind[ccode])
+        owned.add(ccode)
+    return ind[ccode]
+
 def repair(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) -> Dict[str, List[Tuple[Period, AulaID]]]:
     """
     Aplica reglas greedy para reducir violaciones duras:
@@ -457,14 +1324,27 @@ def repair(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) ->
     - Si profesor no disponible en un periodo, intenta mover esa asignación a otro periodo disponible for that professor.
     - Si aula capacity < estudiantes, try change to larger aula.
     Nota: no garantiza corregir todo, pero mejora la factibilidad.
+    Retorna un dict nuevo; solo copia las listas de los cursos que modifica.
     """
-    new = copy.deepcopy(ind)
-    aulas = data['_aulas_list']
-    aulas_by_type = defaultdict(list)
-    for a in aulas:
-        aulas_by_type[a['tipo']].append(a)
+    new = dict(ind)
+    owned = set()
+    index = data['_index']
+    aulas_by_type = index.aulas_by_type
     courses = data['_courses_map']
-    profs = data['_profs_map']
+
+    # occupancy index: (aula, period) -> blocks there, kept up to date on every move so
+    # "is this aula free at p?" is a lookup instead of a scan over all blocks
+    occupancy = Counter((a, p) for assigns in new.values() for (p, a) in assigns)
+
+    def move(ccode, idx, slot):
+        p_old, a_old = new[ccode][idx]
+        occupancy[(a_old, p_old)] -= 1
+        occupancy[(slot[1], slot[0])] += 1
+        own_gene(new, owned, ccode)[idx] = slot
+
+    def available_mask(ccode):
+        # None when the professor declares no availability (no restriction)
+        return index.prof_available.get(courses[ccode].get('profesor'))
 
     # 1) fix aula conflicts per period: for each period, find aulas with >1 assignment
     aula_period = defaultdict(lambda: defaultdict(list))  # aula->period->list of (course, index)
@@ -475,178 +1355,859 @@ def repair(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) ->
         for p, lst in permap.items():
             if len(lst) <= 1: continue
             # need to move all but one to other aulas same tipo
-            a_type = None
-            for a in aulas:
-                if a['id'] == aula:
-                    a_type = a['tipo']; break
+            ai = index.aula_id.get(aula)
+            a_type = index.aula_type[ai] if ai is not None else None
             # candidate aulas of same type that are free at p
-            candidates = [aa for aa in aulas_by_type[a_type] if aa['id'] != aula]
-            free_candidates = []
-            for c in candidates:
-                # check if c['id'] is used at p anywhere
-                used = any( (p == assign_p and c['id'] == assign_a) for cc, assigns in new.items() for (assign_p,assign_a) in assigns)
-                if not used:
-                    free_candidates.append(c['id'])
+            candidates = [aid for aid in aulas_by_type.get(a_type, ()) if aid != aula]
+            free_candidates = [c for c in candidates if not occupancy[(c, p)]]
             # move excess to free candidates
             moved = 0
             for (ccode, idx) in lst[1:]:
                 if free_candidates:
                     new_a = free_candidates.pop(0)
-                    new[ccode][idx] = (p, new_a)
+                    move(ccode, idx, (p, new_a))
                     moved += 1
                 else:
                     # try change period to other period where aula is free
-                    for p2 in data['periodos']:
+                    prof_av = available_mask(ccode)
+                    for pi2, p2 in enumerate(index.periods):
                         if p2 == p: continue
                         # is aula free at p2?
-                        used = any( (p2 == assign_p and aula == assign_a) for cc, assigns in new.items() for (assign_p,assign_a) in assigns)
-                        if not used:
+                        if not occupancy[(aula, p2)]:
                             # check professor availability
-                            prof = courses[ccode].get('profesor')
-                            prof_av = profs.get(prof, {}).get('disponibilidad', [])
-                            if prof_av and p2 not in prof_av:
+                            if prof_av is not None and not (prof_av >> pi2) & 1:
                                 continue
                             # assign to p2 at same aula
-                            new[ccode][idx] = (p2, aula)
+                            move(ccode, idx, (p2, aula))
                             moved += 1
                             break
 
     # 2) fix professor unavailable: move to available period if possible
+    any_aula = aulas_by_type.get('T', ()) + aulas_by_type.get('LAB', ())
     for ccode, assigns in list(new.items()):
-        prof = courses[ccode].get('profesor')
-        prof_av = set(profs.get(prof, {}).get('disponibilidad', []))
-        if not prof_av: 
+        mask = available_mask(ccode)
+        if mask is None:
             continue
+        prof_av = [index.periods[i] for i in range(len(index.periods)) if (mask >> i) & 1]
         for idx, (p,a) in enumerate(assigns):
-            if p not in prof_av:
+            if not (mask >> index.period_id[p]) & 1:
                 # try find p2 in prof_av where aula 'a' is free
                 assigned = False
                 for p2 in prof_av:
                     # check aula free at p2
-                    used = any( (p2 == assign_p and a == assign_a) for cc, assigns in new.items() for (assign_p,assign_a) in assigns)
-                    if not used:
-                        new[ccode][idx] = (p2, a)
+                    if not occupancy[(a, p2)]:
+                        move(ccode, idx, (p2, a))
                         assigned = True
                         break
                 if not assigned:
                     # try other aula at some available p2
                     for p2 in prof_av:
-                        for aa in aulas_by_type.get('T', []) + aulas_by_type.get('LAB', []):
-                            aid = aa['id']
-                            used = any( (p2 == assign_p and aid == assign_a) for cc, assigns in new.items() for (assign_p,assign_a) in assigns)
-                            if not used:
-                                new[ccode][idx] = (p2, aid)
+                        for aid in any_aula:
+                            if not occupancy[(aid, p2)]:
+                                move(ccode, idx, (p2, aid))
                                 assigned = True
                                 break
                         if assigned: break
 
     # 3) fix capacity: try change aula for bigger one
+    by_capacity = sorted(range(len(index.aulas)), key=lambda i: index.aula_capacity[i])
     for ccode, assigns in new.items():
         est = courses[ccode].get('estudiantes', 30)
+        candidates = None
         for idx, (p,a) in enumerate(assigns):
-            cap = next((x['capacidad'] for x in aulas if x['id'] == a), None)
-            if cap is None: continue
-            if est > cap:
+            ai = index.aula_id.get(a)
+            if ai is None: continue
+            if est > index.aula_capacity[ai]:
                 # find larger aula free at p
-                candidates = sorted([x for x in aulas if x['capacidad'] >= est], key=lambda x: x['capacidad'])
+                if candidates is None:
+                    candidates = [index.aulas[i] for i in by_capacity if index.aula_capacity[i] >= est]
                 for cand in candidates:
-                    used = any( (p == assign_p and cand['id'] == assign_a) for cc, assigns2 in new.items() for (assign_p,assign_a) in assigns2)
-                    if not used:
-                        new[ccode][idx] = (p, cand['id'])
+                    if not occupancy[(cand, p)]:
+                        move(ccode, idx, (p, cand))
                         break
     return new
 
+# ---------------------------
+# Structured moves
+# ---------------------------
+# Neighbourhood moves that mutate() can use instead of a random reassignment. Each one
+# tries a few destinations and applies the first that passes Occupancy.admits, a cheap
+# pre-check on the moved blocks only, so most offspring don't gain hard conflicts.
+MOVE_TRIES = 8        # destinations a move tries before giving up
+MAX_KEMPE_CHAIN = 12  # blocks in a Kempe chain
+
+class Occupancy:
+    """
+    Per-period occupancy of one individual (professors, aulas, courses and blocks),
+    built once per mutate() call and kept up to date by apply().
+    """
+    def __init__(self, ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]):
+        self.ind = ind
+        self.index = data['_index']
+        self.course_map = data['_courses_map']
+        self.profs = defaultdict(int)    # (prof, p) -> blocks
+        self.aulas = defaultdict(int)    # (aula, p) -> blocks
+        self.courses = defaultdict(Counter)  # p -> course id -> blocks
+        self.blocks = defaultdict(dict)  # p -> {(ccode, i): None}, insertion ordered
+        for ccode, assigns in ind.items():
+            for i, slot in enumerate(assigns):
+                self._count(ccode, i, slot, 1)
+
+    def _count(self, ccode: CourseCode, i: int, slot: Tuple[Period, AulaID], sign: int):
+        p = self.index.period_id[slot[0]]
+        self.profs[(self.course_map[ccode].get('profesor'), p)] += sign
+        self.aulas[(slot[1], p)] += sign
+        self.courses[p][self.index.course_id[ccode]] += sign
+        if sign > 0: self.blocks[p][(ccode, i)] = None
+        else: self.blocks[p].pop((ccode, i), None)
+
+    def apply(self, owned: set, changes: List[Tuple[CourseCode, int, Tuple[Period, AulaID]]]):
+        """Applies (ccode, i, new slot) changes, copying each course list on first write."""
+        for ccode, i, _ in changes:
+            self._count(ccode, i, self.ind[ccode][i], -1)
+        for ccode, i, slot in changes:
+            own_gene(self.ind, owned, ccode)[i] = slot
+            self._count(ccode, i, slot, 1)
+
+    def _violations(self, slots) -> int:
+        """Blocks in `slots` with an unavailable (H3) or double-booked (H2) professor, a shared aula (H4) or a curriculum clash (H1)."""
+        index = self.index
+        total = 0
+        for ccode, _, (period, aula) in slots:
+            p = index.period_id[period]
+            prof = self.course_map[ccode].get('profesor')
+            available = index.prof_available.get(prof)
+            if available is not None and not (available >> p) & 1: total += 1
+            if self.profs[(prof, p)] > 1: total += 1
+            if self.aulas[(aula, p)] > 1: total += 1
+            ci = index.course_id[ccode]
+            conflicts = index.curr_conflicts[ci]
+            if conflicts and sum(n for cj, n in self.courses[p].items() if (conflicts >> cj) & 1) > ((conflicts >> ci) & 1):
+                total += 1
+        return total
+
+    def admits(self, changes) -> bool:
+        """The moved blocks end up with no more H1-H4 violations than they had (on a feasible schedule: a free destination)."""
+        old = [(ccode, i, self.ind[ccode][i]) for ccode, i, _ in changes]
+        before = self._violations(old)
+        for ccode, i, slot in old: self._count(ccode, i, slot, -1)
+        for ccode, i, slot in changes: self._count(ccode, i, slot, 1)
+        after = self._violations(changes)
+        for ccode, i, slot in changes: self._count(ccode, i, slot, -1)
+        for ccode, i, slot in old: self._count(ccode, i, slot, 1)
+        return after <= before
+
+def swap_move(occ: Occupancy, owned: set, ccode: CourseCode, i: int) -> bool:
+    """Swaps the block's period with a block of another course; both keep their aulas."""
+    ind, periods = occ.ind, occ.index.periods
+    period, aula = ind[ccode][i]
+    for _ in range(MOVE_TRIES):
+        q = random.randrange(len(periods))
+        candidates = [b for b in occ.blocks[q] if b[0] != ccode]
+        if periods[q] == period or not candidates: continue
+        other, j = random.choice(candidates)
+        period2, aula2 = ind[other][j]
+        changes = [(ccode, i, (period2, aula)), (other, j, (period, aula2))]
+        if occ.admits(changes):
+            occ.apply(owned, changes)
+            return True
+    return False
+
+def kempe_chain(occ: Occupancy, ccode: CourseCode, i: int, q: int):
+    """
+    Kempe chain of the block between its period p and period q on the conflict graph
+    (same professor, same aula or a shared curriculum): every block in the destination
+    period that clashes with a chain block goes to the opposite period.
+    Returns {block: destination period}, or None past MAX_KEMPE_CHAIN blocks.
+    """
+    ind, index = occ.ind, occ.index
+    p = index.period_id[ind[ccode][i][0]]
+    chain = {(ccode, i): q}
+    todo = [(ccode, i)]
+    while todo:
+        block = todo.pop()
+        dest = chain[block]
+        aula = ind[block[0]][block[1]][1]
+        prof = occ.course_map[block[0]].get('profesor')
+        conflicts = index.curr_conflicts[index.course_id[block[0]]]
+        for other in occ.blocks[dest]:
+            if other in chain: continue
+            clash = (ind[other[0]][other[1]][1] == aula
+                     or (prof is not None and occ.course_map[other[0]].get('profesor') == prof)
+                     or (conflicts >> index.course_id[other[0]]) & 1)
+            if clash:
+                chain[other] = p if dest == q else q
+                todo.append(other)
+        if len(chain) > MAX_KEMPE_CHAIN: return None
+    return chain
+
+def kempe_move(occ: Occupancy, owned: set, ccode: CourseCode, i: int) -> bool:
+    """Moves the block to another period by exchanging its Kempe chain between the two periods."""
+    ind, index = occ.ind, occ.index
+    p = index.period_id[ind[ccode][i][0]]
+    for _ in range(MOVE_TRIES):
+        q = random.randrange(len(index.periods))
+        chain = kempe_chain(occ, ccode, i, q) if q != p else None
+        if not chain: continue
+        changes = [(other, j, (index.periods[dest], ind[other][j][1])) for (other, j), dest in chain.items()]
+        if occ.admits(changes):
+            occ.apply(owned, changes)
+            return True
+    return False
+
+def run_move(occ: Occupancy, owned: set, ccode: CourseCode, i: int) -> bool:
+    """
+    Moves the run of consecutive same-day blocks holding the block, as a unit, to another
+    day that has no other block of the course (so runs are neither split nor merged).
+    """
+    ind, index = occ.ind, occ.index
+    assigns = ind[ccode]
+    encoded = [index.period_id[slot[0]] for slot in assigns]
+    day = index.day_of[encoded[i]]
+    same_day = sorted((index.slot_in_day[p], k) for k, p in enumerate(encoded) if index.day_of[p] == day)
+    run = []
+    for pos, k in same_day:
+        if run and pos != index.slot_in_day[encoded[run[-1]]] + 1:
+            if i in run: break
+            run = []
+        run.append(k)
+    busy = {index.day_of[p] for k, p in enumerate(encoded) if k not in run}
+    for _ in range(MOVE_TRIES):
+        new_day = random.randrange(len(index.days))
+        day_periods = index.day_periods[new_day]
+        if new_day == day or new_day in busy or len(day_periods) < len(run): continue
+        start = random.randrange(len(day_periods) - len(run) + 1)
+        changes = [(ccode, k, (index.periods[p], assigns[k][1]))
+                   for k, p in zip(run, day_periods[start:start + len(run)])]
+        if occ.admits(changes):
+            occ.apply(owned, changes)
+            return True
+    return False
+
+STRUCTURED = (swap_move, kempe_move, run_move)
+
 # ---------------------------
 # Genetic operators
 # ---------------------------
-def tournament_selection(pop: List[Dict], fitnesses: List[float], k=TOURNAMENT_K) -> Dict:
-    i = random.randrange(len(pop))
-    best = i; best_fit = fitnesses[i]
+def is_better(fitnesses, j: int, i: int) -> bool:
+    # fitnesses[j] < fitnesses[i], resolving staged bounds only when needed
+    if isinstance(fitnesses, StagedFitnesses):
+        return fitnesses.better(j, i)
+    return fitnesses[j] < fitnesses[i]
+
+def tournament_selection(pop: List[Dict], fitnesses: List[float], k=None) -> int:
+    # returns the winner's index; the caller reads pop[i] without copying it.
+    # k defaults to TOURNAMENT_K read at call time, so a value set after import applies
+    k = k or TOURNAMENT_K
+    best = random.randrange(len(pop))
     for _ in range(k-1):
         j = random.randrange(len(pop))
-        if fitnesses[j] < best_fit:
-            best = j; best_fit = fitnesses[j]
-    return copy.deepcopy(pop[best])
+        if is_better(fitnesses, j, best):
+            best = j
+    return best
 
 def crossover(parent1: Dict[str, List[Tuple[Period, AulaID]]], parent2: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any]) -> Tuple[Dict, Dict]:
-    # Simple course-based crossover: for each course, swap with prob 0.5
+    # Simple course-based crossover: for each course, swap with prob 0.5.
+    # Children share the parents' course lists (copy-on-write, see own_gene).
     child1 = {}
     child2 = {}
     for ccode in data['_courses_map'].keys():
         if random.random() < 0.5:
-            child1[ccode] = copy.deepcopy(parent1[ccode])
-            child2[ccode] = copy.deepcopy(parent2[ccode])
+            child1[ccode] = parent1[ccode]
+            child2[ccode] = parent2[ccode]
         else:
-            child1[ccode] = copy.deepcopy(parent2[ccode])
-            child2[ccode] = copy.deepcopy(parent1[ccode])
+            child1[ccode] = parent2[ccode]
+            child2[ccode] = parent1[ccode]
     return child1, child2
 
-def mutate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], mut_prob=MUTATION_PROB) -> Dict[str, List[Tuple[Period, AulaID]]]:
-    new = copy.deepcopy(ind)
-    periods = data['periodos']
-    aulas = data['_aulas_list']
+def mutate(ind: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], mut_prob=MUTATION_PROB,
+           structured: float = None) -> Dict[str, List[Tuple[Period, AulaID]]]:
+    """
+    Mutates each course with probability mut_prob. A `structured` share of those (default
+    STRUCTURED_MOVES) uses one of the STRUCTURED moves instead; if it finds no destination
+    that passes its pre-check the course is left as it was.
+    """
+    new = dict(ind)  # course lists are copied only when mutated (own_gene)
+    owned = set()
+    index = data['_index']
+    periods = index.periods
+    aulas = index.aulas
+    structured = STRUCTURED_MOVES if structured is None else structured
+    occ = None  # Occupancy, built on the first structured move
     for ccode in new.keys():
         if random.random() < mut_prob:
             # randomly choose mutation type: move one block period, swap aula, relocate block
             assigns = new[ccode]
             if not assigns: continue
             idx = random.randrange(len(assigns))
+            if structured and random.random() < structured:
+                if occ is None: occ = Occupancy(new, data)
+                random.choice(STRUCTURED)(occ, owned, ccode, idx)
+                continue
             typ = random.choice([1,2,3])
+            slot = None
             if typ == 1:
                 # change period to random (keep aula)
                 new_period = random.choice(periods)
-                new[ccode][idx] = (new_period, assigns[idx][1])
+                slot = (new_period, assigns[idx][1])
             elif typ == 2:
                 # change aula to another of same tipo if possible
                 a_current = assigns[idx][1]
-                a_tipo = next((x['tipo'] for x in aulas if x['id']==a_current), 'T')
-                candidates = [x['id'] for x in aulas if x['tipo'] == a_tipo and x['id'] != a_current]
+                ai = index.aula_id.get(a_current)
+                a_tipo = index.aula_type[ai] if ai is not None else 'T'
+                candidates = [x for x in index.aulas_by_type.get(a_tipo, ()) if x != a_current]
                 if candidates:
                     new_a = random.choice(candidates)
-                    new[ccode][idx] = (assigns[idx][0], new_a)
+                    slot = (assigns[idx][0], new_a)
             else:
                 # relocate block entirely (period + aula)
                 new_period = random.choice(periods)
-                new_aula = random.choice(aulas)['id']
-                new[ccode][idx] = (new_period, new_aula)
+                new_aula = random.choice(aulas)
+                slot = (new_period, new_aula)
+            if slot is None: continue
+            if occ is not None: occ.apply(owned, [(ccode, idx, slot)])  # keep the occupancy current
+            else: own_gene(new, owned, ccode)[idx] = slot
     return new
 
+def vary(child: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], seed: int, mut_prob: float = None) -> Dict[str, List[Tuple[Period, AulaID]]]:
+    """
+    Mutate + repair one child on its own random stream (PARALLEL_OPS). The result
+    depends only on the seed, so it is the same in any process; the global
+    random state is restored afterwards.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return repair(mutate(child, data, MUTATION_PROB if mut_prob is None else mut_prob), data)
+    finally:
+        random.setstate(state)
+
+# ---------------------------
+# Process pool
+# ---------------------------
+_worker_data = None  # problem data inside each worker process, received once
+
+def operator_params() -> Dict[str, Any]:
+    """Globals the operators read inside workers: inherited with fork, but a spawn / forkserver worker would see the defaults."""
+    return {'MUTATION_PROB': MUTATION_PROB, 'CROSSOVER_PROB': CROSSOVER_PROB,
+            'TOURNAMENT_K': TOURNAMENT_K, 'STRUCTURED_MOVES': STRUCTURED_MOVES}
+
+def _init_worker(data: Dict[str, Any], params: Dict[str, Any]):
+    global _worker_data, EVAL_PROFILE
+    globals().update(params)
+    data['_index'] = build_problem_index(data)  # mappingproxy tables are rebuilt, not pickled
+    _worker_data = data
+    EVAL_PROFILE = None  # the profile only covers evaluations in the main process
+
+def num_workers() -> int:
+    return WORKERS if WORKERS > 0 else (os.cpu_count() or 1)
+
+def chunk_size(tasks: int) -> int:
+    """About 4 chunks per worker."""
+    return max(1, tasks // (4 * num_workers()))
+
+def make_pool(data: Dict[str, Any], mp_context=None):
+    """
+    Process pool for the GA, or None when WORKERS is 1. The problem data and
+    operator_params() reach each worker once through the initializer (inherited with
+    fork, pickled once with spawn). `mp_context` defaults to the platform's start method.
+    """
+    if num_workers() <= 1:
+        return None
+    shared = {k: v for k, v in data.items() if k not in ('_index', '_batch_layout')}
+    return ProcessPoolExecutor(max_workers=num_workers(), mp_context=mp_context, initializer=_init_worker,
+                               initargs=(shared, operator_params()))
+
+def _worker_evaluate(task) -> Tuple[float, float]:
+    ind, cutoff = task
+    if cutoff is None:
+        f = evaluate_fitness(ind, _worker_data)
+        return f, f
+    return evaluate_staged(ind, _worker_data, cutoff)
+
+def _worker_vary(task):
+    child, seed, mut_prob = task
+    return vary(child, _worker_data, seed, mut_prob)
+
+def vary_batch(pending: List[Tuple[Dict, int]], data: Dict[str, Any], pool=None) -> List[Dict]:
+    """Mutate + repair a batch of (child, seed) pairs, in the pool if there is one."""
+    if pool is not None:
+        tasks = [(child, seed, MUTATION_PROB) for child, seed in pending]
+        return list(pool.map(_worker_vary, tasks, chunksize=chunk_size(len(tasks))))
+    return [vary(child, data, seed) for child, seed in pending]
+
+# ---------------------------
+# Fitness cache
+# ---------------------------
+def genome_hash(ind: Dict[str, List[Tuple[Period, AulaID]]]) -> int:
+    """
+    Hash del genoma: XOR de un hash por bloque (curso, posición, asignación).
+    Al ser un XOR, cambiar un bloque se actualiza con h ^ hash(viejo) ^ hash(nuevo).
+    """
+    h = 0
+    for ccode, assigns in ind.items():
+        for i, slot in enumerate(assigns):
+            h ^= hash((ccode, i, slot))
+    return h
+
+class FitnessCache:
+    """
+    Cache LRU acotada genome_hash -> fitness. Guarda una copia del genoma para
+    descartar colisiones de hash y cuenta aciertos/fallos.
+    """
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, ind: Dict[str, List[Tuple[Period, AulaID]]], key: int):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == ind:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, ind: Dict[str, List[Tuple[Period, AulaID]]], key: int, fitness: float) -> None:
+        snapshot = {ccode: list(assigns) for ccode, assigns in ind.items()}
+        self._entries[key] = (snapshot, fitness)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+# ---------------------------
+# Stopping criteria
+# ---------------------------
+STOP_REASONS = {
+    'generations': 'all generations done',
+    'budget': 'evaluation budget spent',
+    'time': 'time limit reached',
+    'stall': 'too many generations without improvement',
+    'target': 'target fitness reached',
+    'neighbour': 'another island stopped',
+}
+
+def parse_target(text: str) -> Dict[str, float]:
+    """--target-fitness: 'X' (fitness <= X) or 'HARD:SOFT' (hard cost <= HARD and soft cost <= SOFT, e.g. '0:5000')."""
+    if ':' in text:
+        hard, soft = text.split(':', 1)
+        return {'hard': float(hard), 'soft': float(soft)}
+    return {'fitness': float(text)}
+
+class StopCriteria:
+    """
+    Early stopping: wall-clock limit, generations without improvement and target fitness.
+    Steady-state modes count equivalent generations (evals / POP_SIZE). The first criterion
+    met is kept in `reason` (a STOP_REASONS key).
+    """
+
+    def __init__(self, time_limit: float = None, stall_gens: int = None, target: Dict[str, float] = None):
+        self.start = time.perf_counter()
+        self.time_limit = time_limit
+        self.stall_gens = stall_gens
+        self.target = target
+        self.best_fit = float('inf')
+        self.last_improvement = 0
+        self.time_to_feasible = None
+        self.reason = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def stop(self, reason: str):
+        self.reason = self.reason or reason
+
+    def check(self, gen: float, best_fit: float, best_diagnostics) -> bool:
+        """
+        Called after every generation; True when a criterion is met. `best_diagnostics()`
+        returns the best individual's diagnostics; it is called on a new best until one has
+        no hard cost (time_to_feasible) and for a HARD:SOFT target that the fitness alone
+        does not rule out.
+        """
+        if best_fit < self.best_fit:
+            self.best_fit = best_fit
+            self.last_improvement = gen
+            if self.time_to_feasible is None and best_diagnostics()['hard'] == 0:
+                self.time_to_feasible = round(self.elapsed(), 3)
+            if self.target is not None and self.reached_target(best_fit, best_diagnostics):
+                self.stop('target')
+        if self.stall_gens is not None and gen - self.last_improvement >= self.stall_gens:
+            self.stop('stall')
+        if self.time_limit is not None and self.elapsed() >= self.time_limit:
+            self.stop('time')
+        return self.reason is not None
+
+    def reached_target(self, fitness: float, best_diagnostics) -> bool:
+        # fitness = hard + soft, so above the sum of the bounds there is nothing to check
+        if fitness > sum(self.target.values()):
+            return False
+        if 'fitness' in self.target:
+            return True
+        diag = best_diagnostics()
+        return all(diag[key] <= bound for key, bound in self.target.items())
+
+    def finish(self, diag: Dict[str, Any], default: str, **progress):
+        """Records 'stop_reason', the progress counters, the elapsed seconds and 'time_to_feasible' in `diag`."""
+        self.stop(default)
+        diag['stop_reason'] = self.reason
+        diag.update(progress)
+        diag['seconds'] = round(self.elapsed(), 3)
+        diag['time_to_feasible'] = self.time_to_feasible  # None = no feasible best found
+        done = ', '.join(f"{value} {name}" for name, value in progress.items())
+        print(f"Stopped: {STOP_REASONS[self.reason]} ({done}, {diag['seconds']:.1f}s)")
+
+def make_stop_criteria() -> StopCriteria:
+    return StopCriteria(TIME_LIMIT, STALL_GENS, TARGET_FITNESS)
+
+# ---------------------------
+# Trajectory engines (simulated annealing, tabu search)
+# ---------------------------
+# Single-solution alternatives to the GA (--engine sa|tabu): same input, weights and
+# output, with every move scored by DeltaEvaluator. A stage of POP_SIZE evaluated moves
+# stands in for a generation in the stopping criteria and the status lines.
+ENGINES = ('ga', 'sa', 'tabu')
+SA_SCHEDULES = ('geometric', 'linear', 'lundy-mees')
+
+def random_neighbour(sched: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any],
+                     blocks: List[Tuple[CourseCode, int]]) -> List[Tuple[CourseCode, int, Tuple[Period, AulaID]]]:
+    """A random move as (ccode, i, new slot) changes: a block to another period, to another aula of its type, or two different blocks swapping periods."""
+    index = data['_index']
+    ccode, i = random.choice(blocks)
+    p, a = sched[ccode][i]
+    kind = random.randrange(3)
+    if kind == 2 and len(blocks) > 1:
+        other, j = ccode, i
+        while (other, j) == (ccode, i):  # swapping a block with itself changes nothing
+            other, j = random.choice(blocks)
+        q, b = sched[other][j]
+        return [(ccode, i, (q, a)), (other, j, (p, b))]
+    if kind == 1:
+        aulas = index.aulas_by_type.get(data['_courses_map'][ccode].get('aula_tipo')) or index.aulas
+        return [(ccode, i, (p, random.choice(aulas)))]
+    return [(ccode, i, (random.choice(index.periods), a))]
+
+def apply_move(ev: DeltaEvaluator, changes: List[Tuple[CourseCode, int, Tuple[Period, AulaID]]]):
+    """Applies the changes to ev and returns the changes that undo them."""
+    undo = [(ccode, i, ev.ind[ccode][i]) for ccode, i, _ in reversed(changes)]
+    for ccode, i, slot in changes:
+        ev.move(ccode, i, slot)
+    return undo
+
+class TemperatureSchedule:
+    """
+    Annealing temperature, lowered once per stage from t0 to t_final over `stages` stages:
+    geometric T_k = t0 * alpha^k, linear T_k = t0 - k * (t0 - t_final) / stages, or
+    lundy-mees T_k+1 = T_k / (1 + beta * T_k), with alpha and beta chosen to end at t_final.
+    """
+
+    def __init__(self, schedule: str, t0: float, t_final: float, stages: int):
+        self.schedule = schedule
+        self.t0 = t0
+        self.t_final = min(t_final, t0)
+        self.stages = max(1, stages)
+        self.stage = 0
+        self.temperature = t0
+        self.alpha = (self.t_final / t0) ** (1 / self.stages)
+        self.beta = (t0 - self.t_final) / (self.stages * t0 * self.t_final)
+
+    def cool(self) -> float:
+        self.stage += 1
+        if self.schedule == 'geometric':
+            self.temperature *= self.alpha
+        elif self.schedule == 'linear':
+            self.temperature = self.t0 - self.stage * (self.t0 - self.t_final) / self.stages
+        else:
+            self.temperature /= 1 + self.beta * self.temperature
+        self.temperature = max(self.temperature, self.t_final)
+        return self.temperature
+
+def initial_temperature(ev: DeltaEvaluator, data: Dict[str, Any], blocks: List[Tuple[CourseCode, int]],
+                        samples: int = 200, acceptance: float = 0.8) -> float:
+    """
+    t0 at which the mean soft-cost worsening of random moves is accepted with probability
+    `acceptance` (the moves are undone). Hard costs are left out on purpose: a t0 scaled
+    to M accepts almost any hard violation and the walk never gets near feasibility.
+    """
+    worse = []
+    for _ in range(samples):
+        before = ev.soft
+        undo = apply_move(ev, random_neighbour(ev.ind, data, blocks))
+        if ev.soft > before: worse.append(ev.soft - before)
+        apply_move(ev, undo)
+    if not worse:
+        return SA_T_FINAL
+    return -(sum(worse) / len(worse)) / math.log(acceptance)
+
+def tabu_step(ev: DeltaEvaluator, data: Dict[str, Any], blocks: List[Tuple[CourseCode, int]],
+              tabu: Dict[Tuple, int], iteration: int, best_fit: float) -> Tuple[int, bool]:
+    """
+    One tabu search iteration: scores TABU_CANDIDATES random neighbours and applies the
+    best allowed one, even if it is worse. A neighbour is tabu when it puts a block back
+    in a slot it left less than TABU_TENURE iterations ago, unless it beats best_fit
+    (aspiration). Returns (neighbours evaluated, whether a move was applied); nothing is
+    applied when every neighbour was tabu.
+    """
+    chosen, chosen_fit = None, float('inf')
+    for _ in range(TABU_CANDIDATES):
+        changes = random_neighbour(ev.ind, data, blocks)
+        undo = apply_move(ev, changes)
+        f = ev.fitness
+        apply_move(ev, undo)
+        banned = any(tabu.get((ccode, i, slot), -1) >= iteration for ccode, i, slot in changes)
+        if f < chosen_fit and (not banned or f < best_fit):
+            chosen, chosen_fit = changes, f
+    if chosen is None:
+        return TABU_CANDIDATES, False
+    for ccode, i, slot in apply_move(ev, chosen):
+        tabu[(ccode, i, slot)] = iteration + TABU_TENURE
+    return TABU_CANDIDATES, True
+
+def run_trajectory(data: Dict[str, Any], engine: str, iterations: int = None):
+    """
+    Simulated annealing ('sa') or tabu search ('tabu') from one repaired random individual.
+    SA accepts a worsening delta with probability exp(-delta / T), T following SA_SCHEDULE;
+    tabu search moves with tabu_step. Runs `iterations` evaluated moves (default ITERATIONS,
+    else 10 * POP_SIZE * GENERATIONS) unless a stopping criterion ends it first.
+    """
+    iterations = iterations or ITERATIONS or 10 * POP_SIZE * GENERATIONS
+    stop = make_stop_criteria()
+    index = data['_index']
+    ev = DeltaEvaluator(repair(random_individual(data), data), data)
+    sched = ev.ind
+    blocks = [(ccode, i) for ccode, assigns in sched.items() for i in range(len(assigns))]
+    best = Genome.from_dict(sched, index)
+    best_fit, best_hard = ev.fitness, ev.hard
+    print(f"Init fitness: {best_fit}")
+    stage = POP_SIZE
+    if engine == 'sa':
+        t0 = SA_T0 or initial_temperature(ev, data, blocks)
+        temp = TemperatureSchedule(SA_SCHEDULE, t0, SA_T_FINAL, iterations // stage)
+        print(f"Simulated annealing: {iterations} moves, {SA_SCHEDULE} schedule, T0 {t0:.2f}, Tf {temp.t_final:.2f}")
+    else:
+        tabu = {}
+        print(f"Tabu search: {iterations} moves, tenure {TABU_TENURE}, {TABU_CANDIDATES} candidates")
+
+    evals = accepted = stages = 0
+    def best_diagnostics():
+        return {'hard': best_hard, 'soft': best_fit - best_hard}
+
+    while evals < iterations and not stop.check(evals / POP_SIZE, best_fit, best_diagnostics):
+        end = min(iterations, evals + stage)
+        while evals < end:
+            if engine == 'sa':
+                current = ev.fitness
+                undo = apply_move(ev, random_neighbour(sched, data, blocks))
+                evals += 1
+                delta = ev.fitness - current
+                if delta <= 0 or random.random() < math.exp(-delta / temp.temperature): accepted += 1
+                else: apply_move(ev, undo)
+            else:
+                # the tabu clock counts applied moves, so an all-tabu iteration doesn't advance it
+                scored, applied = tabu_step(ev, data, blocks, tabu, accepted, best_fit)
+                evals += scored
+                accepted += applied
+            if ev.fitness < best_fit:
+                best_fit, best_hard = ev.fitness, ev.hard
+                best = Genome.from_dict(sched, index)
+        stages += 1
+        if engine == 'sa': temp.cool()
+        if stages % 50 == 0:
+            print(f"Move {evals}: best {best_fit}, current {ev.fitness}"
+                  + (f", T {temp.temperature:.2f}" if engine == 'sa' else ''))
+    print(f"Moves: {evals} evaluated, {accepted} applied")
+    best = best.to_dict(index)
+    f_best, d_best = evaluate(best, data)
+    stop.finish(d_best, 'budget', evals=evals)
+    print("FINAL BEST fitness:", f_best)
+    print("Diagnostics:", dict(d_best))
+    if EVAL_PROFILE is not None:
+        print(EVAL_PROFILE.summary())
+    return best, d_best
+
 # ---------------------------
 # GA main loop
 # ---------------------------
-def run_ga(data: Dict[str, Any]):
+class StagedFitnesses:
+    """
+    Fitness de una población evaluada con evaluate_staged: cotas (lower, upper) por
+    individuo. Un individuo se completa (evaluate_fitness) solo cuando una comparación
+    no se puede decidir con las cotas, así selección y elitismo dan lo mismo que con
+    la evaluación completa.
+    """
+    def __init__(self, pop: List[Dict], data: Dict[str, Any], lower: List[float], upper: List[float],
+                 cache: FitnessCache = None, keys: List[int] = None):
+        self.pop = pop
+        self.data = data
+        self.lower = lower
+        self.upper = upper
+        self.cache = cache
+        self.keys = keys
+
+    def exact(self, i: int) -> float:
+        if self.lower[i] != self.upper[i]:
+            f = evaluate_fitness(self.pop[i], self.data)
+            self.lower[i] = self.upper[i] = f
+            if self.cache is not None:
+                self.cache.put(self.pop[i], self.keys[i], f)
+        return self.lower[i]
+
+    def set(self, i: int, f: float):
+        """Exact fitness of individual i, replaced in the population."""
+        self.lower[i] = self.upper[i] = f
+
+    def better(self, j: int, i: int) -> bool:
+        if self.upper[j] < self.lower[i]:
+            return True
+        if self.lower[j] >= self.upper[i]:
+            return False
+        return self.exact(j) < self.exact(i)
+
+    def __getitem__(self, i: int) -> float:
+        return self.exact(i)
+
+    def __len__(self) -> int:
+        return len(self.pop)
+
+    def __iter__(self):
+        return (self.exact(i) for i in range(len(self.pop)))
+
+def evaluate_population_parallel(pop: List[Dict], data: Dict[str, Any], cache: FitnessCache, cutoff: float, pool):
+    """
+    evaluate_population with the cache misses spread over the pool. Evaluation is a pure
+    function of the individual, so the values match a serial run exactly; genomes repeated
+    inside the population are sent once.
+    """
+    keys = [genome_hash(ind) for ind in pop] if cache is not None else None
+    bounds = [None] * len(pop)
+    groups = {}  # pending genome -> indices sharing it
+    for i, ind in enumerate(pop):
+        group_key = ('i', i)  # no cache (or a hash collision): own group
+        if cache is not None:
+            f = cache.get(ind, keys[i])
+            if f is not None:
+                bounds[i] = (f, f)
+                continue
+            group = groups.get(keys[i])
+            if group is None:
+                group_key = keys[i]
+            elif pop[group[0]] == ind:
+                group.append(i)
+                continue
+        groups[group_key] = [i]
+    pending = list(groups.values())
+    tasks = [(pop[group[0]], cutoff) for group in pending]
+    for group, result in zip(pending, pool.map(_worker_evaluate, tasks, chunksize=chunk_size(len(tasks)))):
+        for i in group:
+            bounds[i] = result
+        if cache is not None and result[0] == result[1]:
+            cache.put(pop[group[0]], keys[group[0]], result[0])
+    if cutoff is None:
+        return [lo for lo, _ in bounds]
+    return StagedFitnesses(pop, data, [b[0] for b in bounds], [b[1] for b in bounds], cache, keys)
+
+def evaluate_population(pop: List[Dict], data: Dict[str, Any], cache: FitnessCache = None, cutoff: float = None, pool=None):
+    """
+    Evalúa la población por el camino rápido (solo fitness, sin diagnósticos).
+    Con BATCH_EVAL (y NumPy disponible) usa batch_evaluate; si no, evaluate_fitness()
+    individuo por individuo. Con cache, solo se evalúan los genomas que no están en ella.
+    Con cutoff (y sin batch) evalúa por etapas y retorna un StagedFitnesses.
+    Con pool (y sin batch) reparte los fallos de cache entre los procesos.
+    """
+    batch = BATCH_EVAL and np is not None
+    if pool is not None and not batch:
+        return evaluate_population_parallel(pop, data, cache, cutoff, pool)
+    if cutoff is not None and not batch:
+        keys = [genome_hash(ind) for ind in pop] if cache is not None else None
+        lower, upper = [], []
+        for i, ind in enumerate(pop):
+            f = cache.get(ind, keys[i]) if cache is not None else None
+            if f is not None:
+                lo = hi = f
+            else:
+                lo, hi = evaluate_staged(ind, data, cutoff)
+                if cache is not None and lo == hi:
+                    cache.put(ind, keys[i], lo)
+            lower.append(lo); upper.append(hi)
+        return StagedFitnesses(pop, data, lower, upper, cache, keys)
+    if cache is None:
+        if batch:
+            return batch_evaluate(pop, data)
+        return [evaluate_fitness(ind, data) for ind in pop]
+
+    keys = [genome_hash(ind) for ind in pop]
+    fitnesses = [cache.get(ind, key) for ind, key in zip(pop, keys)]
+    missing = [i for i, f in enumerate(fitnesses) if f is None]
+    if batch:
+        computed = batch_evaluate([pop[i] for i in missing], data) if missing else []
+    else:
+        computed = [evaluate_fitness(pop[i], data) for i in missing]
+    for i, f in zip(missing, computed):
+        # a genome repeated inside this population is evaluated once per miss, then cached
+        cache.put(pop[i], keys[i], f)
+        fitnesses[i] = f
+    return fitnesses
+
+def run_ga(data: Dict[str, Any], migration=None, stop: StopCriteria = None):
+    """
+    GA loop. `migration` (island model) is called at the start of every generation with
+    (gen, population, fitnesses) and returns the immigrants that join the new population
+    right after the elite. `stop` (default: from the global parameters) is checked after
+    every generation; the diagnostics report which criterion ended the run.
+    """
+    stop = stop or make_stop_criteria()
+    cache = FitnessCache(CACHE_SIZE) if CACHE_SIZE > 0 else None
+    ls_stats = LocalSearchStats()
+    pool = make_pool(data)  # None = everything in this process
     # init population
     population = [random_individual(data) for _ in range(POP_SIZE)]
     # optionally repair initial population
     population = [repair(ind, data) for ind in population]
     # evaluate
-    fitnesses = []
-    diagnostics_list = []
-    for ind in population:
-        f, d = evaluate(ind, data)
-        fitnesses.append(f); diagnostics_list.append(d)
+    fitnesses = evaluate_population(population, data, cache, pool=pool)
     best_idx = min(range(len(population)), key=lambda i: fitnesses[i])
-    best = copy.deepcopy(population[best_idx])
+    # the best is kept as a compact Genome: snapshot and elitism copies are array copies
+    index = data['_index']
+    best = Genome.from_dict(population[best_idx], index)
     best_fit = fitnesses[best_idx]
-    print(f"Init best fitness: {best_fit}, diag: {diagnostics_list[best_idx]}")
+    print(f"Init best fitness: {best_fit}, diag: {evaluate(population[best_idx], data)[1]}")
 
-    for gen in range(1, GENERATIONS+1):
+    def best_diagnostics():
+        return evaluate(best.to_dict(index), data)[1]
+
+    gen = 0
+    while gen < GENERATIONS and not stop.check(gen, best_fit, best_diagnostics):
+        gen += 1
         newpop = []
         newfits = []
         # Elitism: carry best
-        newpop.append(copy.deepcopy(best))
+        newpop.append(best.to_dict(index))
         newfits.append(best_fit)
-        while len(newpop) < POP_SIZE:
-            p1 = tournament_selection(population, fitnesses)
-            p2 = tournament_selection(population, fitnesses)
+        if migration is not None:
+            newpop.extend(migration(gen, population, fitnesses)[:POP_SIZE - 1])
+        pending = []  # (child, seed) pairs mutated + repaired as a batch with PARALLEL_OPS
+        while len(newpop) + len(pending) < POP_SIZE:
+            # parents are read in place: operators never modify their inputs
+            p1 = population[tournament_selection(population, fitnesses)]
+            p2 = population[tournament_selection(population, fitnesses)]
             # crossover
             if random.random() < CROSSOVER_PROB:
                 c1, c2 = crossover(p1, p2, data)
             else:
                 c1, c2 = p1, p2
+            if PARALLEL_OPS:
+                pending.append((c1, random.getrandbits(64)))
+                if len(newpop) + len(pending) < POP_SIZE:
+                    pending.append((c2, random.getrandbits(64)))
+                continue
             # mutate
-            c1 = mutate(c1, data)
-            c2 = mutate(c2, data)
+            c1 = mutate(c1, data, MUTATION_PROB)
+            c2 = mutate(c2, data, MUTATION_PROB)
             # repair
             c1 = repair(c1, data)
             c2 = repair(c2, data)
@@ -654,33 +2215,376 @@ def run_ga(data: Dict[str, Any]):
             newpop.append(c1)
             if len(newpop) < POP_SIZE:
                 newpop.append(c2)
+        if pending:
+            newpop.extend(vary_batch(pending, data, pool))
         # evaluate newpop
         population = newpop
-        fitnesses = []
-        diagnostics_list = []
-        for ind in population:
-            f,d = evaluate(ind, data)
-            fitnesses.append(f); diagnostics_list.append(d)
-        # update best
-        cur_best_idx = min(range(len(population)), key=lambda i: fitnesses[i])
-        if fitnesses[cur_best_idx] < best_fit:
-            best_fit = fitnesses[cur_best_idx]
-            best = copy.deepcopy(population[cur_best_idx])
-            print(f"[Gen {gen}] New best fitness: {best_fit} diag: {diagnostics_list[cur_best_idx]}")
+        fitnesses = evaluate_population(population, data, cache, cutoff=best_fit if STAGED_EVAL else None, pool=pool)
+        # memetic phase: hill climbing on the best ones every LS_EVERY generations
+        if LS_EVERY and gen % LS_EVERY == 0:
+            fitnesses = local_search_phase(population, fitnesses, data, ls_stats)
+        # update best (staged individuals not yet exact have lower > best_fit, so the
+        # lower bounds are enough to find an improvement)
+        values = fitnesses.lower if isinstance(fitnesses, StagedFitnesses) else fitnesses
+        cur_best_idx = min(range(len(population)), key=lambda i: values[i])
+        if values[cur_best_idx] < best_fit:
+            best_fit = values[cur_best_idx]
+            best = Genome.from_dict(population[cur_best_idx], index)
+            print(f"[Gen {gen}] New best fitness: {best_fit} diag: {evaluate(population[cur_best_idx], data)[1]}")
         # occasional status
         if gen % 50 == 0:
-            avg = sum(fitnesses)/len(fitnesses)
-            print(f"Gen {gen}: best {best_fit}, avg {avg:.2f}")
+            # lower bounds: summing `fitnesses` would force every cut-off individual to full evaluation
+            avg = sum(values)/len(values)
+            bound = '>=' if isinstance(fitnesses, StagedFitnesses) else ''
+            print(f"Gen {gen}: best {best_fit}, avg {bound}{avg:.2f}")
+    if pool is not None:
+        pool.shutdown()
+    if cache is not None:
+        print(f"Fitness cache: {cache.hits} hits / {cache.hits + cache.misses} lookups ({cache.hit_rate():.1%})")
+    if ls_stats.phases:
+        print(ls_stats.summary())
     # final evaluate best with diagnostics
+    best = best.to_dict(index)
     f_best, d_best = evaluate(best, data)
+    stop.finish(d_best, 'generations', generations=gen)
     print("FINAL BEST fitness:", f_best)
     print("Diagnostics:", dict(d_best))
+    if EVAL_PROFILE is not None:
+        print(EVAL_PROFILE.summary())
     return best, d_best
 
+# ---------------------------
+# Steady-state mode
+# ---------------------------
+def select_victim(fitnesses: List[float], replacement: str = None) -> int:
+    """Individual a child tries to replace: the worst, or the loser of a TOURNAMENT_K tournament."""
+    replacement = replacement or REPLACEMENT
+    if replacement == 'worst':
+        return max(range(len(fitnesses)), key=fitnesses.__getitem__)
+    if replacement == 'tournament':
+        victim = random.randrange(len(fitnesses))
+        for _ in range(TOURNAMENT_K - 1):
+            other = random.randrange(len(fitnesses))
+            if fitnesses[other] > fitnesses[victim]:
+                victim = other
+        return victim
+    raise ValueError(f"unknown replacement policy: {replacement}")
+
+class SteadyPopulation:
+    """
+    Fixed-size population updated in place (steady-state and async modes). Keeps each
+    genome's hash, so duplicate children are found without comparing against everyone,
+    and the index of the best individual.
+    """
+
+    def __init__(self, pop: List[Dict], fitnesses: List[float]):
+        self.pop = pop
+        self.fitnesses = fitnesses
+        self.keys = [genome_hash(ind) for ind in pop]
+        self.present = Counter(self.keys)
+        self.best = min(range(len(pop)), key=fitnesses.__getitem__)
+        self.replaced = 0
+        self.duplicates = 0
+
+    def contains(self, child: Dict, key: int) -> bool:
+        """True (counted as a duplicate) when the genome is already in the population."""
+        if self.present[key] and child in self.pop:
+            self.duplicates += 1
+            return True
+        return False
+
+    def replace(self, victim: int, child: Dict, key: int, f: float) -> bool:
+        """Puts the child in the victim's slot unless it is worse; returns True on a new best."""
+        if f > self.fitnesses[victim]:
+            return False
+        self.present[self.keys[victim]] -= 1
+        self.pop[victim] = child
+        self.fitnesses[victim] = f
+        self.keys[victim] = key
+        self.present[key] += 1
+        self.replaced += 1
+        if f < self.fitnesses[self.best]:
+            self.best = victim
+            return True
+        if victim == self.best:
+            self.best = min(range(len(self.fitnesses)), key=self.fitnesses.__getitem__)
+        return False
+
+    def report(self, evals: int):
+        print(f"Eval {evals}: best {self.fitnesses[self.best]}, avg {sum(self.fitnesses) / len(self.fitnesses):.2f}")
+
+def finish_steady(state: SteadyPopulation, data: Dict[str, Any], evals: int, stop: StopCriteria):
+    print(f"Children: {evals} evaluated, {state.replaced} replacements, {state.duplicates} duplicates dropped")
+    best = state.pop[state.best]
+    f_best, d_best = evaluate(best, data)
+    stop.finish(d_best, 'budget', evals=evals)
+    print("FINAL BEST fitness:", f_best)
+    print("Diagnostics:", dict(d_best))
+    if EVAL_PROFILE is not None:
+        print(EVAL_PROFILE.summary())
+    return best, d_best
+
+def run_steady_state(data: Dict[str, Any], budget: int = None):
+    """
+    Steady-state GA: two children at a time, each replacing its victim (worst or tournament
+    loser) in place when it is not worse. Population and fitness lists are allocated once and
+    improvements are selectable immediately. Children are evaluated staged with the victim's
+    fitness as cutoff, so hopeless ones are dropped early; children identical to a member of
+    the population are dropped unevaluated to keep diversity. No fitness cache: children
+    almost never repeat and caching a copy of each is the allocation this mode avoids.
+    `budget` is the number of children (default EVAL_BUDGET, else POP_SIZE * GENERATIONS).
+    Stopping criteria are checked after every pair of children, in equivalent generations.
+    """
+    budget = budget or EVAL_BUDGET or POP_SIZE * GENERATIONS
+    stop = make_stop_criteria()
+    population = [repair(random_individual(data), data) for _ in range(POP_SIZE)]
+    pool = make_pool(data)  # only used for the initial evaluation
+    state = SteadyPopulation(population, list(evaluate_population(population, data, pool=pool)))
+    if pool is not None:
+        pool.shutdown()
+    print(f"Init best fitness: {state.fitnesses[state.best]}, diag: {evaluate(population[state.best], data)[1]}")
+
+    def best_diagnostics():
+        return evaluate(state.pop[state.best], data)[1]
+
+    evals = 0
+    report_every = POP_SIZE * 50  # same pace as the every-50-generations status
+    next_report = report_every
+    while evals < budget and not stop.check(evals / POP_SIZE, state.fitnesses[state.best], best_diagnostics):
+        p1 = state.pop[tournament_selection(state.pop, state.fitnesses)]
+        p2 = state.pop[tournament_selection(state.pop, state.fitnesses)]
+        children = crossover(p1, p2, data) if random.random() < CROSSOVER_PROB else (p1, p2)
+        for child in children:
+            if evals >= budget:
+                break
+            child = repair(mutate(child, data, MUTATION_PROB), data)
+            evals += 1
+            key = genome_hash(child)
+            if state.contains(child, key):
+                continue
+            victim = select_victim(state.fitnesses)
+            f, upper = evaluate_staged(child, data, state.fitnesses[victim])
+            if f != upper:
+                continue  # cut off: certainly worse than the victim
+            if state.replace(victim, child, key, f):
+                print(f"[Eval {evals}] New best fitness: {f} diag: {evaluate(child, data)[1]}")
+        if evals >= next_report:
+            next_report += report_every
+            state.report(evals)
+    return finish_steady(state, data, evals, stop)
+
+def breed(p1: Dict, p2: Dict, data: Dict[str, Any], seed: int, cx_prob: float, mut_prob: float, cutoff: float):
+    """
+    Async breeding task: crossover, mutate, repair and staged evaluation of two children on
+    their own random stream. Returns [(child, lower, upper), ...]; `cutoff` is the population's
+    worst fitness when the task was dispatched.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        children = crossover(p1, p2, data) if random.random() < cx_prob else (p1, p2)
+        results = []
+        for child in children:
+            child = repair(mutate(child, data, mut_prob), data)
+            results.append((child,) + tuple(evaluate_staged(child, data, cutoff)))
+    finally:
+        random.setstate(state)
+    return results
+
+def _worker_breed(task):
+    p1, p2, seed, cx_prob, mut_prob, cutoff = task
+    return breed(p1, p2, _worker_data, seed, cx_prob, mut_prob, cutoff)
+
+def run_async(data: Dict[str, Any], budget: int = None):
+    """
+    Asynchronous master-worker steady state. The master keeps 2 breeding tasks per worker in
+    flight; each task carries copies of its parents, so later replacements cannot affect it.
+    As soon as a task returns, its children go through the steady-state rules against the
+    population as it is then (duplicate check, victim and replacement decided on arrival) and
+    a new task is dispatched. Children are staged against the worst fitness at dispatch time;
+    that value never goes up, so a child cut off then could not have entered on arrival.
+    Arrival order depends on task timings, so runs are not reproducible even with a fixed seed.
+    Once a stopping criterion is met no more tasks are dispatched; the ones in flight are
+    still inserted. Falls back to run_steady_state with a single worker.
+    """
+    pool = make_pool(data)
+    if pool is None:
+        print("Async mode with a single worker: running steady state instead")
+        return run_steady_state(data, budget)
+    budget = budget or EVAL_BUDGET or POP_SIZE * GENERATIONS
+    stop = make_stop_criteria()
+    population = [repair(random_individual(data), data) for _ in range(POP_SIZE)]
+    state = SteadyPopulation(population, list(evaluate_population(population, data, pool=pool)))
+    print(f"Init best fitness: {state.fitnesses[state.best]}, diag: {evaluate(population[state.best], data)[1]}")
+
+    def dispatch():
+        p1 = state.pop[tournament_selection(state.pop, state.fitnesses)]
+        p2 = state.pop[tournament_selection(state.pop, state.fitnesses)]
+        task = (p1, p2, random.getrandbits(64), CROSSOVER_PROB, MUTATION_PROB, max(state.fitnesses))
+        return pool.submit(_worker_breed, task)
+
+    def best_diagnostics():
+        return evaluate(state.pop[state.best], data)[1]
+
+    dispatched = evals = 0
+    in_flight = set()
+    while dispatched < budget and len(in_flight) < 2 * num_workers():
+        in_flight.add(dispatch())
+        dispatched += 2
+    report_every = POP_SIZE * 50
+    next_report = report_every
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for fut in done:
+            for child, lo, hi in fut.result():
+                evals += 1
+                if lo != hi:
+                    continue  # cut off: worse than the worst at dispatch time
+                key = genome_hash(child)
+                if state.contains(child, key):
+                    continue
+                if state.replace(select_victim(state.fitnesses), child, key, lo):
+                    print(f"[Eval {evals}] New best fitness: {lo} diag: {evaluate(child, data)[1]}")
+            if dispatched < budget and not stop.check(evals / POP_SIZE, state.fitnesses[state.best], best_diagnostics):
+                in_flight.add(dispatch())
+                dispatched += 2
+        if evals >= next_report:
+            next_report += report_every
+            state.report(evals)
+    pool.shutdown()
+    return finish_steady(state, data, evals, stop)
+
+# ---------------------------
+# Island model
+# ---------------------------
+TOPOLOGIES = ('ring', 'bidirectional', 'complete')
+
+def migration_targets(topology: str, islands: int) -> List[List[int]]:
+    """Islands each island sends its migrants to: ring (i -> i+1), bidirectional (i -> i±1) or complete."""
+    if topology == 'ring':
+        return [[(i + 1) % islands] if islands > 1 else [] for i in range(islands)]
+    if topology == 'bidirectional':
+        return [sorted({(i + 1) % islands, (i - 1) % islands} - {i}) for i in range(islands)]
+    if topology == 'complete':
+        return [[j for j in range(islands) if j != i] for i in range(islands)]
+    raise ValueError(f"unknown migration topology: {topology}")
+
+def _island_process(island: int, shared: Dict[str, Any], seed: int, params: Dict[str, Any], inboxes, targets: List[List[int]],
+                    interval: int, migrants: int, results):
+    """
+    Runs one island's GA in its own process and posts (island, best, fitness, diagnostics).
+    Every `interval` generations it sends its `migrants` best individuals to its targets and
+    waits for one batch from every island that sends to it (a source's batch for a later
+    migration is kept until then); batches are ordered by source island, so the run is
+    deterministic whatever order the messages arrive in. An island that stops early sends a
+    None batch instead, so nobody waits for it; receivers stop too and pass it on.
+    """
+    globals().update(params)
+    shared['_index'] = build_problem_index(shared)
+    random.seed(seed)
+    sources = [j for j, t in enumerate(targets) if island in t]
+    early = defaultdict(list)  # source -> batches for later migrations
+    stop = make_stop_criteria()
+
+    def receive():
+        batches = {src: early[src].pop(0) for src in sources if early[src]}
+        while len(batches) < len(sources):
+            src, batch = inboxes[island].get()
+            if src in batches:
+                early[src].append(batch)
+            else:
+                batches[src] = batch
+        return batches
+
+    def migration(gen, population, fitnesses):
+        if gen == 1 or (gen - 1) % interval:
+            return []
+        # lower bounds rank exact individuals correctly and put cut-off ones behind them
+        values = fitnesses.lower if isinstance(fitnesses, StagedFitnesses) else fitnesses
+        best_idx = sorted(range(len(population)), key=lambda i: values[i])[:migrants]
+        for target in targets[island]:
+            inboxes[target].put((island, [population[i] for i in best_idx]))
+        batches = receive()
+        if any(batch is None for batch in batches.values()):
+            stop.stop('neighbour')
+        return [ind for src in sorted(batches) for ind in batches[src] or []]
+
+    best, diag = run_ga(shared, migration, stop)
+    if stop.reason != 'generations':
+        for target in targets[island]:
+            inboxes[target].put((island, None))
+    results.put((island, best, evaluate_fitness(best, shared), diag))
+
+def collect_island_results(results, procs: List, wait_s: float = 0.5) -> List[Tuple]:
+    """
+    One result per island, without hanging if an island dies: between reads (at most
+    `wait_s` each) check the exit codes of the islands still missing, and if one ended
+    without publishing (e.g. it raised) stop the others and raise RuntimeError.
+    """
+    received = {}
+    while len(received) < len(procs):
+        try:
+            result = results.get(timeout=wait_s)
+            received[result[0]] = result
+            continue
+        except queue.Empty:
+            pass
+        dead = [(island, proc.exitcode) for island, proc in enumerate(procs)
+                if island not in received and proc.exitcode is not None]
+        if dead:
+            for proc in procs:
+                if proc.exitcode is None: proc.terminate()
+            raise RuntimeError("Islands ended without a result: "
+                               + ', '.join(f"island {island} (exit code {code})" for island, code in dead))
+    return list(received.values())
+
+def run_islands(data: Dict[str, Any], islands: int, interval: int = MIGRATION_INTERVAL, migrants: int = MIGRANTS,
+                topology: str = TOPOLOGY, probs: List[Tuple[float, float]] = None):
+    """
+    Island model: `islands` sub-populations of POP_SIZE // islands individuals, each in its
+    own process with its own seed (drawn from the global RNG) and optionally its own
+    (crossover, mutation) probabilities from `probs` (cycled). Returns the best island's
+    (best, diagnostics), with 'island', 'island_fitness' and 'island_stop_reason' added to
+    the diagnostics.
+    """
+    targets = migration_targets(topology, islands)
+    incoming = max(sum(i in t for t in targets) for i in range(islands)) * migrants
+    size = max(POP_SIZE // islands, incoming + 2)
+    probs = probs or [(CROSSOVER_PROB, MUTATION_PROB)]
+    print(f"Island model: {islands} islands of {size}, {topology} topology, {migrants} migrants every {interval} generations")
+    shared = {k: v for k, v in data.items() if k not in ('_index', '_batch_layout')}
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    procs = []
+    for island in range(islands):
+        cx, mut = probs[island % len(probs)]
+        params = {'POP_SIZE': size, 'GENERATIONS': GENERATIONS, 'CROSSOVER_PROB': cx, 'MUTATION_PROB': mut,
+                  'CACHE_SIZE': CACHE_SIZE, 'STAGED_EVAL': STAGED_EVAL, 'BATCH_EVAL': BATCH_EVAL,
+                  'EVAL_PROFILE': None, 'WORKERS': 1, 'PARALLEL_OPS': PARALLEL_OPS,
+                  'TIME_LIMIT': TIME_LIMIT, 'STALL_GENS': STALL_GENS, 'TARGET_FITNESS': TARGET_FITNESS,
+                  'LS_EVERY': LS_EVERY, 'LS_TOP': LS_TOP, 'LS_TIME': LS_TIME, 'LS_EVALS': LS_EVALS, 'STRUCTURED_MOVES': STRUCTURED_MOVES}
+        proc = multiprocessing.Process(target=_island_process,
+                                       args=(island, shared, random.getrandbits(64), params, inboxes, targets,
+                                             interval, migrants, results))
+        proc.start()
+        procs.append(proc)
+    # read the results before joining: a process does not exit until its queue is drained
+    per_island = sorted(collect_island_results(results, procs), key=lambda r: r[0])
+    for proc in procs:
+        proc.join()
+    island, best, _, diag = min(per_island, key=lambda r: (r[2], r[0]))
+    diag = dict(diag)
+    diag['island'] = island
+    diag['island_fitness'] = [r[2] for r in per_island]
+    diag['island_stop_reason'] = [r[3]['stop_reason'] for r in per_island]
+    print(f"Best fitness per island: {diag['island_fitness']} (island {island} wins)")
+    return best, diag
+
 # ---------------------------
 # Pretty print solution
 # ---------------------------
 def pretty_print_solution(sol: Dict[str, List[Tuple[Period, AulaID]]], data: Dict[str, Any], out_path=None):
+    sol = as_schedule(sol, data)
     course_map = data['_courses_map']
     lines = []
     lines.append("CourseCode | CourseName | (period,aula) ...")
@@ -698,15 +2602,87 @@ def pretty_print_solution(sol: Dict[str, List[Tuple[Period, AulaID]]], data: Dic
 # CLI
 # ---------------------------
 def main():
-    global POP_SIZE, GENERATIONS  # 👈 mover esto al inicio
+    global POP_SIZE, GENERATIONS, BATCH_EVAL, CACHE_SIZE, STAGED_EVAL, EVAL_PROFILE, WORKERS, PARALLEL_OPS  # 👈 mover esto al inicio
+    global ISLANDS, MIGRATION_INTERVAL, MIGRANTS, TOPOLOGY, STEADY_STATE, REPLACEMENT, EVAL_BUDGET, ASYNC_MODE
+    global TIME_LIMIT, STALL_GENS, TARGET_FITNESS, LS_EVERY, LS_TOP, LS_TIME, LS_EVALS, STRUCTURED_MOVES
+    global ENGINE, ITERATIONS, SA_SCHEDULE, SA_T0, SA_T_FINAL, TABU_TENURE, TABU_CANDIDATES
     parser = argparse.ArgumentParser()
     parser.add_argument('--input', required=True, help='JSON input file (plantilla)')
     parser.add_argument('--pop', type=int, default=POP_SIZE)
     parser.add_argument('--gens', type=int, default=GENERATIONS)
+    parser.add_argument('--batch', action='store_true', help='evaluate the population in batch with NumPy')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='fitness cache entries (0 disables it)')
+    parser.add_argument('--no-staged', action='store_true', help='always evaluate hard and soft constraints in full')
+    parser.add_argument('--profile-eval', metavar='PATH', help='time each constraint block and write the profile (.json or .csv)')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='evaluation processes (0 = all cores)')
+    parser.add_argument('--parallel-ops', action='store_true', help='also mutate and repair offspring in the worker pool')
+    parser.add_argument('--islands', type=int, default=ISLANDS, help='island model: sub-populations in separate processes')
+    parser.add_argument('--migration-interval', type=int, default=MIGRATION_INTERVAL, help='generations between migrations')
+    parser.add_argument('--migrants', type=int, default=MIGRANTS, help='individuals each island sends to each target')
+    parser.add_argument('--topology', choices=TOPOLOGIES, default=TOPOLOGY, help='migration topology')
+    parser.add_argument('--island-crossover', help='comma-separated crossover probabilities, cycled over the islands')
+    parser.add_argument('--island-mutation', help='comma-separated mutation probabilities, cycled over the islands')
+    parser.add_argument('--steady-state', action='store_true', help='replace individuals in place, two children at a time (no islands)')
+    parser.add_argument('--async', dest='async_mode', action='store_true', help='asynchronous steady state over the --workers pool')
+    parser.add_argument('--replacement', choices=('worst', 'tournament'), default=REPLACEMENT, help='steady-state victim policy')
+    parser.add_argument('--eval-budget', type=int, help='children to evaluate in steady-state mode (default pop * gens)')
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS', help='stop after this much wall-clock time')
+    parser.add_argument('--stall-gens', type=int, metavar='N', help='stop after N generations without a new best')
+    parser.add_argument('--target-fitness', type=parse_target, metavar='X|HARD:SOFT',
+                        help='stop once fitness <= X, or hard cost <= HARD and soft cost <= SOFT')
+    parser.add_argument('--structured-moves', type=float, default=STRUCTURED_MOVES, metavar='P', help='share of mutations done by a swap, Kempe-chain or run move')
+    parser.add_argument('--ls-every', type=int, default=LS_EVERY, metavar='N', help='local search on the best individuals every N generations (0 = off)')
+    parser.add_argument('--ls-top', type=int, default=LS_TOP, metavar='K', help='individuals improved by each local search phase')
+    parser.add_argument('--ls-time', type=float, default=LS_TIME, metavar='SECONDS', help='time cap per local search phase (0 = none); depends on machine load, so with a cap --seed no longer reproduces a run')
+    parser.add_argument('--ls-evals', type=int, default=LS_EVALS, metavar='N', help='moves evaluated per local search phase (0 = until the local optimum)')
+    parser.add_argument('--engine', choices=ENGINES, default=ENGINE, help='ga, or a single-solution engine: simulated annealing or tabu search')
+    parser.add_argument('--iterations', type=int, metavar='N', help='moves evaluated by sa / tabu (default 10 * pop * gens)')
+    parser.add_argument('--sa-schedule', choices=SA_SCHEDULES, default=SA_SCHEDULE, help='simulated annealing cooling schedule')
+    parser.add_argument('--sa-t0', type=float, metavar='T', help='initial temperature (default: estimated from random moves)')
+    parser.add_argument('--sa-t-final', type=float, default=SA_T_FINAL, metavar='T', help='final temperature')
+    parser.add_argument('--tabu-tenure', type=int, default=TABU_TENURE, metavar='N', help='iterations a block may not return to the slot it left')
+    parser.add_argument('--tabu-candidates', type=int, default=TABU_CANDIDATES, metavar='N', help='neighbours scored per tabu iteration')
     args = parser.parse_args()
+    if args.migration_interval < 1: parser.error("--migration-interval must be at least 1")
+    if args.migrants < 0: parser.error("--migrants cannot be negative")
+    if args.sa_t0 is not None and args.sa_t0 <= 0: parser.error("--sa-t0 must be positive")
+    if args.sa_t_final <= 0: parser.error("--sa-t-final must be positive")
+    if args.tabu_tenure < 0: parser.error("--tabu-tenure cannot be negative")
+    if args.tabu_candidates < 1: parser.error("--tabu-candidates must be at least 1")
     
     POP_SIZE = args.pop
     GENERATIONS = args.gens
+    BATCH_EVAL = args.batch
+    CACHE_SIZE = args.cache_size
+    STAGED_EVAL = not args.no_staged
+    EVAL_PROFILE = EvalProfile() if args.profile_eval else None
+    WORKERS = args.workers
+    PARALLEL_OPS = args.parallel_ops
+    ISLANDS = args.islands
+    MIGRATION_INTERVAL = args.migration_interval
+    MIGRANTS = args.migrants
+    TOPOLOGY = args.topology
+    STEADY_STATE = args.steady_state
+    REPLACEMENT = args.replacement
+    EVAL_BUDGET = args.eval_budget
+    ASYNC_MODE = args.async_mode
+    TIME_LIMIT = args.time_limit
+    STALL_GENS = args.stall_gens
+    TARGET_FITNESS = args.target_fitness
+    LS_EVERY = args.ls_every
+    STRUCTURED_MOVES = args.structured_moves
+    LS_TOP = args.ls_top
+    LS_TIME = args.ls_time
+    LS_EVALS = args.ls_evals
+    ENGINE = args.engine
+    ITERATIONS = args.iterations
+    SA_SCHEDULE = args.sa_schedule
+    SA_T0 = args.sa_t0
+    SA_T_FINAL = args.sa_t_final
+    TABU_TENURE = args.tabu_tenure
+    TABU_CANDIDATES = args.tabu_candidates
+    if BATCH_EVAL and np is None:
+        print("Advertencia: NumPy no está instalado, se usa la evaluación escalar.")
 
     data = load_input(args.input)
     # ensure we have an 'M' in pesos for heavy penalization
@@ -715,9 +2691,24 @@ def main():
     if 'M' not in data['pesos']:
         data['pesos']['M'] = 1000000
 
-    best, diag = run_ga(data)
+    if ENGINE != 'ga':
+        best, diag = run_trajectory(data, ENGINE)
+    elif ISLANDS > 1:
+        cxs = [float(x) for x in args.island_crossover.split(',')] if args.island_crossover else [CROSSOVER_PROB]
+        muts = [float(x) for x in args.island_mutation.split(',')] if args.island_mutation else [MUTATION_PROB]
+        probs = [(cxs[i % len(cxs)], muts[i % len(muts)]) for i in range(ISLANDS)]
+        best, diag = run_islands(data, ISLANDS, MIGRATION_INTERVAL, MIGRANTS, TOPOLOGY, probs)
+    elif ASYNC_MODE:
+        best, diag = run_async(data)
+    elif STEADY_STATE:
+        best, diag = run_steady_state(data)
+    else:
+        best, diag = run_ga(data)
     pretty_print_solution(best, data, out_path="best_schedule.txt")
     print("Se guardó best_schedule.txt con la solución (curso -> periodos y aulas).")
+    if EVAL_PROFILE is not None:
+        EVAL_PROFILE.save(args.profile_eval)
+        print(f"Se guardó el perfil de evaluación en {args.profile_eval}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+"""Delta and staged evaluation, stop criteria and island determinism on input_full.json."""
+import importlib
+import os
+import random
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+MODULES = ['ga_scheduler', 'main']
+
+
+def population(ga, n, seed=5):
+    data = ga.load_input(os.path.join(HERE, 'input_full.json'))
+    random.seed(seed)
+    return data, [ga.repair(ga.random_individual(data), data) for _ in range(n)]
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_delta_evaluator_matches_evaluate(module):
+    ga = importlib.import_module(module)
+    data, pop = population(ga, 2)
+    for ind in pop:
+        ev = ga.DeltaEvaluator(ind, data)
+        blocks = [(ccode, i) for ccode, assigns in ind.items() for i in range(len(assigns))]
+        for _ in range(200):
+            ga.apply_move(ev, ga.random_neighbour(ev.ind, data, blocks))
+            fitness, diag = ga.evaluate(ev.ind, data)
+            assert ev.fitness == pytest.approx(fitness)
+            assert ev.hard == pytest.approx(diag['hard'])
+            assert ev.soft == pytest.approx(diag['soft'])
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_staged_bounds_contain_exact_fitness(module):
+    ga = importlib.import_module(module)
+    data, pop = population(ga, 10)
+    for ind in pop:
+        exact = ga.evaluate_fitness(ind, data)
+        for cutoff in (0, exact / 2, exact, exact * 2, float('inf')):
+            lower, upper = ga.evaluate_staged(ind, data, cutoff)
+            assert lower <= exact <= upper
+            if cutoff > exact:
+                assert lower == upper == exact
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_stop_criteria_reasons(module):
+    ga = importlib.import_module(module)
+    infeasible = lambda: {'hard': 1, 'soft': 0}  # noqa: E731
+
+    stall = ga.StopCriteria(stall_gens=2)
+    assert not stall.check(0, 10.0, infeasible)
+    assert not stall.check(1, 10.0, infeasible)
+    assert stall.check(2, 10.0, infeasible) and stall.reason == 'stall'
+
+    target = ga.StopCriteria(target=ga.parse_target('0:100'))
+    assert not target.check(0, 50.0, lambda: {'hard': 10, 'soft': 40})
+    assert target.check(1, 40.0, lambda: {'hard': 0, 'soft': 40}) and target.reason == 'target'
+    assert target.time_to_feasible is not None
+
+    timed = ga.StopCriteria(time_limit=0)
+    assert timed.check(0, 1.0, infeasible) and timed.reason == 'time'
+
+    diag = {}
+    ga.StopCriteria().finish(diag, 'generations', generations=5)
+    assert diag['stop_reason'] == 'generations' and diag['generations'] == 5
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_islands_deterministic_for_seed(module, monkeypatch):
+    ga = importlib.import_module(module)
+    monkeypatch.setattr(ga, 'POP_SIZE', 12)
+    monkeypatch.setattr(ga, 'GENERATIONS', 4)
+    data = ga.load_input(os.path.join(HERE, 'input_full.json'))
+    runs = []
+    for _ in range(2):
+        random.seed(3)
+        best, diag = ga.run_islands(data, 2, interval=2, migrants=1)
+        runs.append((best, diag['fitness'], diag['island_fitness']))
+    assert runs[0] == runs[1]
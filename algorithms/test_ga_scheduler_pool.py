@@ -0,0 +1,38 @@
+"""Pool workers must use the main process's operator parameters even when they don't inherit them (spawn / forkserver)."""
+import importlib
+import multiprocessing
+import os
+import random
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+
+@pytest.mark.parametrize('module', ['ga_scheduler', 'main'])
+def test_spawn_pool_uses_operator_params(module, monkeypatch):
+    ga = importlib.import_module(module)
+    monkeypatch.setattr(ga, 'STRUCTURED_MOVES', 1.0)
+    monkeypatch.setattr(ga, 'MUTATION_PROB', 0.6)
+    monkeypatch.setattr(ga, 'WORKERS', 2)
+    data = ga.load_input(os.path.join(HERE, 'input_full.json'))
+    random.seed(7)
+    parents = [ga.repair(ga.random_individual(data), data) for _ in range(4)]
+    pending = [(child, random.getrandbits(64)) for child in parents]
+    tasks = [(parents[0], parents[1], 11, 0.8, ga.MUTATION_PROB, float('inf')),
+             (parents[2], parents[3], 12, 0.8, ga.MUTATION_PROB, float('inf'))]
+
+    local = [ga.vary(child, data, seed, ga.MUTATION_PROB) for child, seed in pending]
+    local_broods = [ga.breed(p1, p2, data, seed, cx, mut, cutoff) for p1, p2, seed, cx, mut, cutoff in tasks]
+
+    pool = ga.make_pool(data, multiprocessing.get_context('spawn'))
+    try:
+        remote = ga.vary_batch(pending, data, pool)
+        remote_broods = list(pool.map(ga._worker_breed, tasks))
+    finally:
+        pool.shutdown()
+
+    assert remote == local
+    assert remote_broods == local_broods
@@ -12,12 +12,21 @@ Características principales:
 """
 
 import json
+import csv
+import math
+import os
+import queue
 import sys
+import time
 import random
-import copy
 import argparse
-from collections import defaultdict
-from typing import Dict, List, Tuple, Any, Set
+import multiprocessing
+import signal
+from array import array
+from collections import defaultdict, Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Any, Set, Mapping, NamedTuple, Callable
 
 # ============================================================================
 # CONFIGURACIÓN Y PARÁMETROS GLOBALES
@@ -29,18 +38,53 @@ GENERATIONS = 200
 TOURNAMENT_K = 3
 CROSSOVER_PROB = 0.8
 MUTATION_PROB = 0.2
+PROB_MOVIMIENTOS = 0.0  # Fracción de mutaciones con movimiento estructurado (intercambio, Kempe, tramo H10)
+CACHE_SIZE = 4096      # Entradas de la cache de fitness (LRU); 0 la desactiva
+EVALUACION_POR_ETAPAS = True  # Duras primero; blandas solo si el individuo aún compite
+PERFIL_EVALUACION = None      # PerfilEvaluacion activo (--profile-eval); None = sin instrumentación
+EVALUACIONES = 0              # Evaluaciones hechas por este proceso o enviadas a su pool (fallos de cache y cotas completadas)
+WORKERS = 1                   # Procesos para construcción y evaluación; 0 = todos los núcleos
+OPERADORES_EN_PARALELO = False  # Mutación y reparación de los hijos también en el pool (semilla por hijo)
+
+# Modelo de islas (--islands); 1 = una sola población
+ISLAS = 1
+INTERVALO_MIGRACION = 10  # Generaciones entre migraciones
+MIGRANTES = 2             # Mejores individuos que envía cada isla a cada vecina
+TOPOLOGIA = 'ring'        # ring | bidirectional | complete
+
+# Modo estado estacionario (--steady-state)
+ESTADO_ESTACIONARIO = False
+REEMPLAZO = 'worst'             # worst | tournament (perdedor de un torneo)
+PRESUPUESTO_EVALUACIONES = None  # Hijos a evaluar; None = POP_SIZE * GENERATIONS
+MODO_ASINCRONO = False           # Estado estacionario maestro-trabajador sobre el pool (--async)
+
+# Criterios de parada anticipada (None = desactivado); ver CriterioParada
+LIMITE_TIEMPO = None        # Segundos de reloj desde el inicio de la corrida (--time-limit)
+GENS_ESTANCAMIENTO = None   # Generaciones seguidas sin mejorar el mejor fitness (--stall-gens)
+OBJETIVO_FITNESS = None     # Cotas del mejor individuo, ver leer_objetivo() (--target-fitness)
+CANCELACION = None          # Cancelacion activa (SIGTERM/SIGINT, --cancel-file); None = sin cancelación
+PROGRESO = None             # ProgresoNDJSON activo (--progress-fd); None = sin eventos de progreso
+
+# Motor de búsqueda (--engine): 'ga', o de trayectoria única 'sa' (recocido simulado) / 'tabu'
+MOTOR = 'ga'
+ITERACIONES_TRAYECTORIA = None   # Movimientos evaluados por sa/tabu; None = 10 * POP_SIZE * GENERATIONS
+ESQUEMA_TEMPERATURA = 'geometric'  # geometric | linear | lundy-mees
+TEMPERATURA_INICIAL = None       # None = estimada con movimientos de muestra
+TEMPERATURA_FINAL = 1.0
+TENENCIA_TABU = 10               # Iteraciones que un bloque no puede volver a su slot anterior
+CANDIDATOS_TABU = 50             # Vecinos evaluados por iteración tabú
+
+# Búsqueda local memética sobre los mejores (--ls-every); 0 = desactivada
+BUSQUEDA_LOCAL_CADA = 0      # Generaciones entre fases de búsqueda local
+BUSQUEDA_LOCAL_TOP = 2       # Mejores individuos que se mejoran en cada fase
+BUSQUEDA_LOCAL_EVALUACIONES = 6000  # Movimientos evaluados por fase, repartidos entre los top-k; 0 = sin tope
+BUSQUEDA_LOCAL_TIEMPO = 0    # Segundos máximos por fase (0 = sin tope); depende de la carga de la máquina
 
 # Aliases de tipos para mayor claridad
 Period = str        # Formato: "DIA_HH:MM_HH:MM"
 AulaID = str        # Identificador del aula
 CourseCode = str    # Código del curso (ej: "CS101_T", "CS101_LAB")
 
-# Estructuras globales para el algoritmo TSSP
-# Rastrean conflictos durante la construcción secuencial
-global_prof_period_cnt = defaultdict(lambda: defaultdict(int))
-global_aula_period_cnt = defaultdict(lambda: defaultdict(int))
-global_aula_map = {}
-
 # Constantes para separación teoría-laboratorio
 MIN_SEPARATION_HOURS = 4    # Mínimo 4 horas entre teoría y laboratorio
 MIN_BLOCKS_PER_COURSE = 2   # Mínimo 2 bloques por curso
@@ -64,7 +108,6 @@ def convert_input_format(new_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         dict: Datos convertidos al formato interno con prioridades TSSP calculadas
     """
-    global global_aula_map
     data = {}
     
     # 1. Procesar períodos de tiempo
@@ -81,6 +124,7 @@ def convert_input_format(new_data: Dict[str, Any]) -> Dict[str, Any]:
     # 2. Procesar aulas/salones
     classroom_type_map = {"THEORY": "T", "LAB": "LAB"}
     aulas_list = []
+    aulas_map = {}
     
     for room in new_data['classrooms']:
         aula_data = {
@@ -90,10 +134,10 @@ def convert_input_format(new_data: Dict[str, Any]) -> Dict[str, Any]:
             'capacidad': room['capacity']
         }
         aulas_list.append(aula_data)
-        global_aula_map[aula_data['id']] = aula_data  # Registro global para TSSP
+        aulas_map[aula_data['id']] = aula_data
     
     data['_aulas_list'] = aulas_list
-    data['_aulas_map'] = global_aula_map
+    data['_aulas_map'] = aulas_map
     
     # 3. Procesar profesores y su disponibilidad
     profs_map = {}
@@ -226,6 +270,9 @@ def convert_input_format(new_data: Dict[str, Any]) -> Dict[str, Any]:
     
     # 8. Preservar metadatos originales
     data['metadata'] = new_data['metadata']
+
+    # 9. Índice compilado (períodos, aulas y disponibilidades como enteros)
+    data['_indice'] = construir_indice(data)
     
     return data
 
@@ -264,62 +311,311 @@ def obtener_periodos_consecutivos(periodos: List[Period], data: Dict[str, Any])
     
     Args:
         periodos: Lista de períodos a agrupar
-        data: Datos del problema con todos los períodos disponibles
+        data: Datos del problema con el índice compilado
         
     Returns:
         Lista de listas, cada una conteniendo períodos consecutivos
     """
-    if not periodos:
-        return []
-    
-    # Agrupar por día
+    indice = data['_indice']
+    bloques_consecutivos = []
+    for bloque in agrupar_consecutivos([indice.periodo_id[p] for p in periodos], indice):
+        bloques_consecutivos.append([indice.periodos[p] for p in bloque])
+    return bloques_consecutivos
+
+def agrupar_consecutivos(periodos: List[int], indice: 'IndiceProblema') -> List[List[int]]:
+    """
+    Agrupa períodos codificados en bloques consecutivos por día (versión entera
+    de obtener_periodos_consecutivos, usada por los evaluadores).
+    """
     por_dia = defaultdict(list)
     for p in periodos:
-        dia = obtener_dia_periodo(p)
-        por_dia[dia].append(p)
+        por_dia[indice.dia_de_periodo[p]].append(p)
     
-    bloques_consecutivos = []
+    bloques = []
+    posicion = indice.posicion_en_dia
+    for periodos_dia in por_dia.values():
+        periodos_dia.sort(key=lambda p: posicion[p])
+        bloque_actual = [periodos_dia[0]]
+        for i in range(1, len(periodos_dia)):
+            # Si son consecutivos, añadir al bloque actual
+            if posicion[periodos_dia[i]] == posicion[periodos_dia[i-1]] + 1:
+                bloque_actual.append(periodos_dia[i])
+            else:
+                bloques.append(bloque_actual)
+                bloque_actual = [periodos_dia[i]]
+        bloques.append(bloque_actual)
+    return bloques
+
+# ============================================================================
+# ÍNDICE COMPILADO DEL PROBLEMA
+# ============================================================================
+
+class IndiceProblema(NamedTuple):
+    """
+    Índice inmutable del problema codificado con enteros.
+    
+    Se construye una sola vez en convert_input_format() y lo consumen los
+    evaluadores, la construcción TSSP, la reparación y los operadores, que así
+    no necesitan volver a parsear los strings de período.
+    """
+    periodos: Tuple[Period, ...]
+    periodo_id: Mapping[Period, int]
+    dias: Tuple[str, ...]
+    dia_de_periodo: Tuple[int, ...]          # período -> id del día
+    posicion_en_dia: Tuple[int, ...]         # período -> posición dentro de su día
+    periodos_por_dia: Tuple[Tuple[int, ...], ...]
+    es_matutino: Tuple[bool, ...]
+    es_extremo: Tuple[bool, ...]             # antes de las 7 o desde las 19 (S6)
+    hora_inicio: Tuple[int, ...]
+    adyacente_siguiente: Tuple[bool, ...]    # el período i+1 sigue al i en el mismo día
+    aulas: Tuple[AulaID, ...]
+    aula_id: Mapping[AulaID, int]
+    tipo_aula: Tuple[str, ...]
+    capacidad_aula: Tuple[int, ...]
+    aulas_por_tipo: Mapping[str, Tuple[AulaID, ...]]
+    disponibilidad_prof: Mapping[Any, int]   # máscara de bits (solo profesores con disponibilidad)
+    codigos_curso: Tuple[CourseCode, ...]
+    curso_id: Mapping[CourseCode, int]
+    profesores: Tuple[Any, ...]              # id -> profesor ("" = sin profesor)
+    profesor_id: Mapping[Any, int]
+    base_de: Mapping[CourseCode, str]        # curso -> original_code
+    componentes_por_base: Mapping[str, Tuple[CourseCode, ...]]  # solo bases con 2+ componentes
+    hermanos: Mapping[CourseCode, Tuple[CourseCode, ...]]       # componentes distintos del mismo curso base
+
+def construir_indice(data: Dict[str, Any]) -> IndiceProblema:
+    """
+    Construye el índice compilado a partir de los datos ya convertidos.
     
-    for dia, periodos_dia in por_dia.items():
-        # Obtener todos los períodos del día ordenados
-        todos_periodos_dia = [x for x in data['periodos'] if obtener_dia_periodo(x) == dia]
-        indices_map = {p: i for i, p in enumerate(todos_periodos_dia)}
+    Args:
+        data: Datos del problema en formato interno
         
-        # Ordenar períodos del curso por índice
-        periodos_ordenados = sorted(periodos_dia, key=lambda x: indices_map.get(x, 0))
+    Returns:
+        IndiceProblema: Índice inmutable con períodos, aulas y disponibilidades
+    """
+    periodos = tuple(data['periodos'])
+    dias = []
+    dia_de_periodo, posicion_en_dia, hora_inicio, es_extremo = [], [], [], []
+    periodos_por_dia = defaultdict(list)
+
+    for i, periodo in enumerate(periodos):
+        dia = obtener_dia_periodo(periodo)
+        if dia not in dias:
+            dias.append(dia)
+        d = dias.index(dia)
+        dia_de_periodo.append(d)
+        posicion_en_dia.append(len(periodos_por_dia[d]))
+        periodos_por_dia[d].append(i)
+        try:
+            hora = int(periodo.split('_')[1].split(':')[0])
+            hora_inicio.append(hora)
+            es_extremo.append(hora <= 7 or hora >= 19)
+        except:
+            hora_inicio.append(0)
+            es_extremo.append(False)
+
+    adyacente_siguiente = tuple(
+        i + 1 < len(periodos) and dia_de_periodo[i + 1] == dia_de_periodo[i]
+        and posicion_en_dia[i + 1] == posicion_en_dia[i] + 1
+        for i in range(len(periodos))
+    )
+
+    aulas_por_tipo = defaultdict(list)
+    for aula in data['_aulas_list']:
+        aulas_por_tipo[aula['tipo']].append(aula['id'])
+
+    periodo_id = {p: i for i, p in enumerate(periodos)}
+    disponibilidad_prof = {}
+    for prof_id, info in data['_profs_map'].items():
+        disponibilidad = info.get('disponibilidad', set())
+        if disponibilidad:
+            mascara = 0
+            for periodo in disponibilidad:
+                if periodo in periodo_id:
+                    mascara |= 1 << periodo_id[periodo]
+            disponibilidad_prof[prof_id] = mascara
+
+    # Componentes (teoría/laboratorio) por curso base, para H9
+    mapa_cursos = data['_courses_map']
+    base_de = {codigo: curso.get('original_code', codigo) for codigo, curso in mapa_cursos.items()}
+    componentes = defaultdict(list)
+    for codigo, base in base_de.items():
+        componentes[base].append(codigo)
+    hermanos = {}
+    for codigo, curso in mapa_cursos.items():
+        # Mismo criterio que la verificación TSSP original
+        codigo_original = curso.get('original_code', '')
+        hermanos[codigo] = tuple(
+            otro for otro, otro_curso in mapa_cursos.items()
+            if otro_curso.get('original_code') == codigo_original
+            and otro_curso.get('_course_component') != curso.get('_course_component', '')
+        )
+
+    # Profesores que pueden aparecer en una asignación ("" = sin profesor)
+    profesores = [""]
+    for prof_id in list(data['_profs_map']) + [p for curso in mapa_cursos.values()
+                                               for p in curso.get('profesores', [])]:
+        if prof_id not in profesores:
+            profesores.append(prof_id)
+
+    return IndiceProblema(
+        periodos=periodos,
+        periodo_id=MappingProxyType(periodo_id),
+        dias=tuple(dias),
+        dia_de_periodo=tuple(dia_de_periodo),
+        posicion_en_dia=tuple(posicion_en_dia),
+        periodos_por_dia=tuple(tuple(periodos_por_dia[d]) for d in range(len(dias))),
+        es_matutino=tuple(es_periodo_matutino(p) for p in periodos),
+        es_extremo=tuple(es_extremo),
+        hora_inicio=tuple(hora_inicio),
+        adyacente_siguiente=adyacente_siguiente,
+        aulas=tuple(a['id'] for a in data['_aulas_list']),
+        aula_id=MappingProxyType({a['id']: i for i, a in enumerate(data['_aulas_list'])}),
+        tipo_aula=tuple(a['tipo'] for a in data['_aulas_list']),
+        capacidad_aula=tuple(a['capacidad'] for a in data['_aulas_list']),
+        aulas_por_tipo=MappingProxyType({t: tuple(ids) for t, ids in aulas_por_tipo.items()}),
+        disponibilidad_prof=MappingProxyType(disponibilidad_prof),
+        codigos_curso=tuple(mapa_cursos),
+        curso_id=MappingProxyType({codigo: i for i, codigo in enumerate(mapa_cursos)}),
+        profesores=tuple(profesores),
+        profesor_id=MappingProxyType({prof_id: i for i, prof_id in enumerate(profesores)}),
+        base_de=MappingProxyType(base_de),
+        componentes_por_base=MappingProxyType({
+            base: tuple(codigos) for base, codigos in componentes.items() if len(codigos) > 1
+        }),
+        hermanos=MappingProxyType(hermanos),
+    )
+
+# ============================================================================
+# GENOMA COMPACTO
+# ============================================================================
+
+class Genoma:
+    """
+    Representación compacta de un individuo.
+    
+    Guarda los ids de período, aula y profesor de cada bloque en arrays de
+    16 bits, curso tras curso: cursos[k] es el id del k-ésimo curso (en el
+    orden del dict original) y sus bloques ocupan desplazamientos[k] a
+    desplazamientos[k+1]. Copiar un Genoma es copiar cinco arrays; a_dict()
+    devuelve la forma dict que usan los operadores y la salida JSON.
+    """
+    __slots__ = ('cursos', 'desplazamientos', 'periodos', 'aulas', 'profesores')
+    
+    def __init__(self, cursos: array, desplazamientos: array, periodos: array,
+                 aulas: array, profesores: array):
+        self.cursos = cursos
+        self.desplazamientos = desplazamientos
+        self.periodos = periodos
+        self.aulas = aulas
+        self.profesores = profesores
+    
+    @classmethod
+    def desde_dict(cls, individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
+                   indice: IndiceProblema) -> 'Genoma':
+        """
+        Codifica un individuo en forma dict.
         
-        # Agrupar períodos consecutivos
-        if not periodos_ordenados:
-            continue
+        Args:
+            individuo: Solución curso -> [(período, aula, profesor)]
+            indice: Índice compilado del problema
             
-        bloque_actual = [periodos_ordenados[0]]
+        Returns:
+            Genoma: Mismo individuo en forma compacta
+        """
+        curso_id, periodo_id = indice.curso_id, indice.periodo_id
+        aula_id, profesor_id = indice.aula_id, indice.profesor_id
+        cursos, desplazamientos = array('H'), array('I', [0])
+        periodos, aulas, profesores = array('H'), array('H'), array('H')
+        for codigo_curso, asignaciones in individuo.items():
+            cursos.append(curso_id[codigo_curso])
+            for (periodo, aula, profesor) in asignaciones:
+                periodos.append(periodo_id[periodo])
+                aulas.append(aula_id[aula])
+                profesores.append(profesor_id[profesor])
+            desplazamientos.append(len(periodos))
+        return cls(cursos, desplazamientos, periodos, aulas, profesores)
+    
+    def a_dict(self, indice: IndiceProblema) -> Dict[str, List[Tuple[Period, AulaID, str]]]:
+        """
+        Decodifica el genoma a la forma dict (listas y tuplas nuevas).
         
-        for i in range(1, len(periodos_ordenados)):
-            idx_actual = indices_map.get(periodos_ordenados[i], 0)
-            idx_anterior = indices_map.get(periodos_ordenados[i-1], 0)
+        Args:
+            indice: Índice compilado del problema
             
-            # Si son consecutivos, añadir al bloque actual
-            if idx_actual == idx_anterior + 1:
-                bloque_actual.append(periodos_ordenados[i])
-            else:
-                # Inicio de nuevo bloque
-                if bloque_actual:
-                    bloques_consecutivos.append(bloque_actual)
-                bloque_actual = [periodos_ordenados[i]]
-        
-        # Añadir el último bloque
-        if bloque_actual:
-            bloques_consecutivos.append(bloque_actual)
+        Returns:
+            dict: Individuo curso -> [(período, aula, profesor)]
+        """
+        codigos, nombres_periodo = indice.codigos_curso, indice.periodos
+        nombres_aula, nombres_prof = indice.aulas, indice.profesores
+        desplazamientos = self.desplazamientos
+        periodos, aulas, profesores = self.periodos, self.aulas, self.profesores
+        individuo = {}
+        for k, c in enumerate(self.cursos):
+            individuo[codigos[c]] = [
+                (nombres_periodo[periodos[b]], nombres_aula[aulas[b]], nombres_prof[profesores[b]])
+                for b in range(desplazamientos[k], desplazamientos[k + 1])
+            ]
+        return individuo
     
-    return bloques_consecutivos
+    def copiar(self) -> 'Genoma':
+        """Copia independiente (cinco copias de arrays)."""
+        return Genoma(self.cursos[:], self.desplazamientos[:], self.periodos[:],
+                      self.aulas[:], self.profesores[:])
+    
+    def nbytes(self) -> int:
+        """Bytes ocupados por los datos de los arrays."""
+        return sum(len(a) * a.itemsize for a in (self.cursos, self.desplazamientos,
+                                                 self.periodos, self.aulas, self.profesores))
+    
+    def __len__(self) -> int:
+        return len(self.periodos)
+
+def como_horario(solucion, data: Dict[str, Any]) -> Dict[str, List[Tuple[Period, AulaID, str]]]:
+    """
+    Forma dict de una solución, ya sea un dict o un Genoma.
+    
+    Args:
+        solucion: Individuo en cualquiera de las dos formas
+        data: Datos del problema
+        
+    Returns:
+        dict: Individuo curso -> [(período, aula, profesor)]
+    """
+    return solucion.a_dict(data['_indice']) if isinstance(solucion, Genoma) else solucion
 
 # ============================================================================
 # ALGORITMO TSSP (TIME-SLOT SELECTION PROBLEM)
 # ============================================================================
 
+class ContextoTSSP:
+    """
+    Estado de la construcción TSSP de un individuo.
+    
+    Guarda los períodos ya ocupados por profesor y por aula (máscaras de bits
+    sobre los índices de IndiceProblema) y el generador aleatorio usado para
+    desempatar. Cada individuo se construye con su propio contexto, así que la
+    construcción es reentrante: se pueden generar individuos en paralelo o
+    resolver varias instancias en el mismo proceso.
+    """
+    __slots__ = ('prof_ocupado', 'aula_ocupada', 'rng')
+    
+    def __init__(self, rng: random.Random = None):
+        self.prof_ocupado = defaultdict(int)
+        self.aula_ocupada = defaultdict(int)
+        self.rng = rng if rng is not None else random  # None = generador global del módulo
+    
+    def ocupar(self, period: Period, aula: AulaID, prof: str, indice: 'IndiceProblema') -> None:
+        """Marca el período como ocupado para el aula y el profesor (si hay)."""
+        bit = 1 << indice.periodo_id[period]
+        if prof:
+            self.prof_ocupado[prof] |= bit
+        self.aula_ocupada[aula] |= bit
+
 def verificar_restricciones_duras_slot(period: Period, aula: AulaID, prof: str, 
                                       course: Dict[str, Any], data: Dict[str, Any],
-                                      asignaciones_actuales: List[Tuple[Period, AulaID, str]] = None) -> bool:
+                                      contexto: ContextoTSSP,
+                                      asignaciones_actuales: List[Tuple[Period, AulaID, str]] = None,
+                                      dias_asignados: int = None) -> bool:
     """
     Verifica si un slot (período, aula, profesor) viola restricciones duras.
     
@@ -329,66 +625,73 @@ def verificar_restricciones_duras_slot(period: Period, aula: AulaID, prof: str,
         prof: ID del profesor propuesto
         course: Información del curso
         data: Datos del problema
+        contexto: Ocupación de la construcción en curso
         asignaciones_actuales: Asignaciones ya realizadas para el curso actual
+        dias_asignados: Máscara de días de asignaciones_actuales (opcional)
         
     Returns:
         bool: True si el slot es válido, False si viola restricciones
     """
     
+    indice = data['_indice']
+    p = indice.periodo_id[period]
+
     # H2: Conflicto de profesor (ya asignado en este período)
-    if prof and global_prof_period_cnt[prof][period] > 0:
+    if prof and (contexto.prof_ocupado[prof] >> p) & 1:
         return False
         
     # H3: Disponibilidad del profesor
-    if prof:
-        disponibilidad = data['_profs_map'].get(prof, {}).get('disponibilidad', set())
-        if disponibilidad and period not in disponibilidad:
+    if prof and prof in indice.disponibilidad_prof:
+        if not (indice.disponibilidad_prof[prof] >> p) & 1:
             return False
             
     # H4: Conflicto de aula (ya asignada en este período)
-    if global_aula_period_cnt[aula][period] > 0:
+    if (contexto.aula_ocupada[aula] >> p) & 1:
         return False
         
     # H5: Capacidad del aula
+    a = indice.aula_id.get(aula)
     estudiantes = course.get('estudiantes', 30)
-    capacidad = global_aula_map.get(aula, {}).get('capacidad', 0)
+    capacidad = indice.capacidad_aula[a] if a is not None else 0
     if estudiantes > capacidad:
         return False
         
     # H6: Tipo de aula requerido
     tipo_requerido = course.get('aula_tipo', None)
-    tipo_actual = global_aula_map.get(aula, {}).get('tipo', None)
+    tipo_actual = indice.tipo_aula[a] if a is not None else None
     if tipo_requerido and tipo_actual != tipo_requerido:
         return False
         
     # H9: Separación teoría-laboratorio (NUEVA RESTRICCIÓN)
     if asignaciones_actuales:
-        dia_actual = obtener_dia_periodo(period)
-        componente_actual = course.get('_course_component', '')
-        codigo_original = course.get('original_code', '')
+        dia_actual = indice.dia_de_periodo[p]
+        
+        # Las dos condiciones exigen un bloque propio en el mismo día
+        if dias_asignados is not None and not (dias_asignados >> dia_actual) & 1:
+            return True
+        
+        # Componentes distintos del mismo curso base (índice precalculado)
+        tiene_hermanos = bool(indice.hermanos.get(course.get('codigo'), ()))
         
         # Verificar separación con otros componentes del mismo curso
         for periodo_asignado, _, _ in asignaciones_actuales:
-            dia_asignado = obtener_dia_periodo(periodo_asignado)
+            q = indice.periodo_id[periodo_asignado]
             
             # No permitir teoría y laboratorio el mismo día
-            if dia_actual == dia_asignado:
-                # Buscar si hay un componente diferente del mismo curso base
-                for otro_codigo, otro_curso in data['_courses_map'].items():
-                    if (otro_curso.get('original_code') == codigo_original and 
-                        otro_curso.get('_course_component') != componente_actual):
-                        return False
+            if dia_actual == indice.dia_de_periodo[q]:
+                if tiene_hermanos:
+                    return False
             
-            # Verificar separación mínima de horas
-            diferencia_horas = calcular_diferencia_horas(period, periodo_asignado)
-            if diferencia_horas < MIN_SEPARATION_HOURS and dia_actual == dia_asignado:
-                return False
+                # Verificar separación mínima de horas
+                if abs(indice.hora_inicio[p] - indice.hora_inicio[q]) < MIN_SEPARATION_HOURS:
+                    return False
         
     return True
 
 def calcular_costo_restricciones_blandas_slot(period: Period, aula: AulaID, prof: str, 
                                             course: Dict[str, Any], data: Dict[str, Any],
-                                            asignaciones_actuales: List[Tuple[Period, AulaID, str]] = None) -> float:
+                                            asignaciones_actuales: List[Tuple[Period, AulaID, str]] = None,
+                                            dias_asignados: int = None) -> float:
     """
     Calcula el costo de restricciones blandas para un slot específico.
     
@@ -399,41 +702,131 @@ def calcular_costo_restricciones_blandas_slot(period: Period, aula: AulaID, prof
         course: Información del curso
         data: Datos del problema
         asignaciones_actuales: Asignaciones ya realizadas
+        dias_asignados: Máscara de días de asignaciones_actuales (opcional)
         
     Returns:
         float: Costo total de restricciones blandas
     """
     costo = 0
     pesos_blandas = data.get('pesos', {}).get('restricciones_blandas', {})
+    indice = data['_indice']
+    p = indice.periodo_id[period]
     
     # S2: Turno preferido por estudiantes
     turno_preferido = data['preferencias'].get('turno_preferido', 'morning')
-    if turno_preferido == 'morning' and not es_periodo_matutino(period):
+    if turno_preferido == 'morning' and not indice.es_matutino[p]:
         costo += pesos_blandas.get('turno_preferido_estudiante', 3)
     
     # S4: Evitar sesiones consecutivas del mismo curso (NUEVA)
-    if asignaciones_actuales:
-        dia_actual = obtener_dia_periodo(period)
-        hora_actual = obtener_hora_inicio(period)
+    if asignaciones_actuales and (dias_asignados is None
+                                  or (dias_asignados >> indice.dia_de_periodo[p]) & 1):
+        dia_actual = indice.dia_de_periodo[p]
         
         for periodo_asignado, _, _ in asignaciones_actuales:
-            if obtener_dia_periodo(periodo_asignado) == dia_actual:
-                diferencia = calcular_diferencia_horas(period, periodo_asignado)
+            q = indice.periodo_id[periodo_asignado]
+            if indice.dia_de_periodo[q] == dia_actual:
+                diferencia = abs(indice.hora_inicio[p] - indice.hora_inicio[q])
                 if diferencia <= 1:  # Muy cercanas en tiempo
                     costo += pesos_blandas.get('evitar_sesiones_consecutivas', 3)
     
-    # S6: Penalizar franjas extremas (primera y última del día)
-    # Simplificado: penalizar horas muy tempranas o muy tardías
-    try:
-        hora = int(period.split('_')[1].split(':')[0])
-        if hora <= 7 or hora >= 19:  # Antes de 7 AM o después de 7 PM
-            costo += pesos_blandas.get('franjas_extremas', 1)
-    except:
-        pass
+    # S6: Penalizar franjas extremas (antes de 7 AM o después de 7 PM)
+    if indice.es_extremo[p]:
+        costo += pesos_blandas.get('franjas_extremas', 1)
     
     return costo
 
-def asignar_curso_tssp(course: Dict[str, Any], data: Dict[str, Any]) -> List[Tuple[Period, AulaID, str]]:
+def slots_candidatos_tssp(course: Dict[str, Any], data: Dict[str, Any], contexto: ContextoTSSP,
+                          aulas: List[AulaID], profesores: List[str],
+                          asignaciones_actuales: List[Tuple[Period, AulaID, str]],
+                          dias_asignados: int) -> List[Tuple[Period, AulaID, str]]:
+    """
+    Enumera los slots factibles de menor costo para el siguiente bloque de un curso.
+    
+    Equivale a recorrer períodos × aulas × profesores con
+    verificar_restricciones_duras_slot() y quedarse con los de costo mínimo según
+    calcular_costo_restricciones_blandas_slot(), pero trabaja con máscaras de
+    períodos libres por aula y por profesor: solo visita los períodos de la
+    intersección factible y calcula el costo blando (que depende solo del
+    período) una vez por período, sin ordenar la lista completa. Los slots
+    empatados se devuelven en el mismo orden que el recorrido completo.
+    
+    Args:
+        course: Información del curso
+        data: Datos del problema
+        contexto: Ocupación de la construcción en curso
+        aulas: Aulas candidatas del curso
+        profesores: Profesores candidatos ("" = sin profesor)
+        asignaciones_actuales: Asignaciones ya realizadas para el curso
+        dias_asignados: Máscara de días de asignaciones_actuales
+        
+    Returns:
+        List[Tuple[Period, AulaID, str]]: Slots de menor costo (vacía si no hay factibles)
+    """
+    indice = data['_indice']
+    todos = (1 << len(indice.periodos)) - 1
+    
+    # H4 + H5 + H6: períodos libres de cada aula compatible
+    estudiantes = course.get('estudiantes', 30)
+    tipo_requerido = course.get('aula_tipo', None)
+    libres_aula = []
+    for aula_id in aulas:
+        a = indice.aula_id.get(aula_id)
+        capacidad = indice.capacidad_aula[a] if a is not None else 0
+        tipo_actual = indice.tipo_aula[a] if a is not None else None
+        if estudiantes > capacidad or (tipo_requerido and tipo_actual != tipo_requerido):
+            continue
+        libres_aula.append((aula_id, todos & ~contexto.aula_ocupada[aula_id]))
+    
+    # H2 + H3: períodos libres y disponibles de cada profesor
+    libres_prof = []
+    for prof_id in profesores:
+        libres = todos
+        if prof_id:
+            libres &= ~contexto.prof_ocupado[prof_id]
+            if prof_id in indice.disponibilidad_prof:
+                libres &= indice.disponibilidad_prof[prof_id]
+        libres_prof.append((prof_id, libres))
+    
+    # H9: períodos vetados por los bloques ya asignados del curso
+    permitidos = todos
+    if asignaciones_actuales:
+        tiene_hermanos = bool(indice.hermanos.get(course.get('codigo'), ()))
+        for periodo_asignado, _, _ in asignaciones_actuales:
+            q = indice.periodo_id[periodo_asignado]
+            for p in indice.periodos_por_dia[indice.dia_de_periodo[q]]:
+                if tiene_hermanos or abs(indice.hora_inicio[p] - indice.hora_inicio[q]) < MIN_SEPARATION_HOURS:
+                    permitidos &= ~(1 << p)
+    
+    union_aulas = 0
+    for _, libres in libres_aula:
+        union_aulas |= libres
+    union_prof = 0
+    for _, libres in libres_prof:
+        union_prof |= libres
+    factibles = permitidos & union_aulas & union_prof
+    
+    # Cubeta de menor costo blando
+    mejor_costo = None
+    mejores_periodos = []
+    while factibles:
+        bit = factibles & -factibles
+        factibles ^= bit
+        p = bit.bit_length() - 1
+        costo = calcular_costo_restricciones_blandas_slot(
+            indice.periodos[p], "", "", course, data, asignaciones_actuales, dias_asignados
+        )
+        if mejor_costo is None or costo < mejor_costo:
+            mejor_costo, mejores_periodos = costo, [p]
+        elif costo == mejor_costo:
+            mejores_periodos.append(p)
+    
+    return [(indice.periodos[p], aula_id, prof_id)
+            for p in mejores_periodos
+            for aula_id, libres_a in libres_aula if (libres_a >> p) & 1
+            for prof_id, libres_p in libres_prof if (libres_p >> p) & 1]
+
+def asignar_curso_tssp(course: Dict[str, Any], data: Dict[str, Any],
+                       contexto: ContextoTSSP) -> List[Tuple[Period, AulaID, str]]:
     """
     Genera asignaciones para un curso usando la lógica secuencial del TSSP.
     Implementa separación teoría-laboratorio y distribución inteligente.
@@ -441,6 +834,7 @@ def asignar_curso_tssp(course: Dict[str, Any], data: Dict[str, Any]) -> List[Tup
     Args:
         course: Información del curso a asignar
         data: Datos del problema
+        contexto: Ocupación y generador aleatorio de la construcción en curso
         
     Returns:
         List[Tuple[Period, AulaID, str]]: Lista de asignaciones (período, aula, profesor)
@@ -454,55 +848,40 @@ def asignar_curso_tssp(course: Dict[str, Any], data: Dict[str, Any]) -> List[Tup
         profesores_disponibles = [""]  # Permitir asignación sin profesor
     
     # Filtrar aulas por tipo requerido
+    indice = data['_indice']
     tipo_aula = course.get('aula_tipo', 'T')
-    aulas_filtradas = [a['id'] for a in data['_aulas_list'] if a['tipo'] == tipo_aula]
+    aulas_filtradas = list(indice.aulas_por_tipo.get(tipo_aula, ()))
     
     if not aulas_filtradas:
         # Fallback: usar cualquier aula disponible
-        aulas_filtradas = [a['id'] for a in data['_aulas_list']]
+        aulas_filtradas = list(indice.aulas)
         print(f"Advertencia: No hay aulas del tipo {tipo_aula} para curso {course['codigo']}", 
               file=sys.stderr)
 
+    # Máscara de días ya usados por este componente (evita recorrer sus
+    # asignaciones para los períodos de días libres)
+    dias_asignados = 0
+    rng = contexto.rng
+    
     # Asignar cada bloque secuencialmente
     for bloque in range(bloques_necesarios):
-        slots_validos = []
-        
-        # Evaluar todas las combinaciones posibles
-        for periodo in data['periodos']:
-            for aula_id in aulas_filtradas:
-                for prof_id in profesores_disponibles:
-                    
-                    # Verificar restricciones duras
-                    if verificar_restricciones_duras_slot(periodo, aula_id, prof_id, course, data, asignaciones):
-                        
-                        # Calcular costo de restricciones blandas
-                        costo_blando = calcular_costo_restricciones_blandas_slot(
-                            periodo, aula_id, prof_id, course, data, asignaciones
-                        )
-                        
-                        slots_validos.append(((periodo, aula_id, prof_id), costo_blando))
+        # Slots factibles empatados en el menor costo blando
+        mejores_opciones = slots_candidatos_tssp(course, data, contexto, aulas_filtradas,
+                                                 profesores_disponibles, asignaciones, dias_asignados)
         
         # Seleccionar el mejor slot
-        if slots_validos:
-            # Ordenar por costo ascendente
-            slots_validos.sort(key=lambda x: x[1])
-            
-            # Introducir aleatoriedad entre las mejores opciones
-            mejor_costo = slots_validos[0][1]
-            mejores_opciones = [slot[0] for slot in slots_validos if slot[1] == mejor_costo]
-            
-            # Si hay muchas opciones igualmente buenas, tomar una muestra aleatoria
+        if mejores_opciones:
+            # Introducir aleatoriedad entre las mejores opciones:
+            # si hay muchas igualmente buenas, tomar una muestra aleatoria
             if len(mejores_opciones) > 5:
-                mejores_opciones = random.sample(mejores_opciones, 5)
+                mejores_opciones = rng.sample(mejores_opciones, 5)
             
-            slot_elegido = random.choice(mejores_opciones)
+            slot_elegido = rng.choice(mejores_opciones)
             asignaciones.append(slot_elegido)
+            dias_asignados |= 1 << indice.dia_de_periodo[indice.periodo_id[slot_elegido[0]]]
             
-            # Actualizar contadores globales
-            periodo, aula_id, prof_id = slot_elegido
-            if prof_id:
-                global_prof_period_cnt[prof_id][periodo] += 1
-            global_aula_period_cnt[aula_id][periodo] += 1
+            # Actualizar ocupación de la construcción
+            contexto.ocupar(*slot_elegido, indice)
             
         else:
             # No hay slots válidos: asignación de emergencia
@@ -510,34 +889,33 @@ def asignar_curso_tssp(course: Dict[str, Any], data: Dict[str, Any]) -> List[Tup
                   file=sys.stderr)
             
             # Asignación aleatoria que será reparada por el GA
-            periodo = random.choice(data['periodos'])
-            aula_id = random.choice(aulas_filtradas)
-            prof_id = random.choice(profesores_disponibles) if profesores_disponibles else ""
+            periodo = rng.choice(indice.periodos)
+            aula_id = rng.choice(aulas_filtradas)
+            prof_id = rng.choice(profesores_disponibles) if profesores_disponibles else ""
             
             asignaciones.append((periodo, aula_id, prof_id))
+            dias_asignados |= 1 << indice.dia_de_periodo[indice.periodo_id[periodo]]
             
-            # Actualizar contadores aunque sea una asignación problemática
-            if prof_id:
-                global_prof_period_cnt[prof_id][periodo] += 1
-            global_aula_period_cnt[aula_id][periodo] += 1
+            # Actualizar ocupación aunque sea una asignación problemática
+            contexto.ocupar(periodo, aula_id, prof_id, indice)
             
     return asignaciones
 
-def generar_individuo_tssp(data: Dict[str, Any]) -> Dict[CourseCode, List[Tuple[Period, AulaID, str]]]:
+def generar_individuo_tssp(data: Dict[str, Any],
+                           rng: random.Random = None) -> Dict[CourseCode, List[Tuple[Period, AulaID, str]]]:
     """
     Genera un individuo completo utilizando la construcción secuencial TSSP.
     
     Args:
         data: Datos del problema
+        rng: Generador aleatorio propio del individuo (None = módulo random)
         
     Returns:
         dict: Individuo con asignaciones para todos los cursos
     """
     
-    # Reiniciar contadores globales para la construcción del nuevo individuo
-    global global_prof_period_cnt, global_aula_period_cnt
-    global_prof_period_cnt = defaultdict(lambda: defaultdict(int))
-    global_aula_period_cnt = defaultdict(lambda: defaultdict(int))
+    # Contexto nuevo: la construcción no comparte estado con otras
+    contexto = ContextoTSSP(rng)
     
     # Ordenar cursos por prioridad TSSP (mayor score = más difícil = primero)
     cursos_ordenados = sorted(
@@ -551,49 +929,227 @@ def generar_individuo_tssp(data: Dict[str, Any]) -> Dict[CourseCode, List[Tuple[
     # Asignar cursos secuencialmente según prioridad
     for course in cursos_ordenados:
         codigo = course['codigo']
-        individuo[codigo] = asignar_curso_tssp(course, data)
+        individuo[codigo] = asignar_curso_tssp(course, data, contexto)
         
     return individuo
 
-def inicializar_poblacion_tssp(data: Dict[str, Any]) -> List[Dict]:
+def inicializar_poblacion_tssp(data: Dict[str, Any], workers: int = None,
+                               pool: ProcessPoolExecutor = None) -> List[Dict]:
     """
     Genera la población inicial usando el algoritmo TSSP.
     
+    Cada individuo se construye con su propio generador, sembrado con un valor
+    que se toma del módulo random antes de repartir el trabajo. Así la población
+    depende solo de la semilla (random.seed / --seed) y no del número de
+    procesos: con 1 o N workers se obtienen los mismos individuos.
+    
     Args:
         data: Datos del problema
+        workers: Procesos a usar si no se da un pool (None = WORKERS, 0 = todos los núcleos)
+        pool: Pool ya creado con crear_pool() (opcional)
         
     Returns:
         List[Dict]: Población inicial de individuos
     """
-    print(f"🔄 Inicializando población con TSSP (tamaño: {POP_SIZE})", file=sys.stderr)
+    propio = pool is None
+    if propio:
+        pool = crear_pool(data, workers)
+    procesos = numero_workers(workers) if pool is not None else 1
+    print(f"🔄 Inicializando población con TSSP (tamaño: {POP_SIZE}, procesos: {procesos})",
+          file=sys.stderr)
+    semillas = [random.getrandbits(64) for _ in range(POP_SIZE)]
     poblacion = []
     
-    for i in range(POP_SIZE):
-        if i % 20 == 0 and i > 0:
-            print(f"   Generados {i}/{POP_SIZE} individuos...", file=sys.stderr)
-        
-        # Cada llamada genera una solución con variaciones aleatorias
-        individuo = generar_individuo_tssp(data)
-        poblacion.append(individuo)
+    if pool is not None:
+        individuos = pool.map(_generar_individuo_semilla, semillas,
+                              chunksize=tamaño_lote(POP_SIZE, procesos))
+        for i, individuo in enumerate(individuos):
+            if i % 20 == 0 and i > 0:
+                print(f"   Generados {i}/{POP_SIZE} individuos...", file=sys.stderr)
+            poblacion.append(individuo)
+        if propio:
+            pool.shutdown()
+    else:
+        for i, semilla in enumerate(semillas):
+            if i % 20 == 0 and i > 0:
+                print(f"   Generados {i}/{POP_SIZE} individuos...", file=sys.stderr)
+            
+            # Cada llamada genera una solución con variaciones aleatorias
+            individuo = generar_individuo_tssp(data, random.Random(semilla))
+            poblacion.append(individuo)
     
     print(f"✅ Población inicial generada exitosamente", file=sys.stderr)
     return poblacion
 
+# ============================================================================
+# POOL DE PROCESOS
+# ============================================================================
+
+# Datos del problema en cada proceso trabajador (se envían una vez por proceso)
+_DATOS_TRABAJADOR = None
+
+def parametros_operadores() -> Dict[str, Any]:
+    """
+    Parámetros globales que leen los operadores en los procesos del pool. Con
+    fork se heredan, pero con spawn o forkserver cada proceso importa el módulo
+    de nuevo y se quedaría con los valores por defecto.
+    """
+    return {'MUTATION_PROB': MUTATION_PROB, 'CROSSOVER_PROB': CROSSOVER_PROB,
+            'TOURNAMENT_K': TOURNAMENT_K, 'PROB_MOVIMIENTOS': PROB_MOVIMIENTOS}
+
+def _inicializar_trabajador(datos: Dict[str, Any], parametros: Dict[str, Any]) -> None:
+    """Recibe los datos del problema y los parámetros de los operadores en un proceso del pool y reconstruye el índice."""
+    global _DATOS_TRABAJADOR, PERFIL_EVALUACION
+    globals().update(parametros)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C lo atiende el proceso principal
+    datos['_indice'] = construir_indice(datos)
+    _DATOS_TRABAJADOR = datos
+    PERFIL_EVALUACION = None  # el perfil solo mide la evaluación del proceso principal
+
+def numero_workers(workers: int = None) -> int:
+    """Resuelve el número de procesos (None = WORKERS, 0 = todos los núcleos)."""
+    workers = WORKERS if workers is None else workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def tamaño_lote(tareas: int, procesos: int) -> int:
+    """Tareas por envío al pool: unos 4 lotes por proceso."""
+    return max(1, tareas // (4 * procesos))
+
+def crear_pool(data: Dict[str, Any], workers: int = None, contexto=None) -> ProcessPoolExecutor:
+    """
+    Crea el pool de procesos del GA, o retorna None si se trabaja con un solo proceso.
+    
+    Los datos del problema viajan una sola vez por proceso, en el inicializador
+    (heredados con fork; serializados una vez con spawn), junto con
+    parametros_operadores(). El índice compilado no se serializa: cada proceso
+    lo reconstruye al iniciar.
+    
+    Args:
+        data: Datos del problema
+        workers: Procesos (None = WORKERS, 0 = todos los núcleos)
+        contexto: Contexto de multiprocessing (None = el del sistema)
+        
+    Returns:
+        ProcessPoolExecutor o None
+    """
+    workers = numero_workers(workers)
+    if workers <= 1:
+        return None
+    datos = {k: v for k, v in data.items() if k != '_indice'}
+    return ProcessPoolExecutor(max_workers=workers, mp_context=contexto, initializer=_inicializar_trabajador,
+                               initargs=(datos, parametros_operadores()))
+
+def _generar_individuo_semilla(semilla: int) -> Dict[CourseCode, List[Tuple[Period, AulaID, str]]]:
+    """Construye un individuo TSSP en un proceso trabajador con su propia semilla."""
+    return generar_individuo_tssp(_DATOS_TRABAJADOR, random.Random(semilla))
+
+def _evaluar_en_trabajador(tarea: Tuple[Dict, float]) -> Tuple[float, float]:
+    """Evalúa un individuo en un proceso trabajador; retorna (inferior, superior)."""
+    individuo, cota = tarea
+    if cota is None:
+        fitness = evaluar_fitness(individuo, _DATOS_TRABAJADOR)
+        return fitness, fitness
+    return evaluar_por_etapas(individuo, _DATOS_TRABAJADOR, cota)
+
+def _variar_en_trabajador(tarea: Tuple[Dict, int, float]) -> Tuple[Dict, Counter]:
+    """Muta y repara un hijo en un proceso trabajador."""
+    hijo, semilla, prob_mutacion = tarea
+    return mutar_y_reparar(hijo, _DATOS_TRABAJADOR, semilla, prob_mutacion)
+
+# ============================================================================
+# INSTRUMENTACIÓN DE LA EVALUACIÓN
+# ============================================================================
+
+class PerfilEvaluacion:
+    """
+    Tiempo de reloj e invocaciones por bloque de restricción, acumulados en
+    toda la ejecución.
+    
+    Es opcional: _evaluar solo toma tiempos cuando PERFIL_EVALUACION es una
+    instancia de esta clase. Desactivado, el costo es una comparación con
+    None por bloque.
+    """
+    
+    def __init__(self):
+        self.segundos = defaultdict(float)
+        self.llamadas = defaultdict(int)
+        self.cortes = defaultdict(int)  # Evaluaciones por etapas cortadas tras cada etapa
+        self.evaluaciones = 0
+    
+    def marcar(self, bloque: str, inicio: float) -> float:
+        """
+        Carga al bloque el tiempo transcurrido desde inicio.
+        
+        Args:
+            bloque: Nombre del bloque ('H7', 'S1', ...)
+            inicio: Marca de time.perf_counter() del inicio del bloque
+            
+        Returns:
+            float: Marca de tiempo actual, inicio del bloque siguiente
+        """
+        ahora = time.perf_counter()
+        self.segundos[bloque] += ahora - inicio
+        self.llamadas[bloque] += 1
+        return ahora
+    
+    def filas(self) -> List[Dict[str, Any]]:
+        """Una fila por bloque, ordenadas de mayor a menor tiempo."""
+        total = sum(self.segundos.values()) or 1.0
+        filas = []
+        for bloque in sorted(self.segundos, key=self.segundos.get, reverse=True):
+            segundos, llamadas = self.segundos[bloque], self.llamadas[bloque]
+            filas.append({
+                'bloque': bloque,
+                'llamadas': llamadas,
+                'segundos': round(segundos, 6),
+                'us_por_llamada': round(segundos / llamadas * 1e6, 3),
+                'porcentaje': round(segundos / total, 4),
+            })
+        return filas
+    
+    def resumen(self) -> str:
+        """Tabla legible para stderr."""
+        lineas = [f"⏱️ Perfil de evaluación: {self.evaluaciones} evaluaciones, "
+                  f"{sum(self.segundos.values()):.3f}s en bloques de restricciones"]
+        for fila in self.filas():
+            lineas.append(f"   {fila['bloque']:<16} {fila['llamadas']:>9} llamadas "
+                          f"{fila['segundos']:>10.4f}s {fila['us_por_llamada']:>10.2f}us "
+                          f"{fila['porcentaje']:>7.1%}")
+        if self.cortes:
+            lineas.append(f"   Cortes por etapas: {dict(self.cortes)}")
+        return "\n".join(lineas)
+    
+    def guardar(self, ruta: str) -> None:
+        """
+        Guarda el perfil en CSV (si la ruta termina en .csv) o en JSON.
+        
+        Args:
+            ruta: Archivo de salida
+        """
+        filas = self.filas()
+        with open(ruta, 'w', encoding='utf-8', newline='') as f:
+            if ruta.lower().endswith('.csv'):
+                escritor = csv.DictWriter(f, fieldnames=['bloque', 'llamadas', 'segundos',
+                                                         'us_por_llamada', 'porcentaje'])
+                escritor.writeheader()
+                escritor.writerows(filas)
+            else:
+                json.dump({'evaluaciones': self.evaluaciones, 'cortes': dict(self.cortes),
+                           'bloques': filas}, f, indent=2, ensure_ascii=False)
+
 # ============================================================================
 # FUNCIÓN DE EVALUACIÓN (FITNESS)
 # ============================================================================
 
-def evaluar_solucion(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], 
-                    data: Dict[str, Any]) -> Tuple[float, Dict]:
+def obtener_pesos(data: Dict[str, Any]) -> Tuple[Dict[str, int], Dict[str, int]]:
     """
-    Calcula el fitness completo de una solución incluyendo nuevas restricciones.
+    Obtiene los pesos de restricciones duras (H) y blandas (S) del problema.
     
     Args:
-        individuo: Solución a evaluar
         data: Datos del problema
         
     Returns:
-        Tuple[float, Dict]: (fitness_total, diagnosticos)
+        Tuple[Dict, Dict]: (pesos_duras, pesos_blandas) indexados por restricción
     """
     M = data['pesos'].get('M', 1000000)
     pesos_duras = data.get('pesos', {}).get('restricciones_duras', {})
@@ -621,301 +1177,1291 @@ def evaluar_solucion(individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
         'S6': pesos_blandas.get('franjas_extremas', 1)
     }
 
+    return w_H, w_S
+
+def _evaluar(individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
+             data: Dict[str, Any], diagnosticos: Dict = None,
+             cota: float = None) -> Tuple[float, float]:
+    """
+    Núcleo de la función de fitness, compartido por evaluar_solucion,
+    evaluar_fitness y evaluar_por_etapas.
+    
+    Args:
+        individuo: Solución a evaluar
+        data: Datos del problema
+        diagnosticos: Diccionario a llenar con el desglose (None para omitirlo)
+        cota: Si se indica, se corta en cuanto el fitness supera la cota con certeza
+        
+    Returns:
+        Tuple[float, float]: Cotas (inferior, superior) del fitness; ambas iguales al
+        fitness_total cuando la evaluación es completa. Si se cortó, inferior > cota
+        y superior es inf si faltaron restricciones duras por evaluar.
+    """
+    perfil = PERFIL_EVALUACION
+    if perfil is not None:
+        perfil.evaluaciones += 1
+        t = time.perf_counter()
+    w_H, w_S = obtener_pesos(data)
+
     costo_duro = 0
     costo_blando = 0
-    diagnosticos = defaultdict(int)
 
     # Mapas de referencia
     mapa_cursos = data['_courses_map']
-    mapa_profesores = data['_profs_map']
-    mapa_aulas = {a['id']: a for a in data['_aulas_list']}
+    indice = data['_indice']
+    dia_de_periodo = indice.dia_de_periodo
+    posicion_en_dia = indice.posicion_en_dia
+    hora_inicio = indice.hora_inicio
+
+    # Codificar cada asignación una sola vez: (período, aula, profesor) con período entero
+    codificado = {
+        codigo_curso: [(indice.periodo_id[periodo], aula, profesor) for (periodo, aula, profesor) in asignaciones]
+        for codigo_curso, asignaciones in individuo.items()
+    }
+    if perfil is not None:
+        t = perfil.marcar('codificacion', t)
     
     # ========================================================================
     # EVALUACIÓN DE RESTRICCIONES DURAS
     # ========================================================================
     
-    # H2: Conflicto de profesor
-    contador_prof_periodo = defaultdict(lambda: defaultdict(int))
-    for codigo_curso, asignaciones in individuo.items():
-        for (periodo, aula, profesor) in asignaciones:
-            if profesor:
-                contador_prof_periodo[profesor][periodo] += 1
-    
-    for profesor, mapa_periodos in contador_prof_periodo.items():
-        for periodo, contador in mapa_periodos.items():
-            if contador > 1:
-                costo_duro += (contador - 1) * w_H['H2']
-                diagnosticos['H2_conflicto_profesor'] += (contador - 1)
+    # Las duras se evalúan por etapas, de las más baratas (por bloque) a las más
+    # caras (H10/H9). Con cota, se corta apenas el costo supera la cota con certeza
+    # (blando_min: cota inferior de las blandas).
+    if cota is not None:
+        blando_min, blando_max = cotas_blandas(codificado, data, w_S)
+        if any(w < 0 for w in w_H.values()):
+            cota = None  # con pesos negativos la suma parcial no es cota inferior
+        if perfil is not None:
+            t = perfil.marcar('cotas_blandas', t)
 
-    # H3: Disponibilidad profesor
-    for codigo_curso, asignaciones in individuo.items():
-        for (periodo, aula, profesor) in asignaciones:
-            if profesor and profesor in mapa_profesores:
-                disponibilidad = mapa_profesores[profesor].get('disponibilidad', set())
-                if disponibilidad and periodo not in disponibilidad:
-                    costo_duro += w_H['H3']
-                    diagnosticos['H3_prof_no_disponible'] += 1
+    # H7: Carga horaria del curso
+    for codigo_curso, asignaciones in codificado.items():
+        bloques_necesarios = mapa_cursos[codigo_curso]['_blocks_needed']
+        bloques_asignados = len(asignaciones)
+        if bloques_asignados != bloques_necesarios:
+            costo_duro += abs(bloques_asignados - bloques_necesarios) * w_H['H7']
+            if diagnosticos is not None:
+                diagnosticos['H7_carga_incorrecta'] += abs(bloques_asignados - bloques_necesarios)
 
-    # H4: Conflicto de aula
-    contador_aula_periodo = defaultdict(lambda: defaultdict(int))
-    for codigo_curso, asignaciones in individuo.items():
-        for (periodo, aula, profesor) in asignaciones:
-            contador_aula_periodo[aula][periodo] += 1
-    
-    for aula, mapa_periodos in contador_aula_periodo.items():
-        for periodo, contador in mapa_periodos.items():
-            if contador > 1:
-                costo_duro += (contador - 1) * w_H['H4']
-                diagnosticos['H4_conflicto_aula'] += (contador - 1)
+    if perfil is not None:
+        t = perfil.marcar('H7', t)
+
+    # H8: Mínimo bloques por curso (NUEVA RESTRICCIÓN)
+    for codigo_curso, asignaciones in codificado.items():
+        if len(asignaciones) < MIN_BLOCKS_PER_COURSE:
+            deficit = MIN_BLOCKS_PER_COURSE - len(asignaciones)
+            costo_duro += deficit * w_H['H8']
+            if diagnosticos is not None:
+                diagnosticos['H8_bloques_insuficientes'] += deficit
+
+    if perfil is not None:
+        t = perfil.marcar('H8', t)
 
     # H5: Capacidad de aula
-    for codigo_curso, asignaciones in individuo.items():
+    aula_id = indice.aula_id
+    for codigo_curso, asignaciones in codificado.items():
         estudiantes = mapa_cursos[codigo_curso].get('estudiantes', 30)
         for (periodo, aula, profesor) in asignaciones:
-            capacidad = mapa_aulas.get(aula, {}).get('capacidad', 999)
+            a = aula_id.get(aula)
+            capacidad = indice.capacidad_aula[a] if a is not None else 999
             if estudiantes > capacidad:
                 costo_duro += w_H['H5']
-                diagnosticos['H5_capacidad_excedida'] += 1
+                if diagnosticos is not None:
+                    diagnosticos['H5_capacidad_excedida'] += 1
+
+    if perfil is not None:
+        t = perfil.marcar('H5', t)
 
     # H6: Tipo de aula requerido
-    for codigo_curso, asignaciones in individuo.items():
+    for codigo_curso, asignaciones in codificado.items():
         tipo_requerido = mapa_cursos[codigo_curso].get('aula_tipo', None)
         if tipo_requerido:
             for (periodo, aula, profesor) in asignaciones:
-                if aula not in mapa_aulas:
+                a = aula_id.get(aula)
+                if a is None:
                     costo_duro += w_H['H6']
-                    diagnosticos['H6_aula_inexistente'] += 1
+                    if diagnosticos is not None:
+                        diagnosticos['H6_aula_inexistente'] += 1
                     continue
-                tipo_actual = mapa_aulas[aula]['tipo']
-                if tipo_requerido != tipo_actual:
+                if tipo_requerido != indice.tipo_aula[a]:
                     costo_duro += w_H['H6']
-                    diagnosticos['H6_tipo_incorrecto'] += 1
+                    if diagnosticos is not None:
+                        diagnosticos['H6_tipo_incorrecto'] += 1
 
-    # H7: Carga horaria del curso
-    for codigo_curso, asignaciones in individuo.items():
-        bloques_necesarios = mapa_cursos[codigo_curso]['_blocks_needed']
-        bloques_asignados = len(asignaciones)
-        if bloques_asignados != bloques_necesarios:
-            costo_duro += abs(bloques_asignados - bloques_necesarios) * w_H['H7']
-            diagnosticos['H7_carga_incorrecta'] += abs(bloques_asignados - bloques_necesarios)
+    if perfil is not None:
+        t = perfil.marcar('H6', t)
 
-    # H8: Mínimo bloques por curso (NUEVA RESTRICCIÓN)
-    for codigo_curso, asignaciones in individuo.items():
-        if len(asignaciones) < MIN_BLOCKS_PER_COURSE:
-            deficit = MIN_BLOCKS_PER_COURSE - len(asignaciones)
-            costo_duro += deficit * w_H['H8']
-            diagnosticos['H8_bloques_insuficientes'] += deficit
+    # H3: Disponibilidad profesor (máscara de bits por profesor)
+    disponibilidad_prof = indice.disponibilidad_prof
+    for codigo_curso, asignaciones in codificado.items():
+        for (periodo, aula, profesor) in asignaciones:
+            if profesor and profesor in disponibilidad_prof:
+                if not (disponibilidad_prof[profesor] >> periodo) & 1:
+                    costo_duro += w_H['H3']
+                    if diagnosticos is not None:
+                        diagnosticos['H3_prof_no_disponible'] += 1
 
-    # H9: Separación teoría-laboratorio (NUEVA RESTRICCIÓN)
-    cursos_por_base = defaultdict(list)
-    for codigo_curso, asignaciones in individuo.items():
-        codigo_base = mapa_cursos[codigo_curso].get('original_code', codigo_curso)
-        cursos_por_base[codigo_base].append((codigo_curso, asignaciones))
-    
-    for codigo_base, lista_componentes in cursos_por_base.items():
-        if len(lista_componentes) > 1:  # Curso con teoría y laboratorio
-            for i, (codigo1, asig1) in enumerate(lista_componentes):
-                for j, (codigo2, asig2) in enumerate(lista_componentes[i+1:], i+1):
-                    # Verificar separación entre componentes
-                    for (p1, a1, prof1) in asig1:
-                        for (p2, a2, prof2) in asig2:
-                            dia1, dia2 = obtener_dia_periodo(p1), obtener_dia_periodo(p2)
-                            if dia1 == dia2:  # Mismo día
-                                costo_duro += w_H['H9']
-                                diagnosticos['H9_teoria_lab_mismo_dia'] += 1
-                            elif calcular_diferencia_horas(p1, p2) < MIN_SEPARATION_HOURS:
-                                costo_duro += w_H['H9'] // 2
-                                diagnosticos['H9_separacion_insuficiente'] += 1
+    if perfil is not None:
+        t = perfil.marcar('H3', t)
+    if cota is not None and costo_duro + blando_min > cota:
+        if perfil is not None:
+            perfil.cortes['H3'] += 1
+        return costo_duro + blando_min, float('inf')
+
+    # H2: Conflicto de profesor
+    contador_prof_periodo = defaultdict(int)
+    for codigo_curso, asignaciones in codificado.items():
+        for (periodo, aula, profesor) in asignaciones:
+            if profesor:
+                contador_prof_periodo[(profesor, periodo)] += 1
+    
+    for contador in contador_prof_periodo.values():
+        if contador > 1:
+            costo_duro += (contador - 1) * w_H['H2']
+            if diagnosticos is not None:
+                diagnosticos['H2_conflicto_profesor'] += (contador - 1)
+
+    if perfil is not None:
+        t = perfil.marcar('H2', t)
+
+    # H4: Conflicto de aula
+    contador_aula_periodo = defaultdict(int)
+    for codigo_curso, asignaciones in codificado.items():
+        for (periodo, aula, profesor) in asignaciones:
+            contador_aula_periodo[(aula, periodo)] += 1
+    
+    for contador in contador_aula_periodo.values():
+        if contador > 1:
+            costo_duro += (contador - 1) * w_H['H4']
+            if diagnosticos is not None:
+                diagnosticos['H4_conflicto_aula'] += (contador - 1)
+
+    if perfil is not None:
+        t = perfil.marcar('H4', t)
+    if cota is not None and costo_duro + blando_min > cota:
+        if perfil is not None:
+            perfil.cortes['H4'] += 1
+        return costo_duro + blando_min, float('inf')
 
     # H10: Bloques consecutivos (NUEVA RESTRICCIÓN)
     # Los cursos deben tener bloques consecutivos de mínimo 2 y máximo 4 horas
-    for codigo_curso, asignaciones in individuo.items():
+    for codigo_curso, asignaciones in codificado.items():
         if len(asignaciones) == 0:
             continue
-            
-        periodos = [periodo for periodo, _, _ in asignaciones]
-        bloques_consecutivos = obtener_periodos_consecutivos(periodos, data)
         
         # Verificar que todos los bloques estén en rangos válidos
-        for bloque in bloques_consecutivos:
+        for bloque in agrupar_consecutivos([p for p, _, _ in asignaciones], indice):
             tamaño_bloque = len(bloque)
-            
             if tamaño_bloque == 1:  # Bloques de 1 hora no permitidos
                 costo_duro += w_H['H10']
-                diagnosticos['H10_bloque_unitario'] += 1
+                if diagnosticos is not None:
+                    diagnosticos['H10_bloque_unitario'] += 1
             elif tamaño_bloque < MIN_CONSECUTIVE_BLOCKS:
                 deficit = MIN_CONSECUTIVE_BLOCKS - tamaño_bloque
                 costo_duro += deficit * w_H['H10']
-                diagnosticos['H10_bloque_muy_pequeño'] += deficit
+                if diagnosticos is not None:
+                    diagnosticos['H10_bloque_muy_pequeño'] += deficit
             elif tamaño_bloque > MAX_CONSECUTIVE_BLOCKS:
                 exceso = tamaño_bloque - MAX_CONSECUTIVE_BLOCKS
                 costo_duro += exceso * w_H['H10']
-                diagnosticos['H10_bloque_muy_grande'] += exceso
+                if diagnosticos is not None:
+                    diagnosticos['H10_bloque_muy_grande'] += exceso
+
+    if perfil is not None:
+        t = perfil.marcar('H10', t)
+
+    # H9: Separación teoría-laboratorio (NUEVA RESTRICCIÓN)
+    # Solo cursos base con 2+ componentes (índice precalculado); cada componente
+    # lleva sus bloques como (día, hora) y una máscara de días para descartar
+    # rápido los pares sin días en común.
+    for codigo_base, componentes in indice.componentes_por_base.items():
+        bloques = []
+        mascaras = []
+        for codigo in componentes:
+            dias_horas = [(dia_de_periodo[p], hora_inicio[p]) for (p, _, _) in codificado.get(codigo, ())]
+            mascara = 0
+            for dia, _ in dias_horas:
+                mascara |= 1 << dia
+            bloques.append(dias_horas)
+            mascaras.append(mascara)
+        for i in range(len(componentes)):
+            for j in range(i + 1, len(componentes)):
+                dias_comunes = mascaras[i] & mascaras[j]
+                # Verificar separación entre componentes
+                for (dia1, hora1) in bloques[i]:
+                    for (dia2, hora2) in bloques[j]:
+                        if dias_comunes and dia1 == dia2:  # Mismo día
+                            costo_duro += w_H['H9']
+                            if diagnosticos is not None:
+                                diagnosticos['H9_teoria_lab_mismo_dia'] += 1
+                        elif abs(hora2 - hora1) < MIN_SEPARATION_HOURS:
+                            costo_duro += w_H['H9'] // 2
+                            if diagnosticos is not None:
+                                diagnosticos['H9_separacion_insuficiente'] += 1
+
+    if perfil is not None:
+        t = perfil.marcar('H9', t)
+    if cota is not None and costo_duro + blando_min > cota:
+        if perfil is not None:
+            perfil.cortes['H9'] += 1
+        return costo_duro + blando_min, costo_duro + blando_max
 
     # ========================================================================
     # EVALUACIÓN DE RESTRICCIONES BLANDAS
     # ========================================================================
     
     # S1: Minimización de huecos por profesor
-    horario_profesores = defaultdict(lambda: defaultdict(list))
-    for codigo_curso, asignaciones in individuo.items():
+    horario_profesores = defaultdict(list)  # (profesor, día) -> posiciones en el día
+    for codigo_curso, asignaciones in codificado.items():
         for (periodo, aula, profesor) in asignaciones:
             if profesor:
-                dia = obtener_dia_periodo(periodo)
-                horario_profesores[profesor][dia].append(periodo)
-    
-    # Crear orden de períodos por día
-    orden_dias = {}
-    for periodo in data['periodos']:
-        dia = obtener_dia_periodo(periodo)
-        if dia not in orden_dias:
-            orden_dias[dia] = []
-        orden_dias[dia].append(periodo)
-    
-    for dia in orden_dias:
-        periodos_ordenados = [x for x in data['periodos'] if obtener_dia_periodo(x) == dia]
-        orden_dias[dia] = {periodo: indice for indice, periodo in enumerate(periodos_ordenados)}
+                horario_profesores[(profesor, dia_de_periodo[periodo])].append(posicion_en_dia[periodo])
     
     # Calcular huecos por profesor
-    for profesor, dias in horario_profesores.items():
-        for dia, lista_periodos in dias.items():
-            if not lista_periodos or dia not in orden_dias:
-                continue
-            indices = sorted(orden_dias[dia].get(p, 0) for p in lista_periodos)
-            if not indices:
-                continue
-            
-            rango_total = indices[-1] - indices[0] + 1
-            huecos = rango_total - len(indices)
-            costo_blando += huecos * w_S['S1']
+    for posiciones in horario_profesores.values():
+        rango_total = max(posiciones) - min(posiciones) + 1
+        huecos = rango_total - len(posiciones)
+        costo_blando += huecos * w_S['S1']
+        if diagnosticos is not None:
             diagnosticos['S1_huecos_profesor'] += huecos
 
+    if perfil is not None:
+        t = perfil.marcar('S1', t)
+
     # S2: Turno preferido por estudiantes
     turno_preferido = data['preferencias'].get('turno_preferido', 'morning')
-    for codigo_curso, asignaciones in individuo.items():
-        for (periodo, aula, profesor) in asignaciones:
-            if turno_preferido == 'morning' and not es_periodo_matutino(periodo):
-                costo_blando += w_S['S2']
-                diagnosticos['S2_turno_incorrecto'] += 1
+    if turno_preferido == 'morning':
+        for codigo_curso, asignaciones in codificado.items():
+            for (periodo, aula, profesor) in asignaciones:
+                if not indice.es_matutino[periodo]:
+                    costo_blando += w_S['S2']
+                    if diagnosticos is not None:
+                        diagnosticos['S2_turno_incorrecto'] += 1
+
+    if perfil is not None:
+        t = perfil.marcar('S2', t)
 
     # S3: Distribución semanal equilibrada (NUEVA)
-    for codigo_curso, asignaciones in individuo.items():
-        dias_usados = set(obtener_dia_periodo(p) for p, _, _ in asignaciones)
+    for codigo_curso, asignaciones in codificado.items():
+        dias_usados = set(dia_de_periodo[p] for p, _, _ in asignaciones)
         if len(asignaciones) > 1 and len(dias_usados) == 1:
             # Penalizar si todas las sesiones están en el mismo día
             costo_blando += w_S['S3'] * len(asignaciones)
-            diagnosticos['S3_concentracion_un_dia'] += len(asignaciones)
+            if diagnosticos is not None:
+                diagnosticos['S3_concentracion_un_dia'] += len(asignaciones)
+
+    if perfil is not None:
+        t = perfil.marcar('S3', t)
 
     # S4: Evitar sesiones consecutivas del mismo curso (ya implementada en TSSP)
     # Se evalúa durante la construcción TSSP
 
     # S6: Franjas extremas
-    for codigo_curso, asignaciones in individuo.items():
+    for codigo_curso, asignaciones in codificado.items():
         for (periodo, aula, profesor) in asignaciones:
-            try:
-                hora = int(periodo.split('_')[1].split(':')[0])
-                if hora <= 7 or hora >= 19:  # Franjas extremas
-                    costo_blando += w_S['S6']
+            if indice.es_extremo[periodo]:
+                costo_blando += w_S['S6']
+                if diagnosticos is not None:
                     diagnosticos['S6_franja_extrema'] += 1
-            except:
-                pass
+    if perfil is not None:
+        perfil.marcar('S6', t)
 
     # ========================================================================
     # CÁLCULO FINAL DEL FITNESS
     # ========================================================================
     
     fitness_total = costo_duro + costo_blando
-    diagnosticos['costo_duro'] = costo_duro
-    diagnosticos['costo_blando'] = costo_blando
-    diagnosticos['fitness_total'] = fitness_total
+    if diagnosticos is not None:
+        diagnosticos['costo_duro'] = costo_duro
+        diagnosticos['costo_blando'] = costo_blando
+        diagnosticos['fitness_total'] = fitness_total
     
-    return fitness_total, diagnosticos
+    return fitness_total, fitness_total
 
-# ============================================================================
-# OPERADORES DE REPARACIÓN
-# ============================================================================
-
-def reparar_individuo(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], 
-                     data: Dict[str, Any]) -> Dict[str, List[Tuple[Period, AulaID, str]]]:
+def evaluar_solucion(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], 
+                    data: Dict[str, Any], con_diagnosticos: bool = True) -> Tuple[float, Dict]:
     """
-    Repara violaciones críticas de restricciones duras en un individuo.
+    Calcula el fitness completo de una solución incluyendo nuevas restricciones.
     
     Args:
-        individuo: Solución a reparar
+        individuo: Solución a evaluar
+        data: Datos del problema
+        con_diagnosticos: Si es False no se arma el desglose por restricción
+        
+    Returns:
+        Tuple[float, Dict]: (fitness_total, diagnosticos); diagnosticos es None
+        cuando con_diagnosticos es False
+    """
+    diagnosticos = defaultdict(int) if con_diagnosticos else None
+    fitness_total, _ = _evaluar(individuo, data, diagnosticos)
+    return fitness_total, diagnosticos
+
+def evaluar_fitness(individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
+                    data: Dict[str, Any]) -> float:
+    """
+    Camino rápido para el bucle del GA: solo el costo escalar, sin diagnósticos.
+    
+    Args:
+        individuo: Solución a evaluar
+        data: Datos del problema
+        
+    Returns:
+        float: fitness_total
+    """
+    return _evaluar(individuo, data)[0]
+
+def evaluar_por_etapas(individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
+                       data: Dict[str, Any], cota: float) -> Tuple[float, float]:
+    """
+    Evaluación multi-fidelidad: restricciones duras primero (baratas antes que
+    caras) y blandas solo si el individuo todavía puede quedar bajo la cota.
+    
+    Args:
+        individuo: Solución a evaluar
+        data: Datos del problema
+        cota: Fitness a partir del cual el individuo ya no interesa
+        
+    Returns:
+        Tuple[float, float]: Cotas (inferior, superior) del fitness
+    """
+    return _evaluar(individuo, data, cota=cota)
+
+def cotas_blandas(codificado: Dict[str, List[Tuple[int, AulaID, str]]], data: Dict[str, Any],
+                  w_S: Dict[str, int]) -> Tuple[float, float]:
+    """
+    Acota el costo blando de un individuo a partir de su número de bloques.
+    
+    Cada término S se acota por un conteo; S1 puede ser negativo cuando un
+    profesor repite período en el mismo día.
+    
+    Args:
+        codificado: Asignaciones con períodos codificados como enteros
+        data: Datos del problema
+        w_S: Pesos de las restricciones blandas
+        
+    Returns:
+        Tuple[float, float]: (mínimo, máximo) posibles del costo blando
+    """
+    indice = data['_indice']
+    n_bloques = sum(len(asignaciones) for asignaciones in codificado.values())
+    n_con_profesor = sum(1 for asignaciones in codificado.values()
+                         for (_, _, profesor) in asignaciones if profesor)
+    largo_dia = max((len(ps) for ps in indice.periodos_por_dia), default=0)
+    conteos = {
+        'S1': (-n_con_profesor, largo_dia * n_con_profesor),
+        'S2': (0, n_bloques),
+        'S3': (0, n_bloques),
+        'S6': (0, n_bloques),
+    }
+    minimo = maximo = 0
+    for clave, (c_min, c_max) in conteos.items():
+        w = w_S[clave]
+        minimo += min(c_min * w, c_max * w)
+        maximo += max(c_min * w, c_max * w)
+    return minimo, maximo
+
+# ============================================================================
+# EVALUACIÓN INCREMENTAL (DELTA)
+# ============================================================================
+
+class EvaluadorIncremental:
+    """
+    Evaluador con estado para un individuo.
+    
+    Mantiene los mismos contadores que evaluar_solucion (profesor/período,
+    aula/período, horario diario por profesor, componentes por curso base) y,
+    ante el movimiento de un bloque, recalcula solo los términos afectados:
+    los contadores del bloque movido, H9 del curso base, H10/S3 del curso y
+    S1 de los pares (profesor, día) de origen y destino.
+    
+    El fitness y los diagnósticos coinciden exactamente con evaluar_solucion.
+    """
+
+    def __init__(self, individuo: Dict[str, List[Tuple[Period, AulaID, str]]],
+                 data: Dict[str, Any]):
+        self.data = data
+        self.w_H, self.w_S = obtener_pesos(data)
+        self.individuo = {codigo: list(asig) for codigo, asig in individuo.items()}
+
+        mapa_cursos = data['_courses_map']
+        self._mapa_cursos = mapa_cursos
+        self._indice = data['_indice']
+        self._turno_matutino = data['preferencias'].get('turno_preferido', 'morning') == 'morning'
+
+        # Componentes (teoría/laboratorio) agrupados por curso base
+        self._base_de = self._indice.base_de
+        self._componentes = self._indice.componentes_por_base
+
+        # Contadores de ocupación
+        self._prof_periodo = defaultdict(int)
+        self._aula_periodo = defaultdict(int)
+        self._prof_dia = defaultdict(list)  # (profesor, día) -> índices en el día
+        self._bloques_con_profesor = 0
+
+        # Totales acumulados y contribución vigente de cada grupo de términos
+        self.costo_duro = 0
+        self.costo_blando = 0
+        self._conteos = defaultdict(int)
+        self._contribuciones = {}
+
+        for codigo, asignaciones in self.individuo.items():
+            self._sumar(self._terminos_carga(codigo), 1)
+            for slot in asignaciones:
+                self._agregar_bloque(codigo, slot, 1)
+            self._refrescar(('curso', codigo))
+        for base in self._componentes:
+            self._refrescar(('base', base))
+        for prof, dia in list(self._prof_dia.keys()):
+            self._refrescar(('huecos', prof, dia))
+
+    @property
+    def fitness(self) -> float:
+        return self.costo_duro + self.costo_blando
+
+    def diagnosticos(self) -> Dict[str, int]:
+        """Construye el diccionario de diagnósticos con el formato de evaluar_solucion."""
+        diagnosticos = defaultdict(int)
+        for clave, valor in self._conteos.items():
+            if valor:
+                diagnosticos[clave] = valor
+        if self._bloques_con_profesor:
+            # evaluar_solucion siempre registra S1 si hay bloques con profesor
+            diagnosticos['S1_huecos_profesor'] += 0
+        diagnosticos['costo_duro'] = self.costo_duro
+        diagnosticos['costo_blando'] = self.costo_blando
+        diagnosticos['fitness_total'] = self.fitness
+        return diagnosticos
+
+    def mover(self, codigo: CourseCode, indice: int,
+              nuevo_slot: Tuple[Period, AulaID, str]) -> float:
+        """
+        Reemplaza el bloque `indice` del curso por `nuevo_slot` y actualiza el fitness.
+        
+        Returns:
+            float: Fitness total tras el movimiento
+        """
+        viejo_slot = self.individuo[codigo][indice]
+        if viejo_slot == nuevo_slot:
+            return self.fitness
+
+        self._agregar_bloque(codigo, viejo_slot, -1)
+        self.individuo[codigo][indice] = nuevo_slot
+        self._agregar_bloque(codigo, nuevo_slot, 1)
+
+        self._refrescar(('curso', codigo))
+        self._refrescar(('base', self._base_de[codigo]))
+        for periodo, _, prof in (viejo_slot, nuevo_slot):
+            if prof:
+                p = self._indice.periodo_id[periodo]
+                self._refrescar(('huecos', prof, self._indice.dia_de_periodo[p]))
+        return self.fitness
+
+    def delta_movimiento(self, codigo: CourseCode, indice: int,
+                         nuevo_slot: Tuple[Period, AulaID, str]) -> float:
+        """Calcula el cambio de fitness de un movimiento sin aplicarlo."""
+        viejo_slot = self.individuo[codigo][indice]
+        fitness_actual = self.fitness
+        nuevo_fitness = self.mover(codigo, indice, nuevo_slot)
+        self.mover(codigo, indice, viejo_slot)
+        return nuevo_fitness - fitness_actual
+
+    # ------------------------------------------------------------------------
+    # Mantenimiento interno del estado
+    # ------------------------------------------------------------------------
+
+    def _sumar(self, contribucion: Tuple[int, int, Dict[str, int]], signo: int):
+        duro, blando, conteos = contribucion
+        self.costo_duro += signo * duro
+        self.costo_blando += signo * blando
+        for clave, valor in conteos.items():
+            self._conteos[clave] += signo * valor
+
+    def _refrescar(self, clave: Tuple):
+        """Sustituye la contribución guardada de un grupo por su valor actual."""
+        anterior = self._contribuciones.pop(clave, None)
+        if anterior is not None:
+            self._sumar(anterior, -1)
+        if clave[0] == 'curso':
+            nueva = self._terminos_curso(clave[1])
+        elif clave[0] == 'base':
+            nueva = self._terminos_base(clave[1])
+        else:
+            nueva = self._terminos_huecos(clave[1], clave[2])
+        self._contribuciones[clave] = nueva
+        self._sumar(nueva, 1)
+
+    def _agregar_bloque(self, codigo: CourseCode, slot: Tuple[Period, AulaID, str], signo: int):
+        """Suma (signo=1) o resta (signo=-1) los términos que dependen de un solo bloque."""
+        periodo, aula, prof = slot
+        w_H, w_S = self.w_H, self.w_S
+        indice = self._indice
+        p = indice.periodo_id[periodo]
+        a = indice.aula_id.get(aula)
+        curso = self._mapa_cursos[codigo]
+        duro = 0
+        blando = 0
+        conteos = {}
+
+        # H2: Conflicto de profesor
+        if prof:
+            if signo < 0:
+                self._prof_periodo[(prof, p)] -= 1
+            if self._prof_periodo[(prof, p)] > 0:
+                duro += w_H['H2']
+                conteos['H2_conflicto_profesor'] = 1
+            if signo > 0:
+                self._prof_periodo[(prof, p)] += 1
+            self._bloques_con_profesor += signo
+            posiciones = self._prof_dia[(prof, indice.dia_de_periodo[p])]
+            if signo > 0:
+                posiciones.append(indice.posicion_en_dia[p])
+            else:
+                posiciones.remove(indice.posicion_en_dia[p])
+
+        # H3: Disponibilidad profesor
+        if prof and prof in indice.disponibilidad_prof:
+            if not (indice.disponibilidad_prof[prof] >> p) & 1:
+                duro += w_H['H3']
+                conteos['H3_prof_no_disponible'] = 1
+
+        # H4: Conflicto de aula
+        if signo < 0:
+            self._aula_periodo[(aula, p)] -= 1
+        if self._aula_periodo[(aula, p)] > 0:
+            duro += w_H['H4']
+            conteos['H4_conflicto_aula'] = 1
+        if signo > 0:
+            self._aula_periodo[(aula, p)] += 1
+
+        # H5: Capacidad de aula
+        capacidad = indice.capacidad_aula[a] if a is not None else 999
+        if curso.get('estudiantes', 30) > capacidad:
+            duro += w_H['H5']
+            conteos['H5_capacidad_excedida'] = 1
+
+        # H6: Tipo de aula requerido
+        tipo_requerido = curso.get('aula_tipo', None)
+        if tipo_requerido:
+            if a is None:
+                duro += w_H['H6']
+                conteos['H6_aula_inexistente'] = 1
+            elif indice.tipo_aula[a] != tipo_requerido:
+                duro += w_H['H6']
+                conteos['H6_tipo_incorrecto'] = 1
+
+        # S2: Turno preferido por estudiantes
+        if self._turno_matutino and not indice.es_matutino[p]:
+            blando += w_S['S2']
+            conteos['S2_turno_incorrecto'] = 1
+
+        # S6: Franjas extremas
+        if indice.es_extremo[p]:
+            blando += w_S['S6']
+            conteos['S6_franja_extrema'] = 1
+
+        self._sumar((duro, blando, conteos), signo)
+
+    def _terminos_carga(self, codigo: CourseCode) -> Tuple[int, int, Dict[str, int]]:
+        """H7 y H8: dependen solo del número de bloques, que un movimiento no cambia."""
+        asignados = len(self.individuo[codigo])
+        necesarios = self._mapa_cursos[codigo]['_blocks_needed']
+        duro = 0
+        conteos = {}
+        if asignados != necesarios:
+            duro += abs(asignados - necesarios) * self.w_H['H7']
+            conteos['H7_carga_incorrecta'] = abs(asignados - necesarios)
+        if asignados < MIN_BLOCKS_PER_COURSE:
+            deficit = MIN_BLOCKS_PER_COURSE - asignados
+            duro += deficit * self.w_H['H8']
+            conteos['H8_bloques_insuficientes'] = deficit
+        return duro, 0, conteos
+
+    def _terminos_curso(self, codigo: CourseCode) -> Tuple[int, int, Dict[str, int]]:
+        """H10 (bloques consecutivos) y S3 (concentración en un día) de un curso."""
+        asignaciones = self.individuo[codigo]
+        duro = 0
+        blando = 0
+        conteos = defaultdict(int)
+
+        periodos = [self._indice.periodo_id[periodo] for periodo, _, _ in asignaciones]
+        if not periodos:
+            return 0, 0, conteos
+
+        for bloque in agrupar_consecutivos(periodos, self._indice):
+            if len(bloque) == 1:
+                duro += self.w_H['H10']
+                conteos['H10_bloque_unitario'] += 1
+            elif len(bloque) > MAX_CONSECUTIVE_BLOCKS:
+                exceso = len(bloque) - MAX_CONSECUTIVE_BLOCKS
+                duro += exceso * self.w_H['H10']
+                conteos['H10_bloque_muy_grande'] += exceso
+
+        dias_usados = set(self._indice.dia_de_periodo[p] for p in periodos)
+        if len(asignaciones) > 1 and len(dias_usados) == 1:
+            blando += self.w_S['S3'] * len(asignaciones)
+            conteos['S3_concentracion_un_dia'] += len(asignaciones)
+
+        return duro, blando, conteos
+
+    def _terminos_base(self, base: str) -> Tuple[int, int, Dict[str, int]]:
+        """H9: separación entre componentes del mismo curso base."""
+        componentes = self._componentes.get(base, ())
+        duro = 0
+        conteos = defaultdict(int)
+        if len(componentes) < 2:
+            return duro, 0, conteos
+        indice = self._indice
+        periodos = {codigo: [indice.periodo_id[p] for p, _, _ in self.individuo[codigo]]
+                    for codigo in componentes}
+        for i, codigo1 in enumerate(componentes):
+            for codigo2 in componentes[i + 1:]:
+                for p1 in periodos[codigo1]:
+                    for p2 in periodos[codigo2]:
+                        if indice.dia_de_periodo[p1] == indice.dia_de_periodo[p2]:
+                            duro += self.w_H['H9']
+                            conteos['H9_teoria_lab_mismo_dia'] += 1
+                        elif abs(indice.hora_inicio[p1] - indice.hora_inicio[p2]) < MIN_SEPARATION_HOURS:
+                            duro += self.w_H['H9'] // 2
+                            conteos['H9_separacion_insuficiente'] += 1
+        return duro, 0, conteos
+
+    def _terminos_huecos(self, prof: str, dia: str) -> Tuple[int, int, Dict[str, int]]:
+        """S1: huecos del profesor en un día."""
+        indices = self._prof_dia.get((prof, dia))
+        if not indices:
+            return 0, 0, {}
+        huecos = max(indices) - min(indices) + 1 - len(indices)
+        return 0, huecos * self.w_S['S1'], {'S1_huecos_profesor': huecos}
+
+# ============================================================================
+# BÚSQUEDA LOCAL (MEMÉTICA)
+# ============================================================================
+
+def busqueda_local(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], data: Dict[str, Any],
+                   limite: float = None, max_evaluaciones: int = None) -> Tuple[Dict, float, int, int]:
+    """
+    Hill climbing de primera mejora sobre un individuo, puntuado con
+    EvaluadorIncremental (cada movimiento recalcula solo los términos que toca).
+    
+    Recorre los bloques en orden aleatorio y, para cada uno, prueba en este
+    orden: moverlo a otro período (misma aula), cambiarlo a otra aula del tipo
+    requerido (mismo período) e intercambiar su aula con otro bloque del mismo
+    período. Se queda con el primer movimiento que baja el fitness y sigue con
+    el siguiente bloque; repite pasadas hasta que una pasada completa no mejora
+    o se agota el presupuesto (revisado entre bloques).
+    
+    Args:
+        individuo: Individuo a mejorar (no se modifica)
+        data: Datos del problema
+        limite: Segundos máximos (None = sin tope de tiempo)
+        max_evaluaciones: Movimientos evaluados como máximo (None = sin tope).
+            A diferencia del tiempo, no depende de la máquina: con la misma
+            semilla el resultado es el mismo
+        
+    Returns:
+        Tuple[Dict, float, int, int]: (individuo mejorado, fitness, movimientos
+        aceptados, movimientos evaluados)
+    """
+    fin = time.perf_counter() + limite if limite else None
+    evaluador = EvaluadorIncremental(individuo, data)
+    horario = evaluador.individuo
+    indice = data['_indice']
+    mapa_cursos = data['_courses_map']
+    bloques = [(codigo, i) for codigo, asignaciones in horario.items() for i in range(len(asignaciones))]
+    aceptados = 0
+    evaluaciones = 0
+
+    def agotado() -> bool:
+        return ((max_evaluaciones is not None and evaluaciones >= max_evaluaciones)
+                or (fin is not None and time.perf_counter() >= fin))
+
+    def probar(codigo: CourseCode, i: int, slot: Tuple[Period, AulaID, str]) -> bool:
+        nonlocal evaluaciones
+        evaluaciones += 1
+        actual = evaluador.fitness
+        anterior = horario[codigo][i]
+        if evaluador.mover(codigo, i, slot) < actual:
+            return True
+        evaluador.mover(codigo, i, anterior)
+        return False
+
+    def probar_intercambio(codigo: CourseCode, i: int, otro: CourseCode, j: int) -> bool:
+        nonlocal evaluaciones
+        evaluaciones += 1
+        actual = evaluador.fitness
+        (periodo, aula, prof), (periodo2, aula2, prof2) = horario[codigo][i], horario[otro][j]
+        evaluador.mover(codigo, i, (periodo, aula2, prof))
+        if evaluador.mover(otro, j, (periodo2, aula, prof2)) < actual:
+            return True
+        evaluador.mover(otro, j, (periodo2, aula2, prof2))
+        evaluador.mover(codigo, i, (periodo, aula, prof))
+        return False
+
+    def mejorar_bloque(codigo: CourseCode, i: int, por_periodo: Dict[Period, List]) -> bool:
+        periodo, aula, prof = horario[codigo][i]
+        # 1. Mover a otro período
+        for nuevo in random.sample(indice.periodos, len(indice.periodos)):
+            if nuevo != periodo and probar(codigo, i, (nuevo, aula, prof)):
+                return True
+        # 2. Cambiar de aula en el mismo período
+        tipo = mapa_cursos[codigo].get('aula_tipo')
+        aulas = indice.aulas_por_tipo.get(tipo, ()) if tipo else indice.aulas
+        for nueva in random.sample(aulas, len(aulas)):
+            if nueva != aula and probar(codigo, i, (periodo, nueva, prof)):
+                return True
+        # 3. Intercambiar aulas con otro bloque del mismo período
+        for otro, j in por_periodo.get(periodo, ()):
+            slot_otro = horario[otro][j]
+            if slot_otro[0] == periodo and slot_otro[1] != aula and probar_intercambio(codigo, i, otro, j):
+                return True
+        return False
+
+    mejoro = True
+    while mejoro and not agotado():
+        mejoro = False
+        por_periodo = defaultdict(list)  # se rearma por pasada; los datos viejos se verifican al usarlos
+        for codigo, i in bloques:
+            por_periodo[horario[codigo][i][0]].append((codigo, i))
+        random.shuffle(bloques)
+        for codigo, i in bloques:
+            if agotado():
+                break
+            if mejorar_bloque(codigo, i, por_periodo):
+                aceptados += 1
+                mejoro = True
+    return horario, evaluador.fitness, aceptados, evaluaciones
+
+class EstadisticasBusquedaLocal:
+    """Acumula fases, movimientos aceptados y evaluados, mejora total y tiempo de la búsqueda local."""
+
+    def __init__(self):
+        self.fases = 0
+        self.movimientos = 0
+        self.mejora = 0
+        self.evaluaciones = 0
+        self.segundos = 0.0
+
+    def resumen(self) -> str:
+        return (f"🧗 Búsqueda local: {self.fases} fases, {self.movimientos} movimientos aceptados, "
+                f"mejora total {self.mejora:.2f}, {self.segundos:.2f}s")
+
+def fase_busqueda_local(poblacion: List[Dict], fitness_values, data: Dict[str, Any],
+                        estadisticas: EstadisticasBusquedaLocal, top: int = None, tiempo: float = None,
+                        evaluaciones: int = None):
+    """
+    Aplica busqueda_local() a los `top` mejores de la población, en el lugar.
+    
+    Args:
+        poblacion: Población evaluada
+        fitness_values: Su fitness (lista o FitnessPorEtapas); se actualiza con el
+            fitness exacto de los individuos mejorados
+        data: Datos del problema
+        estadisticas: Acumulador de la corrida
+        top: Individuos a mejorar (None = BUSQUEDA_LOCAL_TOP)
+        tiempo: Segundos para toda la fase, repartidos en partes iguales entre
+            los que faltan (None = BUSQUEDA_LOCAL_TIEMPO; 0 = sin tope). Depende
+            de la carga de la máquina, así que con tope la corrida deja de ser
+            reproducible con la misma semilla
+        evaluaciones: Movimientos evaluados en toda la fase, repartidos igual
+            que el tiempo (None = BUSQUEDA_LOCAL_EVALUACIONES; 0 = sin tope)
+        
+    Returns:
+        fitness_values actualizado
+    """
+    top = top or BUSQUEDA_LOCAL_TOP
+    tiempo = BUSQUEDA_LOCAL_TIEMPO if tiempo is None else tiempo
+    evaluaciones = BUSQUEDA_LOCAL_EVALUACIONES if evaluaciones is None else evaluaciones
+    inicio = time.perf_counter()
+    valores = fitness_values.inferior if isinstance(fitness_values, FitnessPorEtapas) else fitness_values
+    elegidos = sorted(range(len(poblacion)), key=lambda i: valores[i])[:top]
+    for n, i in enumerate(elegidos):
+        limite = cupo = None
+        if tiempo:
+            limite = (inicio + tiempo - time.perf_counter()) / (len(elegidos) - n)
+            if limite <= 0:
+                break
+        if evaluaciones:
+            cupo = evaluaciones // (len(elegidos) - n)
+            if cupo <= 0:
+                break
+        previo = fitness_values[i]
+        mejorado, fitness, aceptados, usadas = busqueda_local(poblacion[i], data, limite, cupo)
+        estadisticas.evaluaciones += usadas
+        if evaluaciones:
+            evaluaciones = max(0, evaluaciones - usadas)
+        if aceptados:
+            poblacion[i] = mejorado
+            if isinstance(fitness_values, FitnessPorEtapas):
+                fitness_values.fijar(i, fitness)
+            else:
+                fitness_values[i] = fitness
+            estadisticas.movimientos += aceptados
+            estadisticas.mejora += previo - fitness
+    estadisticas.fases += 1
+    estadisticas.segundos += time.perf_counter() - inicio
+    return fitness_values
+
+# ============================================================================
+# OPERADORES DE REPARACIÓN
+# ============================================================================
+
+def gen_propio(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], propios: Set[CourseCode],
+               codigo_curso: CourseCode) -> List[Tuple[Period, AulaID, str]]:
+    """
+    Copia en escritura de un gen (lista de asignaciones de un curso).
+    
+    Los hijos comparten con sus padres las listas de los cursos que no cambian;
+    antes de la primera escritura sobre un curso, el operador llama a esta
+    función para que el individuo tenga su propia copia de esa lista.
+    
+    Args:
+        individuo: Individuo que se va a modificar (dict propio del operador)
+        propios: Cursos cuya lista ya se copió en este individuo
+        codigo_curso: Curso a modificar
+        
+    Returns:
+        list: Lista de asignaciones del curso, ya propia del individuo
+    """
+    if codigo_curso not in propios:
+        individuo[codigo_curso] = list(individuo[codigo_curso])
+        propios.add(codigo_curso)
+    return individuo[codigo_curso]
+
+def reparar_individuo(individuo: Dict[str, List[Tuple[Period, AulaID, str]]], 
+                     data: Dict[str, Any], estadisticas: Counter = None) -> Dict[str, List[Tuple[Period, AulaID, str]]]:
+    """
+    Repara violaciones de restricciones duras moviendo bloques a slots libres.
+    
+    Mantiene índices de ocupación (aula, período), (profesor, período) y días
+    por curso que se actualizan en cada movimiento, de modo que un bloque solo
+    se mueve a un slot donde no crea conflictos de aula (H4) ni de profesor
+    (H2), el profesor está disponible (H3) y ningún componente hermano tiene
+    clase ese día (H9). Dos pasadas:
+    
+    1. Bloques en conflicto (H4, H2, H3, H9 mismo día): primero se prueba otra
+       aula compatible en el mismo período; si no alcanza, se reubica el bloque
+       priorizando períodos contiguos a otros bloques del curso.
+    2. Bloques unitarios (H10): se intenta pegar el bloque a otro tramo del
+       mismo curso sin superar MAX_CONSECUTIVE_BLOCKS.
+    
+    Args:
+        individuo: Solución a reparar
         data: Datos del problema
+        estadisticas: Contador acumulado de reparaciones por restricción
+            (opcional); reemplaza el log por reparación
         
     Returns:
-        dict: Individuo reparado
+        dict: Individuo reparado (dict nuevo; solo se copian los cursos modificados)
     """
-    nuevo_individuo = copy.deepcopy(individuo)
-    aulas_disponibles = data['_aulas_list']
+    nuevo_individuo = dict(individuo)
+    propios = set()
+    indice = data['_indice']
+    mapa_cursos = data['_courses_map']
+    periodo_id = indice.periodo_id
+    dia_de_periodo = indice.dia_de_periodo
+    posicion_en_dia = indice.posicion_en_dia
+    periodos_por_dia = indice.periodos_por_dia
+    disponibilidad_prof = indice.disponibilidad_prof
+    conteo = estadisticas if estadisticas is not None else Counter()
+    
+    # Índices de ocupación, actualizados en cada movimiento (el profesor lleva
+    # además una máscara de bits de sus períodos ocupados)
+    ocupacion_aula = Counter()
+    ocupacion_prof = Counter()
+    periodos_prof = defaultdict(int)
+    dias_curso = {}
+    
+    def quitar(codigo_curso: CourseCode, i: int) -> None:
+        periodo, aula, profesor = nuevo_individuo[codigo_curso][i]
+        p = periodo_id[periodo]
+        ocupacion_aula[(aula, p)] -= 1
+        if profesor:
+            ocupacion_prof[(profesor, p)] -= 1
+            if not ocupacion_prof[(profesor, p)]:
+                periodos_prof[profesor] &= ~(1 << p)
+        dias_curso[codigo_curso][dia_de_periodo[p]] -= 1
+    
+    def poner(codigo_curso: CourseCode, i: int, p: int, aula: AulaID, profesor: str) -> None:
+        ocupacion_aula[(aula, p)] += 1
+        if profesor:
+            ocupacion_prof[(profesor, p)] += 1
+            periodos_prof[profesor] |= 1 << p
+        dias_curso[codigo_curso][dia_de_periodo[p]] += 1
+        slot = (indice.periodos[p], aula, profesor)
+        if nuevo_individuo[codigo_curso][i] != slot:
+            gen_propio(nuevo_individuo, propios, codigo_curso)[i] = slot
     
-    # Reparar conflictos de aula (H4) - más crítico
-    conflictos_aula = defaultdict(lambda: defaultdict(list))
     for codigo_curso, asignaciones in nuevo_individuo.items():
-        for indice, (periodo, aula, profesor) in enumerate(asignaciones):
-            conflictos_aula[aula][periodo].append((codigo_curso, indice))
+        dias_curso[codigo_curso] = Counter()
+        for i, (periodo, aula, profesor) in enumerate(asignaciones):
+            poner(codigo_curso, i, periodo_id[periodo], aula, profesor)
+    
+    todos_los_periodos = (1 << len(indice.periodos)) - 1
+    periodos_de_dia = [sum(1 << p for p in periodos_dia) for periodos_dia in periodos_por_dia]
+    
+    def problema(codigo_curso: CourseCode, p: int, aula: AulaID, profesor: str) -> str:
+        """Restricción que viola un bloque (ya quitado de la ocupación) en p, o ''."""
+        if ocupacion_aula[(aula, p)]:
+            return 'H4_conflicto_aula'
+        if profesor:
+            if ocupacion_prof[(profesor, p)]:
+                return 'H2_conflicto_profesor'
+            mascara = disponibilidad_prof.get(profesor)
+            if mascara is not None and not (mascara >> p) & 1:
+                return 'H3_prof_no_disponible'
+        dia = dia_de_periodo[p]
+        for hermano in indice.hermanos.get(codigo_curso, ()):
+            if hermano in dias_curso and dias_curso[hermano][dia]:
+                return 'H9_teoria_lab_mismo_dia'
+        return ''
+    
+    def vecinos(p: int) -> List[int]:
+        """Períodos contiguos a p dentro de su día."""
+        periodos_dia = periodos_por_dia[dia_de_periodo[p]]
+        posicion = posicion_en_dia[p]
+        return [periodos_dia[j] for j in (posicion - 1, posicion + 1) if 0 <= j < len(periodos_dia)]
     
-    # Resolver conflictos reasignando aulas
-    for aula, mapa_periodos in conflictos_aula.items():
-        for periodo, lista_conflictos in mapa_periodos.items():
-            if len(lista_conflictos) <= 1:
+    def largo_tramo(ocupados: Set[int], p: int) -> int:
+        """Largo del tramo consecutivo que formaría p junto a los períodos ocupados."""
+        periodos_dia = periodos_por_dia[dia_de_periodo[p]]
+        posicion = posicion_en_dia[p]
+        largo = 1
+        for paso in (-1, 1):
+            j = posicion + paso
+            while 0 <= j < len(periodos_dia) and periodos_dia[j] in ocupados:
+                largo += 1
+                j += paso
+        return largo
+    
+    def aulas_candidatas(codigo_curso: CourseCode, aula: AulaID) -> List[AulaID]:
+        """La aula actual (si es del tipo requerido) y luego las compatibles."""
+        tipo = mapa_cursos[codigo_curso].get('aula_tipo')
+        compatibles = indice.aulas_por_tipo.get(tipo, ()) if tipo else indice.aulas
+        return ([aula] if aula in compatibles else []) + [a for a in compatibles if a != aula]
+    
+    def reubicar(codigo_curso: CourseCode, i: int, solo_contiguos: bool) -> bool:
+        """
+        Mueve el bloque i (ya quitado) a un slot sin conflictos. Prueba primero
+        los períodos contiguos a otros bloques del curso (sin pasar del máximo de
+        bloques consecutivos) y, si no es solo_contiguos, el resto de períodos
+        desde un punto de partida aleatorio.
+        """
+        asignaciones = nuevo_individuo[codigo_curso]
+        _, aula, profesor = asignaciones[i]
+        # Mismos criterios que problema(), resueltos una vez por bloque como
+        # máscara de períodos admisibles: profesor libre y disponible, y día
+        # sin componentes hermanos. Si no queda ninguno, no hay nada que probar.
+        admisibles = todos_los_periodos
+        if profesor:
+            admisibles &= ~periodos_prof[profesor]
+            mascara = disponibilidad_prof.get(profesor)
+            if mascara is not None:
+                admisibles &= mascara
+        for hermano in indice.hermanos.get(codigo_curso, ()):
+            for dia, cantidad in dias_curso.get(hermano, {}).items():
+                if cantidad:
+                    admisibles &= ~periodos_de_dia[dia]
+        if not admisibles:
+            return False
+        ocupados = {periodo_id[asignaciones[j][0]] for j in range(len(asignaciones)) if j != i}
+        contiguos = []
+        for q in ocupados:
+            for v in vecinos(q):
+                if ((admisibles >> v) & 1 and v not in ocupados and v not in contiguos
+                        and largo_tramo(ocupados, v) <= MAX_CONSECUTIVE_BLOCKS):
+                    contiguos.append(v)
+        candidatos = contiguos
+        if not solo_contiguos:
+            total = len(indice.periodos)
+            inicio = random.randrange(total)
+            candidatos = contiguos + [(inicio + k) % total for k in range(total)]
+        aulas = aulas_candidatas(codigo_curso, aula)
+        for p in candidatos:
+            if p in ocupados or not (admisibles >> p) & 1:
+                continue
+            for otra_aula in aulas:
+                if not ocupacion_aula[(otra_aula, p)]:
+                    poner(codigo_curso, i, p, otra_aula, profesor)
+                    return True
+        return False
+    
+    # Pasada 1: bloques con conflictos de aula, profesor, disponibilidad o
+    # teoría/laboratorio el mismo día
+    for codigo_curso in list(nuevo_individuo):
+        for i in range(len(nuevo_individuo[codigo_curso])):
+            periodo, aula, profesor = nuevo_individuo[codigo_curso][i]
+            p = periodo_id[periodo]
+            quitar(codigo_curso, i)
+            violada = problema(codigo_curso, p, aula, profesor)
+            if not violada:
+                poner(codigo_curso, i, p, aula, profesor)
                 continue
             
-            # Encontrar tipo de aula requerido
-            tipo_aula = None
-            for info_aula in aulas_disponibles:
-                if info_aula['id'] == aula:
-                    tipo_aula = info_aula['tipo']
-                    break
-            
-            # Buscar aulas alternativas del mismo tipo
-            aulas_alternativas = [
-                a['id'] for a in aulas_disponibles 
-                if a['tipo'] == tipo_aula and a['id'] != aula
-            ]
+            # Conflicto de aula: primero otra aula compatible en el mismo período
+            if violada == 'H4_conflicto_aula':
+                otra_aula = next((a for a in aulas_candidatas(codigo_curso, aula)
+                                  if not problema(codigo_curso, p, a, profesor)), None)
+                if otra_aula is not None:
+                    poner(codigo_curso, i, p, otra_aula, profesor)
+                    conteo[violada] += 1
+                    continue
             
-            # Reasignar conflictos (mantener el primero, reasignar los demás)
-            for codigo_curso, indice in lista_conflictos[1:]:
-                if aulas_alternativas:
-                    nueva_aula = random.choice(aulas_alternativas)
-                    periodo_orig, aula_orig, prof_orig = nuevo_individuo[codigo_curso][indice]
-                    nuevo_individuo[codigo_curso][indice] = (periodo_orig, nueva_aula, prof_orig)
-                    
-                    print(f"🔧 Reparación: {codigo_curso} reasignado de {aula_orig} a {nueva_aula}", 
-                          file=sys.stderr)
+            if reubicar(codigo_curso, i, solo_contiguos=False):
+                conteo[violada] += 1
+            else:
+                poner(codigo_curso, i, p, aula, profesor)
+                conteo['sin_resolver'] += 1
+    
+    # Pasada 2: bloques unitarios (H10), pegarlos a otro tramo del mismo curso
+    for codigo_curso in list(nuevo_individuo):
+        asignaciones = nuevo_individuo[codigo_curso]
+        if len(asignaciones) < 2:
+            continue
+        for i in range(len(asignaciones)):
+            periodo, aula, profesor = nuevo_individuo[codigo_curso][i]
+            p = periodo_id[periodo]
+            ocupados = {periodo_id[s[0]] for s in nuevo_individuo[codigo_curso]}
+            if any(v in ocupados for v in vecinos(p)):
+                continue
+            quitar(codigo_curso, i)
+            if reubicar(codigo_curso, i, solo_contiguos=True):
+                conteo['H10_bloque_unitario'] += 1
+            else:
+                poner(codigo_curso, i, p, aula, profesor)
     
     return nuevo_individuo
 
+# ============================================================================
+# MOVIMIENTOS ESTRUCTURADOS
+# ============================================================================
+
+INTENTOS_MOVIMIENTO = 8   # Destinos que prueba cada movimiento antes de rendirse
+MAX_CADENA_KEMPE = 12     # Bloques máximos de una cadena de Kempe
+
+class OcupacionHorario:
+    """
+    Ocupación de un individuo por período (profesores, aulas y bloques), para
+    que los movimientos estructurados descarten destinos infactibles antes de
+    aplicarlos. Se arma una vez por mutación y se actualiza con cada cambio.
+    """
+
+    def __init__(self, individuo: Dict[str, List[Tuple[Period, AulaID, str]]], data: Dict[str, Any]):
+        self.individuo = individuo
+        self.indice = data['_indice']
+        self.mapa_cursos = data['_courses_map']
+        self.profesores = defaultdict(int)  # (profesor, período) -> bloques
+        self.aulas = defaultdict(int)       # (aula, período) -> bloques
+        self.bloques = defaultdict(dict)    # período -> {(curso, i): None}, en orden de inserción
+        for codigo, asignaciones in individuo.items():
+            for i, slot in enumerate(asignaciones):
+                self._contar(codigo, i, slot, 1)
+
+    def _contar(self, codigo: CourseCode, i: int, slot: Tuple[Period, AulaID, str], signo: int) -> None:
+        periodo, aula, profesor = slot
+        p = self.indice.periodo_id[periodo]
+        if profesor:
+            self.profesores[(profesor, p)] += signo
+        self.aulas[(aula, p)] += signo
+        if signo > 0:
+            self.bloques[p][(codigo, i)] = None
+        else:
+            self.bloques[p].pop((codigo, i), None)
+
+    def aplicar(self, propios: Set[CourseCode], cambios: List[Tuple[CourseCode, int, Tuple]]) -> None:
+        """Aplica los cambios (curso, i, slot nuevo), copiando cada curso al escribirlo."""
+        for codigo, i, _ in cambios:
+            self._contar(codigo, i, self.individuo[codigo][i], -1)
+        for codigo, i, slot in cambios:
+            gen_propio(self.individuo, propios, codigo)[i] = slot
+            self._contar(codigo, i, slot, 1)
+
+    def _violaciones(self, slots: List[Tuple[CourseCode, int, Tuple]]) -> int:
+        """Bloques de `slots` con profesor no disponible (H3), profesor (H2) o aula (H4) repetidos."""
+        disponibilidad = self.indice.disponibilidad_prof
+        total = 0
+        for _, _, (periodo, aula, profesor) in slots:
+            p = self.indice.periodo_id[periodo]
+            if profesor in disponibilidad and not (disponibilidad[profesor] >> p) & 1:
+                total += 1
+            if profesor and self.profesores[(profesor, p)] > 1:
+                total += 1
+            if self.aulas[(aula, p)] > 1:
+                total += 1
+        return total
+
+    def admite(self, cambios: List[Tuple[CourseCode, int, Tuple]]) -> bool:
+        """
+        Pre-chequeo barato de un movimiento: los bloques movidos no suman
+        violaciones de H2, H3 ni H4 respecto de donde estaban. En un horario
+        factible equivale a exigir que el destino esté libre.
+        """
+        anteriores = [(codigo, i, self.individuo[codigo][i]) for codigo, i, _ in cambios]
+        antes = self._violaciones(anteriores)
+        for codigo, i, slot in anteriores:
+            self._contar(codigo, i, slot, -1)
+        for codigo, i, slot in cambios:
+            self._contar(codigo, i, slot, 1)
+        despues = self._violaciones(cambios)
+        for codigo, i, slot in cambios:
+            self._contar(codigo, i, slot, -1)
+        for codigo, i, slot in anteriores:
+            self._contar(codigo, i, slot, 1)
+        return despues <= antes
+
+def movimiento_intercambio(ocupacion: OcupacionHorario, propios: Set[CourseCode],
+                           codigo: CourseCode, i: int) -> bool:
+    """
+    Intercambia el período del bloque con el de un bloque de otro curso; cada
+    uno conserva su aula y su profesor.
+    
+    Returns:
+        bool: True si encontró un intercambio que pasa el pre-chequeo y lo aplicó
+    """
+    individuo = ocupacion.individuo
+    periodos = ocupacion.indice.periodos
+    periodo, aula, profesor = individuo[codigo][i]
+    for _ in range(INTENTOS_MOVIMIENTO):
+        q = random.randrange(len(periodos))
+        candidatos = [b for b in ocupacion.bloques[q] if b[0] != codigo]
+        if periodos[q] == periodo or not candidatos:
+            continue
+        otro, j = random.choice(candidatos)
+        periodo2, aula2, profesor2 = individuo[otro][j]
+        cambios = [(codigo, i, (periodo2, aula, profesor)), (otro, j, (periodo, aula2, profesor2))]
+        if ocupacion.admite(cambios):
+            ocupacion.aplicar(propios, cambios)
+            return True
+    return False
+
+def cadena_kempe(ocupacion: OcupacionHorario, codigo: CourseCode, i: int, q: int) -> Dict[Tuple[CourseCode, int], int]:
+    """
+    Cadena de Kempe del bloque entre su período p y el período q en el grafo
+    de conflictos (bloques con el mismo profesor o la misma aula): todo bloque
+    del período destino que choca con uno de la cadena pasa al período opuesto.
+    
+    Returns:
+        Dict: bloque -> período destino, o None si la cadena supera MAX_CADENA_KEMPE
+    """
+    individuo = ocupacion.individuo
+    p = ocupacion.indice.periodo_id[individuo[codigo][i][0]]
+    cadena = {(codigo, i): q}
+    pendientes = [(codigo, i)]
+    while pendientes:
+        bloque = pendientes.pop()
+        destino = cadena[bloque]
+        _, aula, profesor = individuo[bloque[0]][bloque[1]]
+        for otro in ocupacion.bloques[destino]:
+            if otro in cadena:
+                continue
+            _, aula2, profesor2 = individuo[otro[0]][otro[1]]
+            if aula2 == aula or (profesor and profesor2 == profesor):
+                cadena[otro] = p if destino == q else q
+                pendientes.append(otro)
+        if len(cadena) > MAX_CADENA_KEMPE:
+            return None
+    return cadena
+
+def movimiento_kempe(ocupacion: OcupacionHorario, propios: Set[CourseCode],
+                     codigo: CourseCode, i: int) -> bool:
+    """
+    Mueve el bloque a otro período intercambiando su cadena de Kempe: los
+    conflictos de profesor y aula entre ambos períodos no aumentan.
+    
+    Returns:
+        bool: True si encontró una cadena que pasa el pre-chequeo y la aplicó
+    """
+    individuo = ocupacion.individuo
+    indice = ocupacion.indice
+    p = indice.periodo_id[individuo[codigo][i][0]]
+    for _ in range(INTENTOS_MOVIMIENTO):
+        q = random.randrange(len(indice.periodos))
+        cadena = cadena_kempe(ocupacion, codigo, i, q) if q != p else None
+        if not cadena:
+            continue
+        cambios = []
+        for (otro, j), destino in cadena.items():
+            _, aula, profesor = individuo[otro][j]
+            cambios.append((otro, j, (indice.periodos[destino], aula, profesor)))
+        if ocupacion.admite(cambios):
+            ocupacion.aplicar(propios, cambios)
+            return True
+    return False
+
+def movimiento_tramo(ocupacion: OcupacionHorario, propios: Set[CourseCode],
+                     codigo: CourseCode, i: int) -> bool:
+    """
+    Mueve como unidad el tramo de bloques consecutivos (el bloque H10) que
+    contiene al bloque a otra posición de otro día, conservando aulas y
+    profesores. El día destino no debe tener otros bloques del curso ni de sus
+    componentes hermanos (H9), para no partir ni fusionar tramos.
+    
+    Returns:
+        bool: True si encontró un destino que pasa el pre-chequeo y lo aplicó
+    """
+    individuo = ocupacion.individuo
+    indice = ocupacion.indice
+    asignaciones = individuo[codigo]
+    codificados = [indice.periodo_id[slot[0]] for slot in asignaciones]
+    dia = indice.dia_de_periodo[codificados[i]]
+    del_dia = sorted((indice.posicion_en_dia[p], k) for k, p in enumerate(codificados)
+                     if indice.dia_de_periodo[p] == dia)
+    tramo = []
+    for posicion, k in del_dia:
+        if tramo and posicion != indice.posicion_en_dia[codificados[tramo[-1]]] + 1:
+            if i in tramo:
+                break
+            tramo = []
+        tramo.append(k)
+    ocupados = {indice.dia_de_periodo[p] for k, p in enumerate(codificados) if k not in tramo}
+    for hermano in indice.hermanos.get(codigo, ()):
+        ocupados.update(indice.dia_de_periodo[indice.periodo_id[slot[0]]] for slot in individuo.get(hermano, ()))
+    for _ in range(INTENTOS_MOVIMIENTO):
+        nuevo_dia = random.randrange(len(indice.dias))
+        periodos_dia = indice.periodos_por_dia[nuevo_dia]
+        if nuevo_dia == dia or nuevo_dia in ocupados or len(periodos_dia) < len(tramo):
+            continue
+        inicio = random.randrange(len(periodos_dia) - len(tramo) + 1)
+        cambios = []
+        for k, p in zip(tramo, periodos_dia[inicio:inicio + len(tramo)]):
+            _, aula, profesor = asignaciones[k]
+            cambios.append((codigo, k, (indice.periodos[p], aula, profesor)))
+        if ocupacion.admite(cambios):
+            ocupacion.aplicar(propios, cambios)
+            return True
+    return False
+
+MOVIMIENTOS_ESTRUCTURADOS = (movimiento_intercambio, movimiento_kempe, movimiento_tramo)
+
 # ============================================================================
 # OPERADORES GENÉTICOS
 # ============================================================================
 
 def seleccion_torneo(poblacion: List[Dict], fitness_values: List[float], 
-                    k: int = TOURNAMENT_K) -> Dict:
+                    k: int = None) -> int:
     """
     Selección por torneo para elegir un padre.
     
     Args:
         poblacion: Lista de individuos
-        fitness_values: Lista de valores de fitness (menor es mejor)
-        k: Tamaño del torneo
+        fitness_values: Lista de valores de fitness (menor es mejor) o FitnessPorEtapas
+        k: Tamaño del torneo (None = TOURNAMENT_K, leído al llamar para que
+            --tournament y los parámetros de islas/trabajadores tengan efecto)
         
     Returns:
-        dict: Individuo seleccionado
+        int: Índice del individuo seleccionado (no se copia; los operadores
+        nunca modifican a sus padres)
     """
-    participante_actual = random.randrange(len(poblacion))
-    mejor_participante = participante_actual
-    mejor_fitness = fitness_values[participante_actual]
+    k = k or TOURNAMENT_K
+    mejor_participante = random.randrange(len(poblacion))
     
     # Realizar torneo con k-1 participantes adicionales
     for _ in range(k - 1):
         nuevo_participante = random.randrange(len(poblacion))
-        if fitness_values[nuevo_participante] < mejor_fitness:
+        if es_mejor(fitness_values, nuevo_participante, mejor_participante):
             mejor_participante = nuevo_participante
-            mejor_fitness = fitness_values[nuevo_participante]
     
-    return copy.deepcopy(poblacion[mejor_participante])
+    return mejor_participante
 
 def cruce_uniforme(padre1: Dict, padre2: Dict, data: Dict[str, Any]) -> Tuple[Dict, Dict]:
     """
@@ -926,38 +2472,46 @@ def cruce_uniforme(padre1: Dict, padre2: Dict, data: Dict[str, Any]) -> Tuple[Di
         data: Datos del problema
         
     Returns:
-        Tuple[Dict, Dict]: Dos individuos hijos
+        Tuple[Dict, Dict]: Dos individuos hijos (comparten las listas de cursos
+        con los padres hasta que otro operador las modifique)
     """
     hijo1, hijo2 = {}, {}
     
     # Para cada curso, elegir aleatoriamente de qué padre heredar
     for codigo_curso in data['_courses_map'].keys():
         if random.random() < 0.5:
-            hijo1[codigo_curso] = copy.deepcopy(padre1[codigo_curso])
-            hijo2[codigo_curso] = copy.deepcopy(padre2[codigo_curso])
+            hijo1[codigo_curso] = padre1[codigo_curso]
+            hijo2[codigo_curso] = padre2[codigo_curso]
         else:
-            hijo1[codigo_curso] = copy.deepcopy(padre2[codigo_curso])
-            hijo2[codigo_curso] = copy.deepcopy(padre1[codigo_curso])
+            hijo1[codigo_curso] = padre2[codigo_curso]
+            hijo2[codigo_curso] = padre1[codigo_curso]
     
     return hijo1, hijo2
 
 def mutacion_adaptativa(individuo: Dict, data: Dict[str, Any], 
-                       prob_mutacion: float = MUTATION_PROB) -> Dict:
+                       prob_mutacion: float = MUTATION_PROB, prob_movimientos: float = None) -> Dict:
     """
     Operador de mutación que puede cambiar período, aula, o profesor.
     Respeta las restricciones de tipo de aula y disponibilidad de profesores.
+    Con prob_movimientos, esa fracción de las mutaciones usa en cambio uno de
+    los MOVIMIENTOS_ESTRUCTURADOS (si ninguno pasa su pre-chequeo, el curso
+    queda como estaba).
     
     Args:
         individuo: Individuo a mutar
         data: Datos del problema
         prob_mutacion: Probabilidad de mutación por curso
+        prob_movimientos: Fracción de movimientos estructurados (None = PROB_MOVIMIENTOS)
         
     Returns:
-        dict: Individuo mutado
+        dict: Individuo mutado (dict nuevo; solo se copian los cursos mutados)
     """
-    nuevo_individuo = copy.deepcopy(individuo)
-    periodos_disponibles = data['periodos']
-    aulas_disponibles = data['_aulas_list']
+    nuevo_individuo = dict(individuo)
+    propios = set()
+    indice = data['_indice']
+    periodos_disponibles = indice.periodos
+    prob_movimientos = PROB_MOVIMIENTOS if prob_movimientos is None else prob_movimientos
+    ocupacion = None  # OcupacionHorario, se arma con el primer movimiento estructurado
     
     for codigo_curso in nuevo_individuo.keys():
         if random.random() < prob_mutacion:
@@ -967,135 +2521,1433 @@ def mutacion_adaptativa(individuo: Dict, data: Dict[str, Any],
             
             # Seleccionar asignación aleatoria para mutar
             indice_mutacion = random.randrange(len(asignaciones))
+            if prob_movimientos and random.random() < prob_movimientos:
+                if ocupacion is None:
+                    ocupacion = OcupacionHorario(nuevo_individuo, data)
+                random.choice(MOVIMIENTOS_ESTRUCTURADOS)(ocupacion, propios, codigo_curso, indice_mutacion)
+                continue
             tipo_mutacion = random.choice([1, 2, 3])  # 1: Período, 2: Aula, 3: Profesor
             
             periodo_actual, aula_actual, profesor_actual = asignaciones[indice_mutacion]
             info_curso = data['_courses_map'][codigo_curso]
+            nuevo_slot = None
 
             if tipo_mutacion == 1:  # Cambiar período
                 nuevo_periodo = random.choice(periodos_disponibles)
-                nuevo_individuo[codigo_curso][indice_mutacion] = (nuevo_periodo, aula_actual, profesor_actual)
+                nuevo_slot = (nuevo_periodo, aula_actual, profesor_actual)
             
             elif tipo_mutacion == 2:  # Cambiar aula
                 tipo_aula_requerido = info_curso.get('aula_tipo', 'T')
-                aulas_compatibles = [
-                    a['id'] for a in aulas_disponibles 
-                    if a['tipo'] == tipo_aula_requerido
-                ]
+                aulas_compatibles = indice.aulas_por_tipo.get(tipo_aula_requerido, ())
                 
                 if aulas_compatibles:
                     nueva_aula = random.choice(aulas_compatibles)
-                    nuevo_individuo[codigo_curso][indice_mutacion] = (periodo_actual, nueva_aula, profesor_actual)
+                    nuevo_slot = (periodo_actual, nueva_aula, profesor_actual)
             
             elif tipo_mutacion == 3:  # Cambiar profesor
                 profesores_disponibles = info_curso.get('profesores', [])
                 if profesores_disponibles:
                     nuevo_profesor = random.choice(profesores_disponibles)
-                    nuevo_individuo[codigo_curso][indice_mutacion] = (periodo_actual, aula_actual, nuevo_profesor)
+                    nuevo_slot = (periodo_actual, aula_actual, nuevo_profesor)
+            
+            if nuevo_slot is not None:
+                if ocupacion is not None:  # mantener la ocupación al día para los próximos movimientos
+                    ocupacion.aplicar(propios, [(codigo_curso, indice_mutacion, nuevo_slot)])
+                else:
+                    gen_propio(nuevo_individuo, propios, codigo_curso)[indice_mutacion] = nuevo_slot
     
     return nuevo_individuo
 
+def mutar_y_reparar(hijo: Dict, data: Dict[str, Any], semilla: int,
+                    prob_mutacion: float = None) -> Tuple[Dict, Counter]:
+    """
+    Aplica mutación y reparación a un hijo con una secuencia aleatoria propia.
+    
+    Se usa con OPERADORES_EN_PARALELO: el proceso principal sortea una semilla por
+    hijo y la variación da el mismo resultado en cualquier proceso. El estado del
+    generador global se restaura al terminar.
+    
+    Args:
+        hijo: Individuo recién cruzado
+        data: Datos del problema
+        semilla: Semilla de la variación de este hijo
+        prob_mutacion: Probabilidad de mutación por curso (None = MUTATION_PROB)
+        
+    Returns:
+        Tuple[Dict, Counter]: (hijo mutado y reparado, reparaciones por restricción)
+    """
+    estado = random.getstate()
+    random.seed(semilla)
+    try:
+        reparaciones = Counter()
+        hijo = mutacion_adaptativa(hijo, data, MUTATION_PROB if prob_mutacion is None else prob_mutacion)
+        hijo = reparar_individuo(hijo, data, reparaciones)
+    finally:
+        random.setstate(estado)
+    return hijo, reparaciones
+
+def variar_hijos(pendientes: List[Tuple[Dict, int]], data: Dict[str, Any],
+                 reparaciones: Counter, pool: ProcessPoolExecutor = None) -> List[Dict]:
+    """
+    Muta y repara una tanda de hijos (hijo, semilla), en el pool si existe.
+    
+    Args:
+        pendientes: Hijos con la semilla de su variación
+        data: Datos del problema
+        reparaciones: Contador donde se acumulan las reparaciones
+        pool: Pool de procesos (opcional)
+        
+    Returns:
+        List[Dict]: Hijos variados, en el mismo orden
+    """
+    if pool is not None:
+        tareas = [(hijo, semilla, MUTATION_PROB) for hijo, semilla in pendientes]
+        resultados = pool.map(_variar_en_trabajador, tareas,
+                              chunksize=tamaño_lote(len(pendientes), numero_workers()))
+    else:
+        resultados = (mutar_y_reparar(hijo, data, semilla) for hijo, semilla in pendientes)
+    hijos = []
+    for hijo, conteo in resultados:
+        reparaciones.update(conteo)
+        hijos.append(hijo)
+    return hijos
+
+
+# ============================================================================
+# CACHE DE FITNESS
+# ============================================================================
+
+def hash_genoma(individuo: Dict[str, List[Tuple[Period, AulaID, str]]]) -> int:
+    """
+    Calcula un hash del genoma como XOR de un hash por bloque.
+    
+    Al ser un XOR, mover un bloque se actualiza con h ^ hash(viejo) ^ hash(nuevo)
+    sin recorrer el resto del individuo.
+    
+    Args:
+        individuo: Solución a identificar
+        
+    Returns:
+        int: Hash del genoma
+    """
+    h = 0
+    for codigo_curso, asignaciones in individuo.items():
+        for i, slot in enumerate(asignaciones):
+            h ^= hash((codigo_curso, i, slot))
+    return h
+
+class CacheFitness:
+    """
+    Cache LRU acotada de hash_genoma -> fitness.
+    
+    Guarda una copia del genoma para descartar colisiones de hash y lleva
+    contadores de aciertos y fallos.
+    """
+
+    def __init__(self, tamaño_maximo: int = CACHE_SIZE):
+        self.tamaño_maximo = tamaño_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+
+    def obtener(self, individuo: Dict, clave: int):
+        """Retorna el fitness si el genoma está en cache, o None."""
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[0] == individuo:
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+        self.fallos += 1
+        return None
+
+    def guardar(self, individuo: Dict, clave: int, fitness: float) -> None:
+        """Guarda el resultado y descarta las entradas menos usadas si se excede el tamaño."""
+        copia = {codigo: list(asignaciones) for codigo, asignaciones in individuo.items()}
+        self._entradas[clave] = (copia, fitness)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.tamaño_maximo:
+            self._entradas.popitem(last=False)
+
+    def tasa_aciertos(self) -> float:
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+# ============================================================================
+# CRITERIOS DE PARADA
+# ============================================================================
+
+MOTIVOS_PARADA = {
+    'generaciones': 'se completaron todas las generaciones',
+    'presupuesto': 'se agotó el presupuesto de evaluaciones',
+    'tiempo': 'se alcanzó el límite de tiempo',
+    'estancamiento': 'demasiadas generaciones sin mejora',
+    'objetivo': 'se alcanzó el fitness objetivo',
+    'isla_vecina': 'otra isla se detuvo',
+    'cancelado': 'se canceló la corrida',
+}
+
+class Cancelacion:
+    """
+    Pedido de cancelación de la corrida: SIGTERM, SIGINT o la aparición de un
+    archivo (`--cancel-file`). El pedido queda en un multiprocessing.Event, así
+    que también lo ven los procesos de las islas. CriterioParada lo revisa en
+    los mismos puntos que los demás criterios, de modo que la corrida termina
+    con el mejor individuo encontrado y una salida JSON válida.
+    """
+
+    def __init__(self, archivo: str = None):
+        self.evento = multiprocessing.Event()
+        self.archivo = archivo
+
+    def instalar(self) -> None:
+        """Atiende SIGTERM y SIGINT en este proceso."""
+        for señal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(señal, self._manejar)
+
+    def _manejar(self, numero: int, frame) -> None:
+        if self.evento.is_set():
+            # Segunda señal: terminar sin esperar al siguiente punto seguro
+            signal.signal(numero, signal.SIG_DFL)
+            os.kill(os.getpid(), numero)
+            return
+        self.evento.set()
+        print(f"🛑 Señal {signal.Signals(numero).name}: se detiene en el próximo punto seguro "
+              f"(otra señal termina de inmediato)", file=sys.stderr)
+
+    def solicitada(self) -> bool:
+        if self.evento.is_set():
+            return True
+        if self.archivo is not None and os.path.exists(self.archivo):
+            print(f"🛑 Apareció {self.archivo}: se cancela la corrida", file=sys.stderr)
+            self.evento.set()
+            return True
+        return False
+
+def leer_objetivo(texto: str) -> Dict[str, float]:
+    """
+    Interpreta el valor de --target-fitness.
+    
+    Args:
+        texto: 'X' (fitness total <= X) o 'DURO:BLANDO' (costo duro <= DURO y
+            costo blando <= BLANDO; por ejemplo '0:5000')
+        
+    Returns:
+        dict: Cota máxima por clave de diagnóstico ('fitness_total', o
+        'costo_duro' y 'costo_blando')
+    """
+    if ':' in texto:
+        duro, blando = texto.split(':', 1)
+        return {'costo_duro': float(duro), 'costo_blando': float(blando)}
+    return {'fitness_total': float(texto)}
+
+class CriterioParada:
+    """
+    Decide cuándo cortar una corrida antes de agotar generaciones o presupuesto:
+    límite de tiempo de reloj, generaciones sin mejora, fitness objetivo y
+    cancelación (CANCELACION).
+    
+    Los modos de estado estacionario cuentan generaciones equivalentes
+    (evaluaciones / POP_SIZE). El primer criterio que se cumple queda en
+    `motivo` (una clave de MOTIVOS_PARADA).
+    """
+
+    def __init__(self, limite_tiempo: float = None, gens_estancamiento: int = None,
+                 objetivo: Dict[str, float] = None):
+        self.inicio = time.perf_counter()
+        self.limite_tiempo = limite_tiempo
+        self.gens_estancamiento = gens_estancamiento
+        self.objetivo = objetivo
+        self.mejor_fitness = float('inf')
+        self.ultima_mejora = 0
+        self.motivo = None
+        self.segundos_factible = None  # Segundos hasta el primer mejor con costo duro 0
+
+    def transcurrido(self) -> float:
+        return time.perf_counter() - self.inicio
+
+    def detener(self, motivo: str) -> None:
+        """Fuerza la parada (por ejemplo, cuando se detiene una isla vecina)."""
+        self.motivo = self.motivo or motivo
+
+    def revisar(self, generacion: float, mejor_fitness: float,
+                diagnosticos_mejor: Callable[[], Dict]) -> bool:
+        """
+        Registra el estado al terminar una generación y dice si hay que parar.
+        
+        Args:
+            generacion: Generaciones (o equivalentes) completadas
+            mejor_fitness: Mejor fitness conocido
+            diagnosticos_mejor: Retorna los diagnósticos del mejor individuo; solo
+                se llama cuando el mejor cambia, mientras no haya uno factible, o si
+                el objetivo separa costo duro y blando y el fitness total ya no lo
+                descarta
+            
+        Returns:
+            bool: True si se cumplió algún criterio
+        """
+        if mejor_fitness < self.mejor_fitness:
+            self.mejor_fitness = mejor_fitness
+            self.ultima_mejora = generacion
+            if self.segundos_factible is None and diagnosticos_mejor()['costo_duro'] == 0:
+                self.segundos_factible = round(self.transcurrido(), 3)
+            if self.objetivo is not None and self.alcanza_objetivo(mejor_fitness, diagnosticos_mejor):
+                self.detener('objetivo')
+        if self.gens_estancamiento is not None and generacion - self.ultima_mejora >= self.gens_estancamiento:
+            self.detener('estancamiento')
+        if self.limite_tiempo is not None and self.transcurrido() >= self.limite_tiempo:
+            self.detener('tiempo')
+        if CANCELACION is not None and CANCELACION.solicitada():
+            self.detener('cancelado')
+        return self.motivo is not None
+
+    def alcanza_objetivo(self, fitness: float, diagnosticos_mejor: Callable[[], Dict]) -> bool:
+        # fitness_total = costo_duro + costo_blando: si supera la suma de las cotas
+        # no hace falta la evaluación con diagnósticos
+        if fitness > sum(self.objetivo.values()):
+            return False
+        if 'fitness_total' in self.objetivo:
+            return True
+        diagnosticos = diagnosticos_mejor()
+        return all(diagnosticos[clave] <= cota for clave, cota in self.objetivo.items())
+
+    def finalizar(self, diagnosticos: Dict, por_defecto: str, **progreso) -> None:
+        """
+        Anota en los diagnósticos el motivo de parada ('motivo_parada'), el
+        progreso alcanzado, los segundos transcurridos y los segundos hasta la
+        primera solución factible ('segundos_a_factible', None si no la hubo), y
+        lo imprime.
+        
+        Args:
+            diagnosticos: Diagnósticos finales del mejor individuo
+            por_defecto: Motivo si no se cumplió ningún criterio
+            progreso: Contadores de la corrida (generaciones o evaluaciones)
+        """
+        self.detener(por_defecto)
+        diagnosticos['motivo_parada'] = self.motivo
+        diagnosticos.update(progreso)
+        diagnosticos['segundos'] = round(self.transcurrido(), 3)
+        diagnosticos['segundos_a_factible'] = self.segundos_factible
+        detalle = ', '.join(f"{valor} {nombre}" for nombre, valor in progreso.items())
+        print(f"⏹️ Parada: {MOTIVOS_PARADA[self.motivo]} ({detalle}, "
+              f"{diagnosticos['segundos']:.1f}s)", file=sys.stderr)
+
+def crear_criterio_parada() -> CriterioParada:
+    """CriterioParada con los parámetros globales (--time-limit, --stall-gens, --target-fitness)."""
+    return CriterioParada(LIMITE_TIEMPO, GENS_ESTANCAMIENTO, OBJETIVO_FITNESS)
+
+# ============================================================================
+# PROGRESO EN NDJSON
+# ============================================================================
+
+class ProgresoNDJSON:
+    """
+    Flujo de eventos de progreso legible por máquina: un objeto JSON por línea
+    en un descriptor aparte (`--progress-fd`), sin tocar stdout (JSON final) ni
+    los mensajes de stderr.
+    
+    Eventos (todos con 'event' y 'elapsed' en segundos):
+    - start: parámetros de la corrida
+    - progress: generation, evaluations, best_fitness, hard_cost, soft_cost,
+      average, evals_per_second; como mucho uno cada `intervalo` segundos
+    - best: horario del mejor individuo ('schedule', mismo formato que la salida
+      final) junto a un progress, solo si el mejor mejoró desde el último enviado
+    - done: motivo de parada y costos del resultado final
+    
+    Entre eventos, cada llamada a generacion() cuesta una lectura del reloj; el
+    desglose duro/blando y el horario se calculan solo cuando se emiten.
+    """
+
+    def __init__(self, salida, intervalo: float = 1.0):
+        self.salida = salida
+        self.intervalo = intervalo
+        self.inicio = time.perf_counter()
+        self.ultimo = None                # (instante, evaluaciones) del último progress
+        self.desglose = (None, 0, 0)      # (fitness, costo_duro, costo_blando) del mejor
+        self.fitness_enviado = float('inf')
+
+    @classmethod
+    def abrir(cls, fd: int, intervalo: float) -> 'ProgresoNDJSON':
+        return cls(os.fdopen(fd, 'w', encoding='utf-8', buffering=1, closefd=False), intervalo)
+
+    def emitir(self, evento: str, **campos) -> None:
+        if self.salida is None:
+            return
+        linea = {'event': evento, 'elapsed': round(time.perf_counter() - self.inicio, 3), **campos}
+        try:
+            self.salida.write(json.dumps(linea, ensure_ascii=False) + '\n')
+        except OSError as e:
+            # El lector se fue: la corrida sigue, sin eventos
+            print(f"⚠️ Progreso NDJSON desactivado: {e}", file=sys.stderr)
+            self.salida = None
+
+    def generacion(self, generacion: float, evaluaciones: int, mejor_fitness: float,
+                   promedio: Callable[[], float], mejor: Callable[[], Dict],
+                   data: Dict[str, Any]) -> None:
+        """
+        Reporta el estado al terminar una generación (o un par de hijos en estado
+        estacionario) si ya pasó el intervalo.
+        
+        Args:
+            generacion: Generaciones (o equivalentes) completadas
+            evaluaciones: Individuos evaluados desde el inicio, incluida la población inicial
+            mejor_fitness: Mejor fitness conocido
+            promedio: Retorna el fitness promedio de la población
+            mejor: Retorna el mejor individuo (dict o Genoma)
+            data: Datos del problema
+        """
+        ahora = time.perf_counter()
+        if self.salida is None or (self.ultimo is not None and ahora - self.ultimo[0] < self.intervalo):
+            return
+        instante, previas = self.ultimo or (self.inicio, 0)
+        self.ultimo = (ahora, evaluaciones)
+        if self.desglose[0] != mejor_fitness:
+            _, diagnosticos = evaluar_solucion(como_horario(mejor(), data), data)
+            self.desglose = (mejor_fitness, diagnosticos['costo_duro'], diagnosticos['costo_blando'])
+        _, costo_duro, costo_blando = self.desglose
+        self.emitir('progress', generation=round(generacion, 2), evaluations=evaluaciones,
+                    best_fitness=mejor_fitness, hard_cost=costo_duro, soft_cost=costo_blando,
+                    average=round(promedio(), 2),
+                    evals_per_second=round((evaluaciones - previas) / max(ahora - instante, 1e-9), 1))
+        if mejor_fitness < self.fitness_enviado:
+            self.fitness_enviado = mejor_fitness
+            self.emitir('best', generation=round(generacion, 2), fitness=mejor_fitness,
+                        hard_cost=costo_duro, soft_cost=costo_blando,
+                        schedule=convertir_solucion_a_json(mejor(), data)['schedule'])
 
 # ============================================================================
 # ALGORITMO GENÉTICO PRINCIPAL
 # ============================================================================
 
-def ejecutar_algoritmo_genetico(data: Dict[str, Any]) -> Tuple[Dict, Dict]:
+class FitnessPorEtapas:
+    """
+    Fitness de una población evaluada con evaluar_por_etapas.
+    
+    Guarda cotas (inferior, superior) por individuo y solo completa la evaluación
+    de un individuo cuando una comparación no se puede decidir con sus cotas, de
+    modo que torneo y elitismo eligen lo mismo que con la evaluación completa.
+    """
+
+    def __init__(self, poblacion: List[Dict], data: Dict[str, Any], inferior: List[float],
+                 superior: List[float], cache: CacheFitness = None, claves: List[int] = None):
+        self.poblacion = poblacion
+        self.data = data
+        self.inferior = inferior
+        self.superior = superior
+        self.cache = cache
+        self.claves = claves
+
+    def exacto(self, i: int) -> float:
+        """Fitness exacto del individuo i (lo completa si solo tenía cotas)."""
+        if self.inferior[i] != self.superior[i]:
+            global EVALUACIONES
+            EVALUACIONES += 1
+            fitness = evaluar_fitness(self.poblacion[i], self.data)
+            self.inferior[i] = self.superior[i] = fitness
+            if self.cache is not None:
+                self.cache.guardar(self.poblacion[i], self.claves[i], fitness)
+        return self.inferior[i]
+
+    def fijar(self, i: int, fitness: float) -> None:
+        """Registra el fitness exacto del individuo i (reemplazado en la población)."""
+        self.inferior[i] = self.superior[i] = fitness
+
+    def mejor(self, j: int, i: int) -> bool:
+        """True si fitness[j] < fitness[i]."""
+        if self.superior[j] < self.inferior[i]:
+            return True
+        if self.inferior[j] >= self.superior[i]:
+            return False
+        return self.exacto(j) < self.exacto(i)
+
+    def __getitem__(self, i: int) -> float:
+        return self.exacto(i)
+
+    def __len__(self) -> int:
+        return len(self.poblacion)
+
+    def __iter__(self):
+        return (self.exacto(i) for i in range(len(self.poblacion)))
+
+def es_mejor(fitness_values, j: int, i: int) -> bool:
+    """Compara fitness_values[j] < fitness_values[i], resolviendo cotas solo si hace falta."""
+    if isinstance(fitness_values, FitnessPorEtapas):
+        return fitness_values.mejor(j, i)
+    return fitness_values[j] < fitness_values[i]
+
+def evaluar_poblacion(poblacion: List[Dict], data: Dict[str, Any],
+                      cache: CacheFitness = None, cota: float = None,
+                      pool: ProcessPoolExecutor = None):
+    """
+    Evalúa todos los individuos por el camino rápido (solo fitness), consultando
+    primero la cache de fitness si existe. Los diagnósticos se calculan aparte,
+    solo para nuevos mejores y para el resultado final.
+    
+    Args:
+        poblacion: Lista de individuos
+        data: Datos del problema
+        cache: Cache de fitness (opcional)
+        cota: Si se indica, evalúa por etapas con esa cota (ver evaluar_por_etapas)
+        pool: Pool de procesos para los fallos de cache (opcional)
+        
+    Returns:
+        List[float] o FitnessPorEtapas: fitness de cada individuo
+    """
+    global EVALUACIONES
+    if pool is not None:
+        return evaluar_poblacion_paralela(poblacion, data, cache, cota, pool)
+    
+    if cota is not None:
+        claves = [hash_genoma(individuo) for individuo in poblacion] if cache is not None else None
+        inferior, superior = [], []
+        for i, individuo in enumerate(poblacion):
+            fitness = cache.obtener(individuo, claves[i]) if cache is not None else None
+            if fitness is not None:
+                cotas = (fitness, fitness)
+            else:
+                EVALUACIONES += 1
+                cotas = evaluar_por_etapas(individuo, data, cota)
+                if cache is not None and cotas[0] == cotas[1]:
+                    cache.guardar(individuo, claves[i], cotas[0])
+            inferior.append(cotas[0])
+            superior.append(cotas[1])
+        return FitnessPorEtapas(poblacion, data, inferior, superior, cache, claves)
+
+    fitness_values = []
+    for individuo in poblacion:
+        fitness = None
+        if cache is not None:
+            clave = hash_genoma(individuo)
+            fitness = cache.obtener(individuo, clave)
+        if fitness is None:
+            EVALUACIONES += 1
+            fitness = evaluar_fitness(individuo, data)
+            if cache is not None:
+                cache.guardar(individuo, clave, fitness)
+        fitness_values.append(fitness)
+    return fitness_values
+
+def evaluar_poblacion_paralela(poblacion: List[Dict], data: Dict[str, Any], cache: CacheFitness,
+                               cota: float, pool: ProcessPoolExecutor):
+    """
+    Variante de evaluar_poblacion que reparte los fallos de cache en el pool.
+    
+    La evaluación es una función pura del individuo, así que los valores (y por
+    lo tanto la evolución) son idénticos a los de la evaluación serial. Los
+    genomas repetidos dentro de la población se evalúan una sola vez.
+    
+    Args:
+        poblacion: Lista de individuos
+        data: Datos del problema
+        cache: Cache de fitness (opcional)
+        cota: Cota de la evaluación por etapas (None = evaluación completa)
+        pool: Pool de procesos creado con crear_pool()
+        
+    Returns:
+        List[float] o FitnessPorEtapas: fitness de cada individuo
+    """
+    claves = [hash_genoma(individuo) for individuo in poblacion] if cache is not None else None
+    cotas = [None] * len(poblacion)
+    grupos = {}  # genoma pendiente -> índices que lo comparten
+    for i, individuo in enumerate(poblacion):
+        clave = ('i', i)  # sin cache (o colisión de hash): grupo propio
+        if cache is not None:
+            fitness = cache.obtener(individuo, claves[i])
+            if fitness is not None:
+                cotas[i] = (fitness, fitness)
+                continue
+            grupo = grupos.get(claves[i])
+            if grupo is None:
+                clave = claves[i]
+            elif poblacion[grupo[0]] == individuo:
+                grupo.append(i)
+                continue
+        grupos[clave] = [i]
+    
+    global EVALUACIONES
+    pendientes = list(grupos.values())
+    tareas = [(poblacion[grupo[0]], cota) for grupo in pendientes]
+    EVALUACIONES += len(tareas)
+    resultados = pool.map(_evaluar_en_trabajador, tareas,
+                          chunksize=tamaño_lote(len(tareas), numero_workers()))
+    for grupo, resultado in zip(pendientes, resultados):
+        for i in grupo:
+            cotas[i] = resultado
+        if cache is not None and resultado[0] == resultado[1]:
+            cache.guardar(poblacion[grupo[0]], claves[grupo[0]], resultado[0])
+    
+    if cota is None:
+        return [inferior for inferior, _ in cotas]
+    return FitnessPorEtapas(poblacion, data, [c[0] for c in cotas], [c[1] for c in cotas],
+                            cache, claves)
+
+def ejecutar_algoritmo_genetico(data: Dict[str, Any],
+                                migracion: Callable[[int, List[Dict], Any], List[Dict]] = None,
+                                criterio: CriterioParada = None) -> Tuple[Dict, Dict]:
     """
     Ejecuta el algoritmo genético completo para resolver el problema de horarios.
     
     Args:
         data: Datos del problema procesados
+        migracion: Al inicio de cada generación recibe (generación, población,
+            fitness) y retorna los inmigrantes que entran a la nueva población
+            junto al élite (modelo de islas; None = sin migración)
+        criterio: Criterios de parada anticipada (None = los de los parámetros
+            globales); se revisan al terminar cada generación
         
     Returns:
-        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos)
+        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos), con 'motivo_parada'
+        en los diagnósticos
     """
     print("🚀 Iniciando Algoritmo Genético para Programación de Horarios", file=sys.stderr)
     print(f"📊 Parámetros: Pop={POP_SIZE}, Gen={GENERATIONS}, Torneo={TOURNAMENT_K}", file=sys.stderr)
     
+    criterio = criterio or crear_criterio_parada()
+    cache = CacheFitness(CACHE_SIZE) if CACHE_SIZE > 0 else None
+    reparaciones = Counter()  # Reparaciones acumuladas por restricción
+    busqueda = EstadisticasBusquedaLocal()
+    pool = crear_pool(data)   # None = todo en este proceso
+    evaluaciones_previas = EVALUACIONES  # el contador es del proceso (p. ej. varias corridas en tests)
+    
     # Inicializar población usando TSSP
-    poblacion = inicializar_poblacion_tssp(data)
+    poblacion = inicializar_poblacion_tssp(data, pool=pool)
     
     # Evaluar población inicial
-    fitness_values = []
-    diagnosticos_poblacion = []
-    
     print("🔍 Evaluando población inicial...", file=sys.stderr)
-    for individuo in poblacion:
-        fitness, diagnosticos = evaluar_solucion(individuo, data)
-        fitness_values.append(fitness)
-        diagnosticos_poblacion.append(diagnosticos)
+    fitness_values = evaluar_poblacion(poblacion, data, cache, pool=pool)
     
     # Encontrar el mejor individuo inicial
+    # El mejor se guarda como Genoma: la instantánea y las copias del
+    # elitismo son copias de arrays en lugar de deepcopy
+    indice = data['_indice']
     indice_mejor = min(range(len(poblacion)), key=lambda i: fitness_values[i])
-    mejor_individuo = copy.deepcopy(poblacion[indice_mejor])
+    mejor_individuo = Genoma.desde_dict(poblacion[indice_mejor], indice)
     mejor_fitness = fitness_values[indice_mejor]
     
+    _, diagnosticos_mejor = evaluar_solucion(poblacion[indice_mejor], data)
     print(f"✅ Mejor fitness inicial: {mejor_fitness:.2f}", file=sys.stderr)
-    print(f"📈 Desglose inicial: Duro={diagnosticos_poblacion[indice_mejor]['costo_duro']}, "
-          f"Blando={diagnosticos_poblacion[indice_mejor]['costo_blando']}", file=sys.stderr)
+    print(f"📈 Desglose inicial: Duro={diagnosticos_mejor['costo_duro']}, "
+          f"Blando={diagnosticos_mejor['costo_blando']}", file=sys.stderr)
+    
+    def diagnosticos_del_mejor():
+        return evaluar_solucion(mejor_individuo.a_dict(indice), data)[1]
+    
+    def informar_progreso(generacion: int) -> None:
+        # Con evaluación por etapas, los individuos cortados aportan su cota inferior al promedio
+        valores = fitness_values.inferior if isinstance(fitness_values, FitnessPorEtapas) else fitness_values
+        # Evaluaciones hechas de verdad: fallos de cache, cotas completadas y movimientos de la búsqueda local
+        evaluaciones = EVALUACIONES - evaluaciones_previas + busqueda.evaluaciones
+        PROGRESO.generacion(generacion, evaluaciones, mejor_fitness,
+                            lambda: sum(valores) / len(valores), lambda: mejor_individuo, data)
+    
+    if PROGRESO is not None:
+        informar_progreso(0)
 
-    # Evolución generacional
-    for generacion in range(1, GENERATIONS + 1):
-        nueva_poblacion = [copy.deepcopy(mejor_individuo)]  # Elitismo
+    # Evolución generacional (hasta GENERATIONS o hasta que se cumpla un criterio de parada)
+    generacion = 0
+    while generacion < GENERATIONS and not criterio.revisar(generacion, mejor_fitness, diagnosticos_del_mejor):
+        generacion += 1
+        nueva_poblacion = [mejor_individuo.a_dict(indice)]  # Elitismo
+        if migracion is not None:
+            nueva_poblacion.extend(migracion(generacion, poblacion, fitness_values)[:POP_SIZE - 1])
+        pendientes = []  # Hijos (hijo, semilla) por mutar y reparar en tanda
         
         # Generar nueva población
-        while len(nueva_poblacion) < POP_SIZE:
-            # Selección de padres
-            padre1 = seleccion_torneo(poblacion, fitness_values)
-            padre2 = seleccion_torneo(poblacion, fitness_values)
+        while len(nueva_poblacion) + len(pendientes) < POP_SIZE:
+            # Selección de padres (por índice, sin copiar)
+            padre1 = poblacion[seleccion_torneo(poblacion, fitness_values)]
+            padre2 = poblacion[seleccion_torneo(poblacion, fitness_values)]
             
-            # Cruce con probabilidad
+            # Cruce con probabilidad (sin cruce, mutación y reparación ya
+            # devuelven dicts nuevos)
             if random.random() < CROSSOVER_PROB:
                 hijo1, hijo2 = cruce_uniforme(padre1, padre2, data)
             else:
-                hijo1, hijo2 = copy.deepcopy(padre1), copy.deepcopy(padre2)
+                hijo1, hijo2 = padre1, padre2
+            
+            if OPERADORES_EN_PARALELO:
+                # Mutación y reparación en tanda, cada hijo con su propia semilla
+                pendientes.append((hijo1, random.getrandbits(64)))
+                if len(nueva_poblacion) + len(pendientes) < POP_SIZE:
+                    pendientes.append((hijo2, random.getrandbits(64)))
+                continue
             
             # Mutación
-            hijo1 = mutacion_adaptativa(hijo1, data)
-            hijo2 = mutacion_adaptativa(hijo2, data)
+            hijo1 = mutacion_adaptativa(hijo1, data, MUTATION_PROB)
+            hijo2 = mutacion_adaptativa(hijo2, data, MUTATION_PROB)
             
             # Reparación de conflictos críticos
-            hijo1 = reparar_individuo(hijo1, data)
-            hijo2 = reparar_individuo(hijo2, data)
+            hijo1 = reparar_individuo(hijo1, data, reparaciones)
+            hijo2 = reparar_individuo(hijo2, data, reparaciones)
             
             # Agregar a la nueva población
             nueva_poblacion.append(hijo1)
             if len(nueva_poblacion) < POP_SIZE:
                 nueva_poblacion.append(hijo2)
         
+        if pendientes:
+            nueva_poblacion.extend(variar_hijos(pendientes, data, reparaciones, pool))
+        
         # Actualizar población
         poblacion = nueva_poblacion
-        fitness_values = []
-        diagnosticos_poblacion = []
-        
-        # Evaluar nueva población
-        for individuo in poblacion:
-            fitness, diagnosticos = evaluar_solucion(individuo, data)
-            fitness_values.append(fitness)
-            diagnosticos_poblacion.append(diagnosticos)
-        
-        # Actualizar mejor solución
-        indice_mejor_actual = min(range(len(poblacion)), key=lambda i: fitness_values[i])
-        if fitness_values[indice_mejor_actual] < mejor_fitness:
-            mejor_fitness = fitness_values[indice_mejor_actual]
-            mejor_individuo = copy.deepcopy(poblacion[indice_mejor_actual])
+        
+        # Evaluar nueva población (elitismo y copias sin cambios salen de la cache;
+        # con evaluación por etapas, la cota es el mejor fitness conocido)
+        fitness_values = evaluar_poblacion(poblacion, data, cache,
+                                           cota=mejor_fitness if EVALUACION_POR_ETAPAS else None,
+                                           pool=pool)
+        
+        # Fase memética: hill climbing sobre los mejores cada BUSQUEDA_LOCAL_CADA generaciones
+        if BUSQUEDA_LOCAL_CADA and generacion % BUSQUEDA_LOCAL_CADA == 0:
+            fitness_values = fase_busqueda_local(poblacion, fitness_values, data, busqueda)
+        
+        # Actualizar mejor solución (los individuos sin fitness exacto tienen cota
+        # inferior > mejor_fitness, así que basta con las cotas inferiores)
+        valores = fitness_values.inferior if isinstance(fitness_values, FitnessPorEtapas) else fitness_values
+        indice_mejor_actual = min(range(len(poblacion)), key=lambda i: valores[i])
+        if valores[indice_mejor_actual] < mejor_fitness:
+            mejor_fitness = valores[indice_mejor_actual]
+            mejor_individuo = Genoma.desde_dict(poblacion[indice_mejor_actual], indice)
             print(f"🎯 [Gen {generacion}] Nuevo mejor fitness: {mejor_fitness:.2f}", file=sys.stderr)
         
         # Reporte de progreso
         if generacion % 50 == 0:
-            promedio = sum(fitness_values) / len(fitness_values)
-            print(f"📊 Gen {generacion}: Mejor={mejor_fitness:.2f}, Promedio={promedio:.2f}", file=sys.stderr)
+            # Con las cotas inferiores: sumar fitness_values completaría a todos los individuos cortados
+            promedio = sum(valores) / len(valores)
+            cota = '≥' if isinstance(fitness_values, FitnessPorEtapas) else '='
+            print(f"📊 Gen {generacion}: Mejor={mejor_fitness:.2f}, Promedio{cota}{promedio:.2f}", file=sys.stderr)
+        
+        if PROGRESO is not None:
+            informar_progreso(generacion)
+    
+    if pool is not None:
+        pool.shutdown()
     
     # Evaluación final
+    mejor_individuo = mejor_individuo.a_dict(indice)
     fitness_final, diagnosticos_finales = evaluar_solucion(mejor_individuo, data)
+    criterio.finalizar(diagnosticos_finales, 'generaciones', generaciones=generacion)
     
     print("🏁 ALGORITMO GENÉTICO COMPLETADO", file=sys.stderr)
     print(f"🏆 Fitness final: {fitness_final:.2f}", file=sys.stderr)
     print(f"📊 Diagnósticos finales: {dict(diagnosticos_finales)}", file=sys.stderr)
+    if cache is not None:
+        print(f"🗃️ Cache de fitness: {cache.aciertos} aciertos / {cache.aciertos + cache.fallos} "
+              f"consultas ({cache.tasa_aciertos():.1%})", file=sys.stderr)
+    print(f"🔧 Reparaciones: {dict(reparaciones)}", file=sys.stderr)
+    if busqueda.fases:
+        print(busqueda.resumen(), file=sys.stderr)
+    if PERFIL_EVALUACION is not None:
+        print(PERFIL_EVALUACION.resumen(), file=sys.stderr)
     
     return mejor_individuo, diagnosticos_finales
 
+# ============================================================================
+# MODO ESTADO ESTACIONARIO
+# ============================================================================
+
+def seleccionar_victima(fitness_values: List[float], reemplazo: str = None) -> int:
+    """
+    Elige el individuo que un hijo intentará reemplazar.
+    
+    Args:
+        fitness_values: Fitness exacto de la población
+        reemplazo: 'worst' (el peor) o 'tournament' (el perdedor de un torneo
+            de TOURNAMENT_K); None = REEMPLAZO
+        
+    Returns:
+        int: Índice de la víctima
+    """
+    reemplazo = reemplazo or REEMPLAZO
+    if reemplazo == 'worst':
+        return max(range(len(fitness_values)), key=fitness_values.__getitem__)
+    if reemplazo == 'tournament':
+        victima = random.randrange(len(fitness_values))
+        for _ in range(TOURNAMENT_K - 1):
+            otro = random.randrange(len(fitness_values))
+            if fitness_values[otro] > fitness_values[victima]:
+                victima = otro
+        return victima
+    raise ValueError(f"Política de reemplazo desconocida: {reemplazo}")
+
+class PoblacionEstacionaria:
+    """
+    Población de tamaño fijo que se actualiza en el lugar (estado estacionario y
+    modo asíncrono).
+    
+    Además de individuos y fitness guarda el hash de cada genoma (para descartar
+    hijos duplicados sin comparar con toda la población) y el índice del mejor.
+    """
+
+    def __init__(self, poblacion: List[Dict], fitness_values: List[float]):
+        self.individuos = poblacion
+        self.fitness = fitness_values
+        self.claves = [hash_genoma(individuo) for individuo in poblacion]
+        self.presentes = Counter(self.claves)
+        self.mejor = min(range(len(poblacion)), key=fitness_values.__getitem__)
+        self.reemplazos = 0
+        self.duplicados = 0
+
+    def contiene(self, hijo: Dict, clave: int) -> bool:
+        """True (y lo cuenta como duplicado) si el genoma ya está en la población."""
+        if self.presentes[clave] and hijo in self.individuos:
+            self.duplicados += 1
+            return True
+        return False
+
+    def reemplazar(self, victima: int, hijo: Dict, clave: int, fitness: float) -> bool:
+        """
+        Pone al hijo en el lugar de la víctima si no es peor que ella.
+        
+        Returns:
+            bool: True si el hijo es el nuevo mejor de la población
+        """
+        if fitness > self.fitness[victima]:
+            return False
+        self.presentes[self.claves[victima]] -= 1
+        self.individuos[victima] = hijo
+        self.fitness[victima] = fitness
+        self.claves[victima] = clave
+        self.presentes[clave] += 1
+        self.reemplazos += 1
+        if fitness < self.fitness[self.mejor]:
+            self.mejor = victima
+            return True
+        if victima == self.mejor:
+            self.mejor = min(range(len(self.fitness)), key=self.fitness.__getitem__)
+        return False
+
+    def reportar(self, evaluaciones: int) -> None:
+        promedio = sum(self.fitness) / len(self.fitness)
+        print(f"📊 Eval {evaluaciones}: Mejor={self.fitness[self.mejor]:.2f}, "
+              f"Promedio={promedio:.2f}", file=sys.stderr)
+
+    def informar_progreso(self, evaluaciones: int, data: Dict[str, Any]) -> None:
+        """Evento de progreso NDJSON (si PROGRESO está activo) tras `evaluaciones` hijos."""
+        if PROGRESO is not None:
+            PROGRESO.generacion(evaluaciones / len(self.fitness), evaluaciones + len(self.fitness),
+                                self.fitness[self.mejor], lambda: sum(self.fitness) / len(self.fitness),
+                                lambda: self.individuos[self.mejor], data)
+
+def finalizar_estacionario(estado: PoblacionEstacionaria, data: Dict[str, Any], evaluaciones: int,
+                           reparaciones: Counter, criterio: CriterioParada) -> Tuple[Dict, Dict]:
+    """Evalúa el mejor individuo con diagnósticos e imprime el resumen de la corrida."""
+    mejor_individuo = estado.individuos[estado.mejor]
+    fitness_final, diagnosticos_finales = evaluar_solucion(mejor_individuo, data)
+    criterio.finalizar(diagnosticos_finales, 'presupuesto', evaluaciones=evaluaciones)
+    
+    print("🏁 ALGORITMO GENÉTICO COMPLETADO", file=sys.stderr)
+    print(f"🏆 Fitness final: {fitness_final:.2f}", file=sys.stderr)
+    print(f"📊 Diagnósticos finales: {dict(diagnosticos_finales)}", file=sys.stderr)
+    print(f"♻️ Hijos: {evaluaciones} evaluados, {estado.reemplazos} reemplazos, "
+          f"{estado.duplicados} duplicados descartados", file=sys.stderr)
+    print(f"🔧 Reparaciones: {dict(reparaciones)}", file=sys.stderr)
+    if PERFIL_EVALUACION is not None:
+        print(PERFIL_EVALUACION.resumen(), file=sys.stderr)
+    
+    return mejor_individuo, diagnosticos_finales
+
+def ejecutar_estado_estacionario(data: Dict[str, Any],
+                                 presupuesto: int = None) -> Tuple[Dict, Dict]:
+    """
+    Variante de estado estacionario del algoritmo genético.
+    
+    En lugar de armar una población nueva por generación, crea dos hijos a la vez
+    y cada uno reemplaza en su lugar a una víctima (el peor, o el perdedor de un
+    torneo) si no es peor que ella. La población y su lista de fitness se
+    reservan una vez y se actualizan en el lugar, y cada mejora queda disponible
+    para la selección de inmediato. Cada hijo se evalúa por etapas con el
+    fitness de su víctima como cota, así que los que no pueden entrar se
+    descartan sin completar la evaluación. Los hijos idénticos a un individuo de
+    la población se descartan sin evaluar, para no perder diversidad. No se usa
+    la cache de fitness: casi no hay hijos repetidos y guardar una copia de
+    cada uno sería justamente la asignación que este modo evita.
+    
+    Los criterios de parada se revisan después de cada par de hijos, contando
+    generaciones equivalentes (evaluaciones / POP_SIZE).
+    
+    Args:
+        data: Datos del problema procesados
+        presupuesto: Hijos a generar (None = PRESUPUESTO_EVALUACIONES, o
+            POP_SIZE * GENERATIONS si tampoco está definido)
+        
+    Returns:
+        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos)
+    """
+    presupuesto = presupuesto or PRESUPUESTO_EVALUACIONES or POP_SIZE * GENERATIONS
+    print("🚀 Iniciando Algoritmo Genético (estado estacionario)", file=sys.stderr)
+    print(f"📊 Parámetros: Pop={POP_SIZE}, Evaluaciones={presupuesto}, Reemplazo={REEMPLAZO}",
+          file=sys.stderr)
+    
+    reparaciones = Counter()
+    criterio = crear_criterio_parada()
+    
+    # Población inicial (el pool, si lo hay, solo se usa aquí)
+    pool = crear_pool(data)
+    poblacion = inicializar_poblacion_tssp(data, pool=pool)
+    estado = PoblacionEstacionaria(poblacion, list(evaluar_poblacion(poblacion, data, pool=pool)))
+    if pool is not None:
+        pool.shutdown()
+    print(f"✅ Mejor fitness inicial: {estado.fitness[estado.mejor]:.2f}", file=sys.stderr)
+    
+    def diagnosticos_del_mejor():
+        return evaluar_solucion(estado.individuos[estado.mejor], data)[1]
+    
+    evaluaciones = 0
+    reporte = POP_SIZE * 50  # mismo ritmo que el reporte cada 50 generaciones
+    siguiente_reporte = reporte
+    while evaluaciones < presupuesto and not criterio.revisar(
+            evaluaciones / POP_SIZE, estado.fitness[estado.mejor], diagnosticos_del_mejor):
+        padre1 = estado.individuos[seleccion_torneo(estado.individuos, estado.fitness)]
+        padre2 = estado.individuos[seleccion_torneo(estado.individuos, estado.fitness)]
+        if random.random() < CROSSOVER_PROB:
+            hijos = cruce_uniforme(padre1, padre2, data)
+        else:
+            hijos = (padre1, padre2)
+        
+        for hijo in hijos:
+            if evaluaciones >= presupuesto:
+                break
+            hijo = mutacion_adaptativa(hijo, data, MUTATION_PROB)
+            hijo = reparar_individuo(hijo, data, reparaciones)
+            evaluaciones += 1
+            
+            clave = hash_genoma(hijo)
+            if estado.contiene(hijo, clave):
+                continue
+            
+            victima = seleccionar_victima(estado.fitness)
+            fitness, superior = evaluar_por_etapas(hijo, data, estado.fitness[victima])
+            if fitness != superior:
+                continue  # cortado: seguro peor que la víctima
+            
+            if estado.reemplazar(victima, hijo, clave, fitness):
+                print(f"🎯 [Eval {evaluaciones}] Nuevo mejor fitness: {fitness:.2f}", file=sys.stderr)
+        
+        if evaluaciones >= siguiente_reporte:
+            siguiente_reporte += reporte
+            estado.reportar(evaluaciones)
+        estado.informar_progreso(evaluaciones, data)
+    
+    return finalizar_estacionario(estado, data, evaluaciones, reparaciones, criterio)
+
+def criar_hijos(padre1: Dict, padre2: Dict, data: Dict[str, Any], semilla: int,
+                prob_cruce: float, prob_mutacion: float,
+                cota: float) -> List[Tuple[Dict, float, float, Counter]]:
+    """
+    Tarea de cría del modo asíncrono: cruce, mutación, reparación y evaluación
+    por etapas de dos hijos con una secuencia aleatoria propia.
+    
+    Args:
+        padre1, padre2: Padres (copias; la población del maestro puede cambiar mientras tanto)
+        data: Datos del problema
+        semilla: Semilla de la tarea
+        prob_cruce: Probabilidad de cruce
+        prob_mutacion: Probabilidad de mutación por curso
+        cota: Peor fitness de la población al despachar la tarea
+        
+    Returns:
+        List[Tuple[Dict, float, float, Counter]]: (hijo, inferior, superior, reparaciones) por hijo
+    """
+    estado = random.getstate()
+    random.seed(semilla)
+    try:
+        if random.random() < prob_cruce:
+            hijos = cruce_uniforme(padre1, padre2, data)
+        else:
+            hijos = (padre1, padre2)
+        resultados = []
+        for hijo in hijos:
+            reparaciones = Counter()
+            hijo = mutacion_adaptativa(hijo, data, prob_mutacion)
+            hijo = reparar_individuo(hijo, data, reparaciones)
+            inferior, superior = evaluar_por_etapas(hijo, data, cota)
+            resultados.append((hijo, inferior, superior, reparaciones))
+    finally:
+        random.setstate(estado)
+    return resultados
+
+def _criar_en_trabajador(tarea: Tuple) -> List[Tuple[Dict, float, float, Counter]]:
+    """Ejecuta criar_hijos() en un proceso trabajador."""
+    padre1, padre2, semilla, prob_cruce, prob_mutacion, cota = tarea
+    return criar_hijos(padre1, padre2, _DATOS_TRABAJADOR, semilla, prob_cruce, prob_mutacion, cota)
+
+def ejecutar_asincrono(data: Dict[str, Any], presupuesto: int = None) -> Tuple[Dict, Dict]:
+    """
+    Modo maestro-trabajador asíncrono (estado estacionario sin barreras).
+    
+    El maestro mantiene 2 tareas de cría por proceso en vuelo. Cada tarea lleva
+    copias de sus padres, así que lo que pase con la población mientras tanto
+    no la afecta. Apenas vuelve una tarea, sus hijos se insertan con las mismas
+    reglas del estado estacionario (duplicados, víctima y reemplazo se deciden al
+    llegar, contra la población de ese momento) y se despacha otra. Los hijos se
+    evalúan por etapas con el peor fitness al despachar como cota: ese valor
+    nunca sube, así que un hijo cortado no habría entrado al llegar.
+    
+    Cuando se cumple un criterio de parada se dejan de despachar tareas y se
+    insertan los hijos de las que ya estaban en vuelo.
+    
+    El orden de llegada depende de los tiempos de cada tarea, así que la corrida
+    no es reproducible aunque se fije la semilla. Con un solo proceso se usa
+    ejecutar_estado_estacionario().
+    
+    Args:
+        data: Datos del problema procesados
+        presupuesto: Hijos a generar (ver ejecutar_estado_estacionario)
+        
+    Returns:
+        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos)
+    """
+    pool = crear_pool(data)
+    if pool is None:
+        print("ℹ️ Modo asíncrono con un solo proceso: se usa estado estacionario", file=sys.stderr)
+        return ejecutar_estado_estacionario(data, presupuesto)
+    
+    presupuesto = presupuesto or PRESUPUESTO_EVALUACIONES or POP_SIZE * GENERATIONS
+    print("🚀 Iniciando Algoritmo Genético (maestro-trabajador asíncrono)", file=sys.stderr)
+    print(f"📊 Parámetros: Pop={POP_SIZE}, Evaluaciones={presupuesto}, Reemplazo={REEMPLAZO}, "
+          f"Procesos={numero_workers()}", file=sys.stderr)
+    
+    reparaciones = Counter()
+    criterio = crear_criterio_parada()
+    poblacion = inicializar_poblacion_tssp(data, pool=pool)
+    estado = PoblacionEstacionaria(poblacion, list(evaluar_poblacion(poblacion, data, pool=pool)))
+    print(f"✅ Mejor fitness inicial: {estado.fitness[estado.mejor]:.2f}", file=sys.stderr)
+    
+    def despachar():
+        padre1 = estado.individuos[seleccion_torneo(estado.individuos, estado.fitness)]
+        padre2 = estado.individuos[seleccion_torneo(estado.individuos, estado.fitness)]
+        tarea = (padre1, padre2, random.getrandbits(64), CROSSOVER_PROB, MUTATION_PROB, max(estado.fitness))
+        return pool.submit(_criar_en_trabajador, tarea)
+    
+    def diagnosticos_del_mejor():
+        return evaluar_solucion(estado.individuos[estado.mejor], data)[1]
+    
+    despachados = evaluaciones = 0
+    en_vuelo = set()
+    while despachados < presupuesto and len(en_vuelo) < 2 * numero_workers():
+        en_vuelo.add(despachar())
+        despachados += 2
+    
+    reporte = POP_SIZE * 50
+    siguiente_reporte = reporte
+    while en_vuelo:
+        listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+        for futuro in listos:
+            for hijo, inferior, superior, conteo in futuro.result():
+                evaluaciones += 1
+                reparaciones.update(conteo)
+                if inferior != superior:
+                    continue  # cortado: peor que el peor al despachar
+                clave = hash_genoma(hijo)
+                if estado.contiene(hijo, clave):
+                    continue
+                victima = seleccionar_victima(estado.fitness)
+                if estado.reemplazar(victima, hijo, clave, inferior):
+                    print(f"🎯 [Eval {evaluaciones}] Nuevo mejor fitness: {inferior:.2f}", file=sys.stderr)
+            if despachados < presupuesto and not criterio.revisar(
+                    evaluaciones / POP_SIZE, estado.fitness[estado.mejor], diagnosticos_del_mejor):
+                en_vuelo.add(despachar())
+                despachados += 2
+        if evaluaciones >= siguiente_reporte:
+            siguiente_reporte += reporte
+            estado.reportar(evaluaciones)
+        estado.informar_progreso(evaluaciones, data)
+    pool.shutdown()
+    
+    return finalizar_estacionario(estado, data, evaluaciones, reparaciones, criterio)
+
+# ============================================================================
+# MOTORES DE TRAYECTORIA (RECOCIDO SIMULADO Y BÚSQUEDA TABÚ)
+# ============================================================================
+
+MOTORES = ('ga', 'sa', 'tabu')
+ESQUEMAS_TEMPERATURA = ('geometric', 'linear', 'lundy-mees')
+
+def vecino_aleatorio(horario: Dict[str, List[Tuple[Period, AulaID, str]]], data: Dict[str, Any],
+                     bloques: List[Tuple[CourseCode, int]]) -> List[Tuple[CourseCode, int, Tuple]]:
+    """
+    Sortea un movimiento como lista de cambios (curso, i, slot nuevo): mover un
+    bloque a otro período, cambiarlo a otra aula del tipo requerido, cambiar su
+    profesor (si el curso tiene alternativas) o intercambiar los períodos de dos
+    bloques distintos.
+    """
+    indice = data['_indice']
+    codigo, i = random.choice(bloques)
+    periodo, aula, profesor = horario[codigo][i]
+    info_curso = data['_courses_map'][codigo]
+    tipo = random.randrange(4)
+    if tipo == 3 and len(bloques) > 1:
+        otro, j = codigo, i
+        while (otro, j) == (codigo, i):  # consigo mismo el intercambio no cambia nada
+            otro, j = random.choice(bloques)
+        periodo2, aula2, profesor2 = horario[otro][j]
+        return [(codigo, i, (periodo2, aula, profesor)), (otro, j, (periodo, aula2, profesor2))]
+    if tipo == 1:
+        aulas = indice.aulas_por_tipo.get(info_curso.get('aula_tipo', 'T')) or indice.aulas
+        return [(codigo, i, (periodo, random.choice(aulas), profesor))]
+    if tipo == 2 and info_curso.get('profesores'):
+        return [(codigo, i, (periodo, aula, random.choice(info_curso['profesores'])))]
+    return [(codigo, i, (random.choice(indice.periodos), aula, profesor))]
+
+def aplicar_movimiento(evaluador: EvaluadorIncremental,
+                       cambios: List[Tuple[CourseCode, int, Tuple]]) -> List[Tuple[CourseCode, int, Tuple]]:
+    """Aplica los cambios en el evaluador y retorna los cambios que los deshacen."""
+    deshacer = [(codigo, i, evaluador.individuo[codigo][i]) for codigo, i, _ in reversed(cambios)]
+    for codigo, i, slot in cambios:
+        evaluador.mover(codigo, i, slot)
+    return deshacer
+
+class EsquemaTemperatura:
+    """
+    Temperatura del recocido simulado, que baja una vez por etapa de t0 a
+    t_final en `etapas` etapas:
+    
+    - geometric: T_k = t0 · α^k, con α = (t_final / t0)^(1 / etapas)
+    - linear: T_k = t0 - k · (t0 - t_final) / etapas
+    - lundy-mees: T_{k+1} = T_k / (1 + β · T_k), con β = (t0 - t_final) / (etapas · t0 · t_final)
+    """
+
+    def __init__(self, esquema: str, t0: float, t_final: float, etapas: int):
+        self.esquema = esquema
+        self.t0 = t0
+        self.t_final = min(t_final, t0)
+        self.etapas = max(1, etapas)
+        self.etapa = 0
+        self.temperatura = t0
+        self.alfa = (self.t_final / t0) ** (1 / self.etapas)
+        self.beta = (t0 - self.t_final) / (self.etapas * t0 * self.t_final)
+
+    def enfriar(self) -> float:
+        self.etapa += 1
+        if self.esquema == 'geometric':
+            self.temperatura *= self.alfa
+        elif self.esquema == 'linear':
+            self.temperatura = self.t0 - self.etapa * (self.t0 - self.t_final) / self.etapas
+        else:
+            self.temperatura /= 1 + self.beta * self.temperatura
+        self.temperatura = max(self.temperatura, self.t_final)
+        return self.temperatura
+
+def temperatura_inicial(evaluador: EvaluadorIncremental, data: Dict[str, Any],
+                        bloques: List[Tuple[CourseCode, int]], muestras: int = 200,
+                        aceptacion: float = 0.8) -> float:
+    """
+    Estima t0 para que el empeoramiento blando medio de movimientos al azar se
+    acepte con probabilidad `aceptacion` (los movimientos se deshacen). Solo se
+    mide el costo blando: con PESO_DURO en t0 el recocido acepta casi cualquier
+    violación dura y se queda vagando lejos de la factibilidad.
+    """
+    empeoramientos = []
+    for _ in range(muestras):
+        antes = evaluador.costo_blando
+        deshacer = aplicar_movimiento(evaluador, vecino_aleatorio(evaluador.individuo, data, bloques))
+        if evaluador.costo_blando > antes:
+            empeoramientos.append(evaluador.costo_blando - antes)
+        aplicar_movimiento(evaluador, deshacer)
+    if not empeoramientos:
+        return TEMPERATURA_FINAL
+    return -(sum(empeoramientos) / len(empeoramientos)) / math.log(aceptacion)
+
+def paso_tabu(evaluador: EvaluadorIncremental, data: Dict[str, Any], bloques: List[Tuple[CourseCode, int]],
+              tabu: Dict[Tuple, int], iteracion: int, mejor_fitness: float) -> Tuple[int, bool]:
+    """
+    Una iteración de búsqueda tabú: evalúa CANDIDATOS_TABU vecinos al azar y
+    aplica el mejor admisible, aunque empeore. Un vecino es tabú si devuelve
+    algún bloque a un slot que dejó hace menos de TENENCIA_TABU iteraciones,
+    salvo que mejore el mejor fitness conocido (aspiración).
+    
+    Returns:
+        Tuple[int, bool]: (vecinos evaluados, si se aplicó un movimiento; no se
+        aplica ninguno cuando todos los vecinos eran tabú)
+    """
+    elegido, fitness_elegido = None, float('inf')
+    for _ in range(CANDIDATOS_TABU):
+        cambios = vecino_aleatorio(evaluador.individuo, data, bloques)
+        deshacer = aplicar_movimiento(evaluador, cambios)
+        fitness = evaluador.fitness
+        aplicar_movimiento(evaluador, deshacer)
+        prohibido = any(tabu.get((codigo, i, slot), -1) >= iteracion for codigo, i, slot in cambios)
+        if fitness < fitness_elegido and (not prohibido or fitness < mejor_fitness):
+            elegido, fitness_elegido = cambios, fitness
+    if elegido is None:
+        return CANDIDATOS_TABU, False
+    for codigo, i, slot in aplicar_movimiento(evaluador, elegido):
+        tabu[(codigo, i, slot)] = iteracion + TENENCIA_TABU
+    return CANDIDATOS_TABU, True
+
+def ejecutar_trayectoria(data: Dict[str, Any], motor: str, iteraciones: int = None) -> Tuple[Dict, Dict]:
+    """
+    Motor de trayectoria única: recocido simulado ('sa') o búsqueda tabú ('tabu').
+    
+    Parte de un individuo TSSP y lo modifica en el lugar con vecino_aleatorio(),
+    puntuando cada movimiento con EvaluadorIncremental (mismos pesos y mismo
+    fitness que el GA). El recocido acepta un empeoramiento Δ con probabilidad
+    exp(-Δ / T), con T según ESQUEMA_TEMPERATURA; la búsqueda tabú usa
+    paso_tabu(). La corrida avanza por etapas de POP_SIZE movimientos evaluados,
+    que hacen de generación equivalente para los criterios de parada, los
+    reportes y el progreso NDJSON.
+    
+    Args:
+        data: Datos del problema procesados
+        motor: 'sa' o 'tabu'
+        iteraciones: Movimientos a evaluar (None = ITERACIONES_TRAYECTORIA, o
+            10 * POP_SIZE * GENERATIONS si tampoco está definido)
+        
+    Returns:
+        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos)
+    """
+    iteraciones = iteraciones or ITERACIONES_TRAYECTORIA or 10 * POP_SIZE * GENERATIONS
+    nombre = 'Recocido simulado' if motor == 'sa' else 'Búsqueda tabú'
+    print(f"🚀 Iniciando {nombre}", file=sys.stderr)
+    
+    criterio = crear_criterio_parada()
+    indice = data['_indice']
+    evaluador = EvaluadorIncremental(generar_individuo_tssp(data), data)
+    horario = evaluador.individuo
+    bloques = [(codigo, i) for codigo, asignaciones in horario.items() for i in range(len(asignaciones))]
+    mejor = Genoma.desde_dict(horario, indice)
+    mejor_fitness, mejor_duro, mejor_blando = evaluador.fitness, evaluador.costo_duro, evaluador.costo_blando
+    print(f"✅ Fitness inicial: {mejor_fitness:.2f}", file=sys.stderr)
+    
+    etapa = POP_SIZE
+    if motor == 'sa':
+        t0 = TEMPERATURA_INICIAL or temperatura_inicial(evaluador, data, bloques)
+        esquema = EsquemaTemperatura(ESQUEMA_TEMPERATURA, t0, TEMPERATURA_FINAL, iteraciones // etapa)
+        print(f"📊 Parámetros: Movimientos={iteraciones}, Esquema={ESQUEMA_TEMPERATURA}, "
+              f"T0={t0:.2f}, Tf={esquema.t_final:.2f}", file=sys.stderr)
+    else:
+        tabu = {}
+        print(f"📊 Parámetros: Movimientos={iteraciones}, Tenencia={TENENCIA_TABU}, "
+              f"Candidatos={CANDIDATOS_TABU}", file=sys.stderr)
+    
+    def diagnosticos_del_mejor():
+        return {'costo_duro': mejor_duro, 'costo_blando': mejor_blando, 'fitness_total': mejor_fitness}
+    
+    evaluaciones = 0
+    aceptados = 0
+    etapas = 0
+    while evaluaciones < iteraciones and not criterio.revisar(
+            evaluaciones / POP_SIZE, mejor_fitness, diagnosticos_del_mejor):
+        fin_etapa = min(iteraciones, evaluaciones + etapa)
+        while evaluaciones < fin_etapa:
+            if motor == 'sa':
+                actual = evaluador.fitness
+                deshacer = aplicar_movimiento(evaluador, vecino_aleatorio(horario, data, bloques))
+                evaluaciones += 1
+                delta = evaluador.fitness - actual
+                if delta <= 0 or random.random() < math.exp(-delta / esquema.temperatura):
+                    aceptados += 1
+                else:
+                    aplicar_movimiento(evaluador, deshacer)
+            else:
+                # El reloj tabú son los movimientos aplicados: una iteración sin
+                # vecino admisible no lo avanza
+                evaluados, aplicado = paso_tabu(evaluador, data, bloques, tabu, aceptados, mejor_fitness)
+                evaluaciones += evaluados
+                aceptados += aplicado
+            if evaluador.fitness < mejor_fitness:
+                mejor_fitness, mejor_duro, mejor_blando = evaluador.fitness, evaluador.costo_duro, evaluador.costo_blando
+                mejor = Genoma.desde_dict(horario, indice)
+        etapas += 1
+        if motor == 'sa':
+            esquema.enfriar()
+        if etapas % 50 == 0:
+            print(f"📊 Movimiento {evaluaciones}: Mejor={mejor_fitness:.2f}, Actual={evaluador.fitness:.2f}"
+                  + (f", T={esquema.temperatura:.2f}" if motor == 'sa' else ''), file=sys.stderr)
+        if PROGRESO is not None:
+            PROGRESO.generacion(evaluaciones / POP_SIZE, evaluaciones, mejor_fitness,
+                                lambda: evaluador.fitness, lambda: mejor, data)
+    
+    mejor_individuo = mejor.a_dict(indice)
+    fitness_final, diagnosticos_finales = evaluar_solucion(mejor_individuo, data)
+    criterio.finalizar(diagnosticos_finales, 'presupuesto', evaluaciones=evaluaciones)
+    
+    print(f"🏁 {nombre.upper()} COMPLETADO", file=sys.stderr)
+    print(f"🏆 Fitness final: {fitness_final:.2f}", file=sys.stderr)
+    print(f"📊 Diagnósticos finales: {dict(diagnosticos_finales)}", file=sys.stderr)
+    print(f"🔥 Movimientos: {evaluaciones} evaluados, {aceptados} aplicados", file=sys.stderr)
+    if PERFIL_EVALUACION is not None:
+        print(PERFIL_EVALUACION.resumen(), file=sys.stderr)
+    
+    return mejor_individuo, diagnosticos_finales
+
+# ============================================================================
+# MODELO DE ISLAS
+# ============================================================================
+
+TOPOLOGIAS_MIGRACION = ('ring', 'bidirectional', 'complete')
+
+def destinos_migracion(topologia: str, islas: int) -> List[List[int]]:
+    """
+    Calcula a qué islas envía migrantes cada isla.
+    
+    Args:
+        topologia: 'ring' (i -> i+1), 'bidirectional' (i -> i±1) o 'complete' (todas con todas)
+        islas: Número de islas
+        
+    Returns:
+        List[List[int]]: Destinos de cada isla
+    """
+    if topologia == 'ring':
+        return [[(i + 1) % islas] if islas > 1 else [] for i in range(islas)]
+    if topologia == 'bidirectional':
+        return [sorted({(i + 1) % islas, (i - 1) % islas} - {i}) for i in range(islas)]
+    if topologia == 'complete':
+        return [[j for j in range(islas) if j != i] for i in range(islas)]
+    raise ValueError(f"Topología de migración desconocida: {topologia}")
+
+def _proceso_isla(isla: int, datos: Dict[str, Any], semilla: int, parametros: Dict[str, Any],
+                  buzones: List, destinos: List[List[int]], intervalo: int, migrantes: int,
+                  resultados) -> None:
+    """
+    Corre el GA de una isla en su propio proceso y publica (isla, mejor, diagnósticos).
+    
+    Cada `intervalo` generaciones envía sus `migrantes` mejores individuos a sus
+    destinos y espera un lote de cada isla que le envía a ella. Los lotes
+    recibidos se ordenan por isla de origen, así que la corrida es determinista
+    aunque los mensajes lleguen en cualquier orden; si un origen ya mandó el
+    lote de la migración siguiente, se guarda para entonces.
+    
+    Si la isla se detiene antes de tiempo (criterio de parada) envía a sus
+    destinos un lote None en lugar de migrantes, para que no la esperen: quien
+    lo recibe también se detiene y avisa a los suyos.
+    """
+    globals().update(parametros)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # la cancelación llega por CANCELACION
+    datos['_indice'] = construir_indice(datos)
+    random.seed(semilla)
+    origenes = [j for j, destinos_j in enumerate(destinos) if isla in destinos_j]
+    adelantados = defaultdict(list)  # origen -> lotes de migraciones posteriores
+    criterio = crear_criterio_parada()
+    
+    def recibir() -> Dict[int, List[Dict]]:
+        lotes = {origen: adelantados[origen].pop(0) for origen in origenes if adelantados[origen]}
+        while len(lotes) < len(origenes):
+            origen, lote = buzones[isla].get()
+            if origen in lotes:
+                adelantados[origen].append(lote)
+            else:
+                lotes[origen] = lote
+        return lotes
+    
+    def migracion(generacion: int, poblacion: List[Dict], fitness_values) -> List[Dict]:
+        if generacion == 1 or (generacion - 1) % intervalo:
+            return []
+        # Las cotas inferiores ordenan igual a los individuos con fitness exacto,
+        # y los que se cortaron quedan detrás de todos ellos
+        valores = fitness_values.inferior if isinstance(fitness_values, FitnessPorEtapas) else fitness_values
+        mejores = sorted(range(len(poblacion)), key=lambda i: valores[i])[:migrantes]
+        for destino in destinos[isla]:
+            buzones[destino].put((isla, [poblacion[i] for i in mejores]))
+        lotes = recibir()
+        if any(lote is None for lote in lotes.values()):
+            # Si la vecina se detuvo por una cancelación, esta isla también queda cancelada
+            if CANCELACION is not None and CANCELACION.solicitada():
+                criterio.detener('cancelado')
+            criterio.detener('isla_vecina')
+        return [individuo for origen in sorted(lotes) for individuo in lotes[origen] or []]
+    
+    mejor, diagnosticos = ejecutar_algoritmo_genetico(datos, migracion, criterio)
+    if criterio.motivo != 'generaciones':
+        for destino in destinos[isla]:
+            buzones[destino].put((isla, None))
+    resultados.put((isla, mejor, diagnosticos))
+
+def recoger_resultados_islas(resultados, procesos: List, espera: float = 0.5) -> List[Tuple]:
+    """
+    Lee un resultado (isla, mejor, diagnósticos) por isla sin bloquearse si una
+    isla muere: entre lecturas con tope `espera` revisa el exitcode de las que
+    faltan. Si una terminó sin publicar su resultado (p. ej. por una excepción)
+    detiene al resto y lanza RuntimeError, en lugar de esperar para siempre.
+    """
+    recibidos = {}
+    while len(recibidos) < len(procesos):
+        try:
+            resultado = resultados.get(timeout=espera)
+            recibidos[resultado[0]] = resultado
+            continue
+        except queue.Empty:
+            pass
+        caidas = [(isla, proceso.exitcode) for isla, proceso in enumerate(procesos)
+                  if isla not in recibidos and proceso.exitcode is not None]
+        if caidas:
+            for proceso in procesos:
+                if proceso.exitcode is None:
+                    proceso.terminate()
+            detalle = ', '.join(f"isla {isla} (código {codigo})" for isla, codigo in caidas)
+            raise RuntimeError(f"Islas terminadas sin resultado: {detalle}")
+    return list(recibidos.values())
+
+def ejecutar_islas(data: Dict[str, Any], islas: int, intervalo: int = INTERVALO_MIGRACION,
+                   migrantes: int = MIGRANTES, topologia: str = TOPOLOGIA,
+                   probabilidades: List[Tuple[float, float]] = None) -> Tuple[Dict, Dict]:
+    """
+    Ejecuta el GA con el modelo de islas: `islas` subpoblaciones de POP_SIZE // islas
+    individuos, cada una en su propio proceso y con su propia semilla (tomada del
+    generador global), que intercambian sus mejores individuos según la topología.
+    
+    Args:
+        data: Datos del problema procesados
+        islas: Número de islas (procesos)
+        intervalo: Generaciones entre migraciones
+        migrantes: Individuos que envía cada isla a cada destino
+        topologia: Ver destinos_migracion()
+        probabilidades: (cruce, mutación) por isla, repartidos cíclicamente
+            (None = CROSSOVER_PROB y MUTATION_PROB en todas)
+        
+    Returns:
+        Tuple[Dict, Dict]: (mejor_solucion, diagnosticos) de la mejor isla, con
+        'isla_ganadora', 'fitness_por_isla' y 'motivo_por_isla' agregados a los
+        diagnósticos
+    """
+    destinos = destinos_migracion(topologia, islas)
+    entrantes = max(sum(isla in d for d in destinos) for isla in range(islas)) * migrantes
+    tamaño = max(POP_SIZE // islas, entrantes + 2)
+    probabilidades = probabilidades or [(CROSSOVER_PROB, MUTATION_PROB)]
+    print(f"🏝️ Modelo de islas: {islas} islas de {tamaño} individuos, topología {topologia}, "
+          f"{migrantes} migrantes cada {intervalo} generaciones", file=sys.stderr)
+    
+    # Como en el pool, el índice compilado se reconstruye en cada proceso
+    datos = {k: v for k, v in data.items() if k != '_indice'}
+    buzones = [multiprocessing.Queue() for _ in range(islas)]
+    resultados = multiprocessing.Queue()
+    procesos = []
+    for isla in range(islas):
+        cruce, mutacion = probabilidades[isla % len(probabilidades)]
+        parametros = {
+            'POP_SIZE': tamaño, 'GENERATIONS': GENERATIONS, 'TOURNAMENT_K': TOURNAMENT_K,
+            'CROSSOVER_PROB': cruce, 'MUTATION_PROB': mutacion, 'CACHE_SIZE': CACHE_SIZE,
+            'EVALUACION_POR_ETAPAS': EVALUACION_POR_ETAPAS, 'PERFIL_EVALUACION': None,
+            'WORKERS': 1, 'OPERADORES_EN_PARALELO': OPERADORES_EN_PARALELO,
+            'LIMITE_TIEMPO': LIMITE_TIEMPO, 'GENS_ESTANCAMIENTO': GENS_ESTANCAMIENTO,
+            'OBJETIVO_FITNESS': OBJETIVO_FITNESS, 'CANCELACION': CANCELACION,
+            'PROGRESO': None,  # las islas no emiten progreso; start y done salen del proceso principal
+            'BUSQUEDA_LOCAL_CADA': BUSQUEDA_LOCAL_CADA, 'BUSQUEDA_LOCAL_TOP': BUSQUEDA_LOCAL_TOP,
+            'BUSQUEDA_LOCAL_TIEMPO': BUSQUEDA_LOCAL_TIEMPO,
+            'BUSQUEDA_LOCAL_EVALUACIONES': BUSQUEDA_LOCAL_EVALUACIONES, 'PROB_MOVIMIENTOS': PROB_MOVIMIENTOS,
+        }
+        proceso = multiprocessing.Process(
+            target=_proceso_isla,
+            args=(isla, datos, random.getrandbits(64), parametros, buzones, destinos,
+                  intervalo, migrantes, resultados),
+        )
+        proceso.start()
+        procesos.append(proceso)
+    
+    # Leer los resultados antes de join: las colas no se vacían solas
+    por_isla = sorted(recoger_resultados_islas(resultados, procesos), key=lambda r: r[0])
+    for proceso in procesos:
+        proceso.join()
+    
+    isla_ganadora, mejor, diagnosticos = min(por_isla, key=lambda r: (r[2]['fitness_total'], r[0]))
+    diagnosticos = dict(diagnosticos)
+    diagnosticos['isla_ganadora'] = isla_ganadora
+    diagnosticos['fitness_por_isla'] = [r[2]['fitness_total'] for r in por_isla]
+    diagnosticos['motivo_por_isla'] = [r[2]['motivo_parada'] for r in por_isla]
+    print(f"🏝️ Mejor fitness por isla: {diagnosticos['fitness_por_isla']} "
+          f"(gana la isla {isla_ganadora})", file=sys.stderr)
+    return mejor, diagnosticos
+
 # ============================================================================
 # CONVERSIÓN DE SALIDA A JSON
 # ============================================================================
@@ -1106,12 +3958,13 @@ def convertir_solucion_a_json(solucion: Dict[str, List[Tuple[Period, AulaID, str
     Convierte la solución interna del GA al formato JSON de salida.
     
     Args:
-        solucion: Solución del algoritmo genético
+        solucion: Solución del algoritmo genético (dict o Genoma)
         data: Datos del problema
         
     Returns:
         dict: Horario en formato JSON de salida
     """
+    solucion = como_horario(solucion, data)
     mapa_cursos = data['_courses_map']
     mapa_aulas = {a['id']: a for a in data['_aulas_list']}
     
@@ -1184,30 +4037,155 @@ def convertir_solucion_a_json(solucion: Dict[str, List[Tuple[Period, AulaID, str
     }
 
 def main():
-    global POP_SIZE, GENERATIONS, TOURNAMENT_K, CROSSOVER_PROB, MUTATION_PROB
+    global POP_SIZE, GENERATIONS, TOURNAMENT_K, CROSSOVER_PROB, MUTATION_PROB, CACHE_SIZE
+    global EVALUACION_POR_ETAPAS, PERFIL_EVALUACION, WORKERS, OPERADORES_EN_PARALELO
+    global ISLAS, INTERVALO_MIGRACION, MIGRANTES, TOPOLOGIA
+    global ESTADO_ESTACIONARIO, REEMPLAZO, PRESUPUESTO_EVALUACIONES, MODO_ASINCRONO
+    global LIMITE_TIEMPO, GENS_ESTANCAMIENTO, OBJETIVO_FITNESS, CANCELACION, PROGRESO
+    global BUSQUEDA_LOCAL_CADA, BUSQUEDA_LOCAL_TOP, BUSQUEDA_LOCAL_TIEMPO, BUSQUEDA_LOCAL_EVALUACIONES, PROB_MOVIMIENTOS
+    global MOTOR, ITERACIONES_TRAYECTORIA, ESQUEMA_TEMPERATURA, TEMPERATURA_INICIAL, TEMPERATURA_FINAL
+    global TENENCIA_TABU, CANDIDATOS_TABU
 
     parser = argparse.ArgumentParser()
+    parser.add_argument('--engine', choices=MOTORES, default=MOTOR,
+                        help='ga, recocido simulado (sa) o búsqueda tabú (tabu)')
     parser.add_argument('--pop', type=int, default=POP_SIZE)
     parser.add_argument('--gens', type=int, default=GENERATIONS)
     parser.add_argument('--tournament', type=int, default=TOURNAMENT_K)
     parser.add_argument('--crossover', type=float, default=CROSSOVER_PROB)
     parser.add_argument('--mutation', type=float, default=MUTATION_PROB)
+    parser.add_argument('--structured-moves', type=float, default=PROB_MOVIMIENTOS, metavar='P',
+                        help='fracción de mutaciones que usan intercambio, cadena de Kempe o tramo H10')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE)
+    parser.add_argument('--no-staged', action='store_true')
+    parser.add_argument('--profile-eval', metavar='RUTA', default=None)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--parallel-ops', action='store_true')
+    parser.add_argument('--islands', type=int, default=ISLAS)
+    parser.add_argument('--migration-interval', type=int, default=INTERVALO_MIGRACION)
+    parser.add_argument('--migrants', type=int, default=MIGRANTES)
+    parser.add_argument('--topology', choices=TOPOLOGIAS_MIGRACION, default=TOPOLOGIA)
+    parser.add_argument('--island-crossover', default=None, help='probabilidades de cruce por isla, separadas por comas')
+    parser.add_argument('--island-mutation', default=None, help='probabilidades de mutación por isla, separadas por comas')
+    parser.add_argument('--steady-state', action='store_true', help='reemplazo en el lugar, de a dos hijos (sin islas)')
+    parser.add_argument('--async', dest='asincrono', action='store_true', help='estado estacionario asíncrono sobre el pool de --workers')
+    parser.add_argument('--replacement', choices=('worst', 'tournament'), default=REEMPLAZO)
+    parser.add_argument('--eval-budget', type=int, default=None, help='hijos a evaluar en estado estacionario (por defecto pop * gens)')
+    parser.add_argument('--time-limit', type=float, default=LIMITE_TIEMPO, metavar='SEGUNDOS',
+                        help='detener la corrida al pasar este tiempo de reloj')
+    parser.add_argument('--stall-gens', type=int, default=GENS_ESTANCAMIENTO, metavar='N',
+                        help='detener tras N generaciones sin mejorar el mejor fitness')
+    parser.add_argument('--target-fitness', type=leer_objetivo, default=OBJETIVO_FITNESS, metavar='X|DURO:BLANDO',
+                        help='detener al llegar a fitness total <= X, o a costo duro <= DURO y blando <= BLANDO')
+    parser.add_argument('--cancel-file', metavar='RUTA', default=None,
+                        help='cancelar la corrida (con salida parcial) cuando aparezca este archivo')
+    parser.add_argument('--progress-fd', type=int, default=None, metavar='FD',
+                        help='emitir eventos de progreso NDJSON en este descriptor (p. ej. 3; no 1, que es la salida final)')
+    parser.add_argument('--progress-interval', type=float, default=1.0, metavar='SEGUNDOS',
+                        help='segundos mínimos entre eventos de progreso')
+    parser.add_argument('--ls-every', type=int, default=BUSQUEDA_LOCAL_CADA, metavar='N',
+                        help='búsqueda local sobre los mejores cada N generaciones (0 = desactivada)')
+    parser.add_argument('--ls-top', type=int, default=BUSQUEDA_LOCAL_TOP, metavar='K',
+                        help='individuos que mejora cada fase de búsqueda local')
+    parser.add_argument('--ls-time', type=float, default=BUSQUEDA_LOCAL_TIEMPO, metavar='SEGUNDOS',
+                        help='tope de tiempo por fase de búsqueda local (0 = sin tope); depende de la carga '
+                             'de la máquina, así que con tope --seed ya no reproduce la corrida')
+    parser.add_argument('--ls-evals', type=int, default=BUSQUEDA_LOCAL_EVALUACIONES, metavar='N',
+                        help='movimientos evaluados por fase de búsqueda local (0 = hasta el óptimo local)')
+    parser.add_argument('--iterations', type=int, default=ITERACIONES_TRAYECTORIA, metavar='N',
+                        help='movimientos evaluados por sa/tabu (por defecto 10 * pop * gens)')
+    parser.add_argument('--sa-schedule', choices=ESQUEMAS_TEMPERATURA, default=ESQUEMA_TEMPERATURA,
+                        help='esquema de enfriamiento del recocido')
+    parser.add_argument('--sa-t0', type=float, default=TEMPERATURA_INICIAL, metavar='T',
+                        help='temperatura inicial (por defecto se estima con movimientos de muestra)')
+    parser.add_argument('--sa-t-final', type=float, default=TEMPERATURA_FINAL, metavar='T',
+                        help='temperatura al agotar las iteraciones')
+    parser.add_argument('--tabu-tenure', type=int, default=TENENCIA_TABU, metavar='N',
+                        help='iteraciones que un bloque no puede volver a su slot anterior')
+    parser.add_argument('--tabu-candidates', type=int, default=CANDIDATOS_TABU, metavar='N',
+                        help='vecinos evaluados por iteración tabú')
+    parser.add_argument('--seed', type=int, default=None)
     args = parser.parse_args()
+    if args.progress_fd == 1:
+        parser.error("--progress-fd no puede ser 1: stdout lleva solo el JSON final")
+    if args.migration_interval < 1:
+        parser.error("--migration-interval debe ser al menos 1")
+    if args.migrants < 0:
+        parser.error("--migrants no puede ser negativo")
+    if args.sa_t0 is not None and args.sa_t0 <= 0:
+        parser.error("--sa-t0 debe ser positiva")
+    if args.sa_t_final <= 0:
+        parser.error("--sa-t-final debe ser positiva")
+    if args.tabu_tenure < 0:
+        parser.error("--tabu-tenure no puede ser negativo")
+    if args.tabu_candidates < 1:
+        parser.error("--tabu-candidates debe ser al menos 1")
 
     POP_SIZE = args.pop
     GENERATIONS = args.gens
     TOURNAMENT_K = args.tournament
     CROSSOVER_PROB = args.crossover
     MUTATION_PROB = args.mutation
+    PROB_MOVIMIENTOS = args.structured_moves
+    CACHE_SIZE = args.cache_size
+    EVALUACION_POR_ETAPAS = not args.no_staged
+    PERFIL_EVALUACION = PerfilEvaluacion() if args.profile_eval else None
+    WORKERS = args.workers
+    OPERADORES_EN_PARALELO = args.parallel_ops
+    ISLAS = args.islands
+    INTERVALO_MIGRACION = args.migration_interval
+    MIGRANTES = args.migrants
+    TOPOLOGIA = args.topology
+    ESTADO_ESTACIONARIO = args.steady_state
+    REEMPLAZO = args.replacement
+    PRESUPUESTO_EVALUACIONES = args.eval_budget
+    MODO_ASINCRONO = args.asincrono
+    LIMITE_TIEMPO = args.time_limit
+    GENS_ESTANCAMIENTO = args.stall_gens
+    OBJETIVO_FITNESS = args.target_fitness
+    CANCELACION = Cancelacion(args.cancel_file)
+    CANCELACION.instalar()
+    MOTOR = args.engine
+    ITERACIONES_TRAYECTORIA = args.iterations
+    ESQUEMA_TEMPERATURA = args.sa_schedule
+    TEMPERATURA_INICIAL = args.sa_t0
+    TEMPERATURA_FINAL = args.sa_t_final
+    TENENCIA_TABU = args.tabu_tenure
+    CANDIDATOS_TABU = args.tabu_candidates
+    BUSQUEDA_LOCAL_CADA = args.ls_every
+    BUSQUEDA_LOCAL_TOP = args.ls_top
+    BUSQUEDA_LOCAL_TIEMPO = args.ls_time
+    BUSQUEDA_LOCAL_EVALUACIONES = args.ls_evals
+    PROGRESO = ProgresoNDJSON.abrir(args.progress_fd, args.progress_interval) if args.progress_fd is not None else None
+    if args.seed is not None:
+        random.seed(args.seed)
 
     # 🔹 Imprimir parámetros de debug en stderr
     import sys
     print("===== Parámetros recibidos =====", file=sys.stderr)
+    print(f"MOTOR = {MOTOR}", file=sys.stderr)
     print(f"POP_SIZE = {POP_SIZE}", file=sys.stderr)
     print(f"GENERATIONS = {GENERATIONS}", file=sys.stderr)
     print(f"TOURNAMENT_K = {TOURNAMENT_K}", file=sys.stderr)
     print(f"CROSSOVER_PROB = {CROSSOVER_PROB}", file=sys.stderr)
     print(f"MUTATION_PROB = {MUTATION_PROB}", file=sys.stderr)
+    print(f"PROB_MOVIMIENTOS = {PROB_MOVIMIENTOS}", file=sys.stderr)
+    print(f"CACHE_SIZE = {CACHE_SIZE}", file=sys.stderr)
+    print(f"EVALUACION_POR_ETAPAS = {EVALUACION_POR_ETAPAS}", file=sys.stderr)
+    print(f"PERFIL_EVALUACION = {args.profile_eval}", file=sys.stderr)
+    print(f"WORKERS = {WORKERS}", file=sys.stderr)
+    print(f"OPERADORES_EN_PARALELO = {OPERADORES_EN_PARALELO}", file=sys.stderr)
+    print(f"ISLAS = {ISLAS}", file=sys.stderr)
+    print(f"ESTADO_ESTACIONARIO = {ESTADO_ESTACIONARIO}", file=sys.stderr)
+    print(f"MODO_ASINCRONO = {MODO_ASINCRONO}", file=sys.stderr)
+    print(f"LIMITE_TIEMPO = {LIMITE_TIEMPO}", file=sys.stderr)
+    print(f"GENS_ESTANCAMIENTO = {GENS_ESTANCAMIENTO}", file=sys.stderr)
+    print(f"OBJETIVO_FITNESS = {OBJETIVO_FITNESS}", file=sys.stderr)
+    print(f"CANCEL_FILE = {args.cancel_file}", file=sys.stderr)
+    print(f"PROGRESS_FD = {args.progress_fd}", file=sys.stderr)
+    print(f"BUSQUEDA_LOCAL = cada {BUSQUEDA_LOCAL_CADA} gens, top {BUSQUEDA_LOCAL_TOP}, "
+          f"{BUSQUEDA_LOCAL_EVALUACIONES} movimientos y {BUSQUEDA_LOCAL_TIEMPO}s por fase", file=sys.stderr)
+    print(f"SEED = {args.seed}", file=sys.stderr)
     print("===============================", file=sys.stderr)
 
     # 🔹 Leer JSON desde stdin
@@ -1219,12 +4197,45 @@ def main():
 
     # Convertir al formato interno
     data = convert_input_format(input_data)
+    if PROGRESO is not None:
+        PROGRESO.emitir('start', engine=MOTOR, population=POP_SIZE, generations=GENERATIONS, islands=ISLAS,
+                        steady_state=ESTADO_ESTACIONARIO, async_mode=MODO_ASINCRONO, workers=WORKERS,
+                        courses=len(data['_courses_map']))
 
-    # Ejecutar GA
-    best, diag = ejecutar_algoritmo_genetico(data)
+    # Ejecutar el motor elegido (GA por defecto)
+    if MOTOR != 'ga':
+        best, diag = ejecutar_trayectoria(data, MOTOR)
+    elif ISLAS > 1:
+        cruces = [float(x) for x in args.island_crossover.split(',')] if args.island_crossover else [CROSSOVER_PROB]
+        mutaciones = [float(x) for x in args.island_mutation.split(',')] if args.island_mutation else [MUTATION_PROB]
+        probabilidades = [(cruces[i % len(cruces)], mutaciones[i % len(mutaciones)]) for i in range(ISLAS)]
+        best, diag = ejecutar_islas(data, ISLAS, INTERVALO_MIGRACION, MIGRANTES, TOPOLOGIA, probabilidades)
+    elif MODO_ASINCRONO:
+        best, diag = ejecutar_asincrono(data)
+    elif ESTADO_ESTACIONARIO:
+        best, diag = ejecutar_estado_estacionario(data)
+    else:
+        best, diag = ejecutar_algoritmo_genetico(data)
   
-    # Convertir solución a JSON
+    # Guardar el perfil de evaluación (si se pidió)
+    if PERFIL_EVALUACION is not None:
+        PERFIL_EVALUACION.guardar(args.profile_eval)
+        print(f"💾 Perfil de evaluación guardado en {args.profile_eval}", file=sys.stderr)
+
+    # Convertir solución a JSON (con el criterio que detuvo la corrida; una
+    # corrida cancelada entrega el mejor horario encontrado, marcado como parcial)
+    # Con islas, el motivo del ganador puede ser 'isla_vecina' aunque la corrida
+    # se haya cancelado: la cancelación se lee del evento compartido
+    if CANCELACION.evento.is_set():
+        diag['motivo_parada'] = 'cancelado'
     output_json = convertir_solucion_a_json(best, data)
+    output_json['statistics']['stop_reason'] = diag['motivo_parada']
+    output_json['statistics']['partial'] = diag['motivo_parada'] == 'cancelado'
+    output_json['statistics']['engine'] = MOTOR
+    output_json['statistics']['seconds_to_feasible'] = diag['segundos_a_factible']
+    if PROGRESO is not None:
+        PROGRESO.emitir('done', stop_reason=diag['motivo_parada'], partial=output_json['statistics']['partial'],
+                        fitness=diag['fitness_total'], hard_cost=diag['costo_duro'], soft_cost=diag['costo_blando'])
 
     # 🔹 Imprimir solo el JSON final en stdout (Node lo parseará)
     print(json.dumps(output_json, indent=2, ensure_ascii=False))
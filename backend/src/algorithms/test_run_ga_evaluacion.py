@@ -0,0 +1,92 @@
+"""
+Evaluación incremental y por etapas, criterios de parada y determinismo de las
+islas sobre la instancia pequeña de test_run_ga_pool.py.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import run_ga  # noqa: E402
+from test_run_ga_pool import entrada  # noqa: E402
+
+
+def individuos(n, semilla=5):
+    data = run_ga.convert_input_format(entrada())
+    random.seed(semilla)
+    return data, [run_ga.generar_individuo_tssp(data) for _ in range(n)]
+
+
+def test_evaluador_incremental_igual_a_evaluar_solucion():
+    data, poblacion = individuos(3)
+    for individuo in poblacion:
+        evaluador = run_ga.EvaluadorIncremental(individuo, data)
+        bloques = [(codigo, i) for codigo, asig in individuo.items() for i in range(len(asig))]
+        for _ in range(200):
+            run_ga.aplicar_movimiento(evaluador, run_ga.vecino_aleatorio(evaluador.individuo, data, bloques))
+            fitness, diagnosticos = run_ga.evaluar_solucion(evaluador.individuo, data)
+            assert evaluador.fitness == fitness
+            assert evaluador.costo_duro == diagnosticos['costo_duro']
+            assert evaluador.costo_blando == diagnosticos['costo_blando']
+        assert evaluador.diagnosticos() == run_ga.evaluar_solucion(evaluador.individuo, data)[1]
+
+
+def test_cotas_por_etapas_encierran_el_fitness_exacto():
+    data, poblacion = individuos(10)
+    for individuo in poblacion:
+        exacto = run_ga.evaluar_fitness(individuo, data)
+        for cota in (0, exacto / 2, exacto, exacto * 2, float('inf')):
+            inferior, superior = run_ga.evaluar_por_etapas(individuo, data, cota)
+            assert inferior <= exacto <= superior
+            if cota > exacto:
+                assert inferior == superior == exacto
+
+
+def test_fitness_por_etapas_completa_el_fitness_exacto():
+    data, poblacion = individuos(10)
+    exactos = [run_ga.evaluar_fitness(individuo, data) for individuo in poblacion]
+    fitness = run_ga.evaluar_poblacion(poblacion, data, cota=min(exactos))
+    assert fitness.inferior != fitness.superior  # la cota corta a alguno
+    assert list(fitness) == exactos
+
+
+def test_criterio_parada_por_estancamiento():
+    criterio = run_ga.CriterioParada(gens_estancamiento=2)
+    sin_diagnosticos = lambda: {'costo_duro': 1}  # noqa: E731
+    assert not criterio.revisar(0, 10.0, sin_diagnosticos)
+    assert not criterio.revisar(1, 10.0, sin_diagnosticos)
+    assert criterio.revisar(2, 10.0, sin_diagnosticos)
+    assert criterio.motivo == 'estancamiento'
+
+
+def test_criterio_parada_por_objetivo():
+    criterio = run_ga.CriterioParada(objetivo=run_ga.leer_objetivo('0:100'))
+    assert not criterio.revisar(0, 50.0, lambda: {'costo_duro': 10, 'costo_blando': 40})
+    assert criterio.revisar(1, 40.0, lambda: {'costo_duro': 0, 'costo_blando': 40})
+    assert criterio.motivo == 'objetivo'
+    assert criterio.segundos_factible is not None
+
+
+def test_criterio_parada_por_tiempo_y_motivo_por_defecto():
+    criterio = run_ga.CriterioParada(limite_tiempo=0)
+    assert criterio.revisar(0, 1.0, lambda: {'costo_duro': 1})
+    diagnosticos = {}
+    criterio.finalizar(diagnosticos, 'generaciones', generaciones=0)
+    assert diagnosticos['motivo_parada'] == 'tiempo'
+
+    diagnosticos = {}
+    run_ga.CriterioParada().finalizar(diagnosticos, 'generaciones', generaciones=5)
+    assert diagnosticos['motivo_parada'] == 'generaciones'
+    assert diagnosticos['generaciones'] == 5
+
+
+def test_islas_deterministas_con_semilla(monkeypatch):
+    monkeypatch.setattr(run_ga, 'POP_SIZE', 12)
+    monkeypatch.setattr(run_ga, 'GENERATIONS', 6)
+    data = run_ga.convert_input_format(entrada())
+    resultados = []
+    for _ in range(2):
+        random.seed(3)
+        mejor, diagnosticos = run_ga.ejecutar_islas(data, 2, intervalo=2, migrantes=1)
+        resultados.append((mejor, diagnosticos['fitness_total'], diagnosticos['fitness_por_isla']))
+    assert resultados[0] == resultados[1]
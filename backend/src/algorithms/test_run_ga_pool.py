@@ -0,0 +1,65 @@
+"""
+Los procesos del pool deben usar los mismos parámetros de los operadores que el
+proceso principal aunque no los hereden (spawn / forkserver).
+"""
+import multiprocessing
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import run_ga  # noqa: E402
+
+DIAS = ['LUN', 'MAR', 'MIE', 'JUE', 'VIE']
+HORAS = [('07:00', '07:50'), ('07:50', '08:40'), ('08:50', '09:40'),
+         ('09:40', '10:30'), ('10:40', '11:30'), ('11:30', '12:20')]
+
+
+def entrada():
+    """Instancia pequeña en el formato de entrada de run_ga.py."""
+    return {
+        'metadata': {'block_duration_min': 50},
+        'periods': [{'day_of_week': d, 'start_time': i, 'end_time': f} for d in DIAS for i, f in HORAS],
+        'classrooms': [
+            {'room_code': 'T1', 'room_name': None, 'room_type': 'THEORY', 'capacity': 40},
+            {'room_code': 'T2', 'room_name': None, 'room_type': 'THEORY', 'capacity': 40},
+            {'room_code': 'L1', 'room_name': None, 'room_type': 'LAB', 'capacity': 30},
+        ],
+        'professors': [
+            {'professor_id': p, 'name': f'Prof {p}', 'courses': [],
+             'availabilities': [{'day_of_week': d, 'start_time': '07:00', 'end_time': '12:20'} for d in DIAS]}
+            for p in (1, 2, 3)
+        ],
+        'courses': [
+            {'course_code': f'17010{n}', 'course_name': f'Curso {n}', 'credits': 4, 'year': 1 + n % 2,
+             'prerequisites': [], 'professors': [1 + n % 3], 'theory_hours': 4, 'lab_hours': 2 * (n % 2)}
+            for n in range(6)
+        ],
+        'preferences': {'preferred_shift': 'morning'},
+        'weights': {'hard_constraints': [], 'soft_constraints': []},
+    }
+
+
+def test_pool_spawn_usa_los_parametros_de_los_operadores(monkeypatch):
+    monkeypatch.setattr(run_ga, 'PROB_MOVIMIENTOS', 1.0)
+    monkeypatch.setattr(run_ga, 'MUTATION_PROB', 0.6)
+    data = run_ga.convert_input_format(entrada())
+    random.seed(7)
+    padres = [run_ga.generar_individuo_tssp(data) for _ in range(4)]
+    pendientes = [(hijo, random.getrandbits(64)) for hijo in padres]
+    tareas = [(padres[0], padres[1], 11, 0.8, run_ga.MUTATION_PROB, float('inf')),
+              (padres[2], padres[3], 12, 0.8, run_ga.MUTATION_PROB, float('inf'))]
+
+    locales = run_ga.variar_hijos(pendientes, data, Counter())
+    crias_locales = [run_ga.criar_hijos(p1, p2, data, s, c, m, cota) for p1, p2, s, c, m, cota in tareas]
+
+    pool = run_ga.crear_pool(data, 2, multiprocessing.get_context('spawn'))
+    try:
+        remotos = run_ga.variar_hijos(pendientes, data, Counter(), pool)
+        crias_remotas = list(pool.map(run_ga._criar_en_trabajador, tareas))
+    finally:
+        pool.shutdown()
+
+    assert remotos == locales
+    assert crias_remotas == crias_locales
@@ -11,10 +11,53 @@ const router = Router();
 // 🗂️ Archivo donde guardaremos el horario
 const DATA_FILE = path.join(__dirname, "../db/savedSchedule.json ");
 
+// 🔢 Parámetros numéricos de la query: undefined si no vienen, null si no son un
+// número finito positivo (o entero, o >= 0 para las probabilidades)
+function numberParam(value: unknown, { integer = false, allowZero = false } = {}): number | null | undefined {
+  if (value === undefined || value === "") return undefined;
+  if (typeof value !== "string" || value.trim() === "") return null;
+  const n = Number(value);
+  if (!Number.isFinite(n) || n < 0 || (n === 0 && !allowZero) || (integer && !Number.isInteger(n))) return null;
+  return n;
+}
+
+// 🎯 targetFitness: "X" o "DURO:BLANDO", números >= 0 (mismo criterio que --target-fitness)
+function targetParam(value: unknown): string | null | undefined {
+  if (value === undefined || value === "") return undefined;
+  if (typeof value !== "string") return null;
+  const parts = value.split(":");
+  if (parts.length > 2 || parts.some((part) => typeof numberParam(part, { allowZero: true }) !== "number")) return null;
+  return value;
+}
+
+// 🔥 engine: uno de los motores de run_ga.py (--engine)
+const ENGINES = ["ga", "sa", "tabu"];
+function engineParam(value: unknown): string | null | undefined {
+  if (value === undefined || value === "") return undefined;
+  return typeof value === "string" && ENGINES.includes(value) ? value : null;
+}
+
 
 router.get("/run", async (req: Request, res: Response) => {
   try {
     const { semester = "B" } = req.query; // <--- obtiene A o B dinámicamente
+    const params = {
+      population: numberParam(req.query.population, { integer: true }),
+      generations: numberParam(req.query.generations, { integer: true }),
+      mutationRate: numberParam(req.query.mutationRate, { allowZero: true }),
+      tournament: numberParam(req.query.tournament, { integer: true }),
+      crossover: numberParam(req.query.crossover, { allowZero: true }),
+      timeLimit: numberParam(req.query.timeLimit),
+      stallGenerations: numberParam(req.query.stallGenerations, { integer: true }),
+      iterations: numberParam(req.query.iterations, { integer: true }),
+      deadline: numberParam(req.query.deadline),
+      targetFitness: targetParam(req.query.targetFitness),
+      engine: engineParam(req.query.engine),
+    };
+    const invalid = Object.entries(params).filter(([, value]) => value === null).map(([name]) => name);
+    if (invalid.length) {
+      return res.status(400).json({ error: "Invalid query parameters", params: invalid });
+    }
     console.log("📘 Valor recibido de 'semester':", semester);
     const scheduleData = await getInfoData(String(semester));
 
@@ -28,15 +71,36 @@ router.get("/run", async (req: Request, res: Response) => {
     const scriptPath = path.resolve(__dirname, "../algorithms/run_ga.py");
 
 
-    const pyProcess = spawn("python3", [
+    const pyArgs = [
       scriptPath,
-      "--pop", String(req.query.population || 100),
-      "--gens", String(req.query.generations || 200),
-      "--mutation", String(req.query.mutationRate || 0.2),
-      "--tournament", String(req.query.tournament || 3),
-      "--crossover", String(req.query.crossover || 0.8), // ✅ agregar crossover
-    ]);
-
+      "--pop", String(params.population ?? 100),
+      "--gens", String(params.generations ?? 200),
+      "--mutation", String(params.mutationRate ?? 0.2),
+      "--tournament", String(params.tournament ?? 3),
+      "--crossover", String(params.crossover ?? 0.8), // ✅ agregar crossover
+    ];
+    // ⏹️ Criterios de parada anticipada (opcionales); el motivo vuelve en statistics.stop_reason
+    if (params.timeLimit !== undefined) pyArgs.push("--time-limit", String(params.timeLimit));
+    if (params.stallGenerations !== undefined) pyArgs.push("--stall-gens", String(params.stallGenerations));
+    if (params.targetFitness !== undefined) pyArgs.push("--target-fitness", String(params.targetFitness));
+    // 🔥 Motor alternativo (sa | tabu); por defecto el GA
+    if (params.engine !== undefined) pyArgs.push("--engine", String(params.engine));
+    if (params.iterations !== undefined) pyArgs.push("--iterations", String(params.iterations));
+
+    const pyProcess = spawn("python3", pyArgs);
+
+    // 🛑 Cancelación: con SIGTERM run_ga.py termina en el próximo punto seguro y
+    // entrega el mejor horario encontrado (statistics.partial = true)
+    let clientGone = false;
+    res.on("close", () => {
+      if (!res.writableFinished && pyProcess.exitCode === null) {
+        clientGone = true;
+        pyProcess.kill("SIGTERM");
+      }
+    });
+    const deadline = typeof params.deadline === "number"
+      ? setTimeout(() => pyProcess.kill("SIGTERM"), params.deadline * 1000)
+      : null;
 
 
     pyProcess.stdin.write(JSON.stringify(scheduleData));
@@ -54,6 +118,11 @@ router.get("/run", async (req: Request, res: Response) => {
     });
 
     pyProcess.on("close", async (code) => {
+      if (deadline) clearTimeout(deadline);
+      if (clientGone) {
+        console.warn("Client disconnected, scheduler run cancelled");
+        return;
+      }
       if (code !== 0) {
         console.error("Python exited with code", code, pyError);
         return res.status(500).json({ error: "Python script failed", details: pyError });
@@ -111,7 +180,13 @@ router.get("/run", async (req: Request, res: Response) => {
         }
 
         const formatted = formatScheduleByYear(result);
-        res.json(formatted);
+        res.json({
+          ...formatted,
+          stop_reason: result.statistics?.stop_reason,
+          engine: result.statistics?.engine,
+          seconds_to_feasible: result.statistics?.seconds_to_feasible ?? null,
+          partial: result.statistics?.partial ?? false, // ⚠️ corrida cancelada: mejor horario encontrado
+        });
         // res.json({ schedule: result, message: "Saved to database" });
       } catch (err) {
         console.error("Failed to parse Python output or insert into DB:", err, pyOutput);